@@ -207,6 +207,11 @@ const serverFieldToFormField: Record<string, keyof IntakeValues> = {
   annual_principal_payment: "annualPrincipalPayment",
   owner_compensation: "ownerCompensation",
   cash_on_hand: "cashOnHand",
+  business_name: "businessName",
+  business_type: "businessType",
+  industry: "industry",
+  address: "address",
+  email_address: "emailAddress",
 };
 
 const defaultValues: IntakeValues = {
@@ -384,6 +389,11 @@ function IntakeFormPage() {
         customer_income_level: values.customerIncomeLevel,
         customer_type: values.customerType,
         customer_additional_details: values.customerAdditionalDetails || "",
+        business_name: values.businessName,
+        business_type: values.businessType,
+        industry: values.industry,
+        address: values.address || "",
+        email_address: values.emailAddress,
       };
 
       Object.values(serverFieldToFormField).forEach((fieldName) => {
@@ -1,8 +1,27 @@
+import itertools
 import os
 import sys
+import threading
 from typing import Any, Dict, List, Optional, Tuple
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+
+import db
+from exports import dissertation_export, industry_aggregates_export, plans_export
+from exports.writers import FORMATS, parquet_available, stream
+from locations import PROVIDER_ERRORS, LocationProfiles, MarketNotConfigured
+from outbound import CircuitOpen
+from plans import (
+  BufferClosed,
+  BufferFull,
+  WriteBehindBuffer,
+  exit_on_sigterm,
+  get_plan,
+  new_plan,
+  plan_json,
+  valid_tenant,
+  validate_intake,
+)
 
 try:
   from flask_cors import CORS  # type: ignore
@@ -49,9 +68,9 @@ def create_app() -> Flask:
     response.headers["Access-Control-Allow-Origin"] = origin or "*"
     response.headers["Access-Control-Allow-Credentials"] = "true"
     response.headers["Access-Control-Allow-Headers"] = (
-      "Content-Type, Authorization"
+      "Content-Type, Authorization, X-Tenant-Id"
     )
-    response.headers["Access-Control-Allow-Methods"] = "GET, OPTIONS"
+    response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
     return response
 
   @app.route("/api/business-types", methods=["GET", "OPTIONS"])
@@ -271,6 +290,388 @@ def create_app() -> Flask:
       except Exception:
         pass
 
+  # Each export holds a MySQL connection for as long as the client takes to
+  # download, so cap how many run at once.
+  try:
+    export_max = max(1, int(getenv("EXPORT_MAX_CONCURRENT") or "4"))
+  except ValueError:
+    export_max = 4
+  export_slots = threading.BoundedSemaphore(export_max)
+
+  @app.route("/api/exports/<dataset>", methods=["GET", "OPTIONS"])
+  def export_dataset(dataset: str):
+    """
+    Stream a dataset as CSV, XLSX or Parquet.
+
+    Datasets: `dissertation-data` (optional `symbols`, `industry`,
+    `columns`, `limit`), `industry-aggregates` (optional `industry`,
+    `fields`) and `plans` (required `plan_ids`, at most 100, scoped to the
+    requesting tenant). Choose the format with `format=csv|xlsx|parquet`
+    (default csv).
+    """
+    if request.method == "OPTIONS":
+      # Preflight request for CORS.
+      return ("", 204)
+
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in FORMATS:
+      return (
+        jsonify({"error": "unsupported_format", "formats": sorted(FORMATS)}),
+        400,
+      )
+    if fmt == "parquet" and not parquet_available():
+      return (
+        jsonify(
+          {
+            "error": "parquet_not_available",
+            "detail": "Install pyarrow in your environment.",
+          }
+        ),
+        501,
+      )
+    if dataset not in ("dissertation-data", "industry-aggregates", "plans"):
+      return (jsonify({"error": "unknown_dataset"}), 404)
+
+    def split_arg(name: str) -> Optional[List[str]]:
+      raw = request.args.get(name)
+      if not raw:
+        return None
+      return [v.strip() for v in raw.split(",") if v.strip()]
+
+    tenant = None
+    plan_ids: List[str] = []
+    if dataset == "plans":
+      tenant = request_tenant()
+      if tenant is None:
+        return (jsonify({"error": "invalid_tenant"}), 400)
+      plan_ids = list(dict.fromkeys(split_arg("plan_ids") or []))
+      if not plan_ids or len(plan_ids) > 100:
+        return (jsonify({"error": "invalid_plan_ids"}), 400)
+
+    limit_arg = request.args.get("limit")
+    try:
+      limit = int(limit_arg) if limit_arg else None
+    except ValueError:
+      return (jsonify({"error": "invalid_limit"}), 400)
+
+    missing = db.missing_mysql_env()
+    if missing:
+      app.logger.error(
+        "Missing required MySQL environment variables: %s",
+        ", ".join(missing),
+      )
+      return (
+        jsonify(
+          {
+            "error": "missing_mysql_configuration",
+            "missing": missing,
+          }
+        ),
+        500,
+      )
+
+    if not export_slots.acquire(blocking=False):
+      return (jsonify({"error": "too_many_exports"}), 429)
+
+    try:
+      conn = db.connect()
+    except Exception as exc:
+      export_slots.release()
+      app.logger.exception("Failed to connect to MySQL: %s", exc)
+      return (
+        jsonify(
+          {
+            "error": "database_connection_error",
+          }
+        ),
+        500,
+      )
+
+    def release() -> None:
+      try:
+        conn.close()
+      except Exception:
+        pass
+      export_slots.release()
+
+    try:
+      if dataset == "dissertation-data":
+        columns, numeric, rows = dissertation_export(
+          conn,
+          columns=split_arg("columns"),
+          symbols=split_arg("symbols"),
+          industry=request.args.get("industry") or None,
+          limit=limit,
+        )
+      elif dataset == "plans":
+        buffer = get_plan_buffer()
+        pending = {}
+        for plan_id in plan_ids:
+          queued = buffer.get_pending(tenant, plan_id)
+          if queued is not None:
+            pending[plan_id] = queued
+        columns, numeric, rows = plans_export(conn, tenant, plan_ids, pending)
+      else:
+        columns, numeric, rows = industry_aggregates_export(
+          conn,
+          fields=split_arg("fields"),
+          industry=request.args.get("industry") or None,
+        )
+    except ValueError as exc:
+      release()
+      return (jsonify({"error": "invalid_columns", "detail": str(exc)}), 400)
+
+    # Read the first page before the headers go out, so a failing query is a
+    # 500 rather than a truncated 200 download.
+    try:
+      first = next(rows, None)
+    except Exception as exc:
+      release()
+      app.logger.exception("Export query failed: %s", exc)
+      return (
+        jsonify(
+          {
+            "error": "database_query_error",
+          }
+        ),
+        500,
+      )
+    if first is not None:
+      rows = itertools.chain([first], rows)
+    elif dataset == "plans":
+      release()
+      return (jsonify({"error": "plan_not_found"}), 404)
+
+    mimetype, ext = FORMATS[fmt]
+    response = Response(
+      stream(fmt, columns, rows, numeric=numeric, sheet_name=dataset),
+      mimetype=mimetype,
+    )
+    response.headers["Content-Disposition"] = (
+      f'attachment; filename="{dataset.replace("-", "_")}.{ext}"'
+    )
+    # Runs even if the client disconnects before the body is consumed.
+    response.call_on_close(release)
+    return response
+
+  # ------------------------------------------------
+  # Business plans
+  # ------------------------------------------------
+  plan_buffer_lock = threading.Lock()
+
+  # Queued plans are spilled by the buffer's atexit hook, which a plain
+  # SIGTERM (docker stop, systemd, kill) would skip.
+  exit_on_sigterm()
+
+  def get_plan_buffer() -> WriteBehindBuffer:
+    # Started on first use so importing the app (or the reloader's parent
+    # process) does not open a writer thread.
+    with plan_buffer_lock:
+      buffer = app.extensions.get("plan_buffer")
+      if buffer is None:
+        buffer = WriteBehindBuffer.from_env()
+        app.extensions["plan_buffer"] = buffer
+      return buffer
+
+  # X-Tenant-Id is only honoured behind a gateway that authenticates the
+  # caller and sets (or strips) the header itself; otherwise any client
+  # could name any tenant, so every request uses DEFAULT_TENANT_ID.
+  trust_tenant_header = (getenv("TRUST_TENANT_HEADER") or "").lower() in ("1", "true", "yes")
+
+  def request_tenant() -> Optional[str]:
+    header = request.headers.get("X-Tenant-Id") if trust_tenant_header else None
+    tenant = (header or getenv("DEFAULT_TENANT_ID") or "public").strip()
+    return tenant if valid_tenant(tenant) else None
+
+  def missing_mysql_response():
+    missing = db.missing_mysql_env()
+    if not missing:
+      return None
+    app.logger.error(
+      "Missing required MySQL environment variables: %s",
+      ", ".join(missing),
+    )
+    return (
+      jsonify(
+        {
+          "error": "missing_mysql_configuration",
+          "missing": missing,
+        }
+      ),
+      500,
+    )
+
+  @app.route("/api/financials", methods=["POST", "OPTIONS"])
+  def submit_financials():
+    """
+    Accept an intake-form submission and queue it for storage.
+
+    Responds 202 with the new plan (status "queued") once it is in the
+    write-behind buffer, 400 with `{"errors": {field: message}}` for invalid
+    input, and 503 with Retry-After when the buffer is full.
+    """
+    if request.method == "OPTIONS":
+      # Preflight request for CORS.
+      return ("", 204)
+
+    tenant = request_tenant()
+    if tenant is None:
+      return (jsonify({"error": "invalid_tenant"}), 400)
+
+    record, errors = validate_intake(request.get_json(silent=True))
+    if errors:
+      return (jsonify({"errors": errors}), 400)
+
+    missing = missing_mysql_response()
+    if missing is not None:
+      return missing
+
+    plan = new_plan(tenant, record)
+    try:
+      get_plan_buffer().submit(plan)
+    except (BufferFull, BufferClosed) as exc:
+      app.logger.warning("Plan not accepted: %s", exc)
+      response = jsonify({"error": "plan_queue_full"})
+      response.status_code = 503
+      response.headers["Retry-After"] = "1"
+      return response
+
+    return (jsonify(plan_json(plan, status="queued")), 202)
+
+  # There is no listing endpoint: without authentication, any filter a
+  # caller can supply (tenant header, email) is guessable, and plans carry
+  # contact details and financials. A plan is read back by the random
+  # plan_id returned only to the submitter.
+  @app.route("/api/plans/<plan_id>", methods=["GET", "OPTIONS"])
+  def get_plan_by_id(plan_id: str):
+    """
+    One plan by id, scoped to the requesting tenant.
+    """
+    if request.method == "OPTIONS":
+      # Preflight request for CORS.
+      return ("", 204)
+
+    tenant = request_tenant()
+    if tenant is None:
+      return (jsonify({"error": "invalid_tenant"}), 400)
+
+    queued = get_plan_buffer().get_pending(tenant, plan_id)
+    if queued is not None:
+      return jsonify(plan_json(queued, status="queued"))
+
+    missing = missing_mysql_response()
+    if missing is not None:
+      return missing
+
+    try:
+      conn = db.connect()
+    except Exception as exc:
+      app.logger.exception("Failed to connect to MySQL: %s", exc)
+      return (
+        jsonify(
+          {
+            "error": "database_connection_error",
+          }
+        ),
+        500,
+      )
+
+    try:
+      plan = get_plan(conn, tenant, plan_id)
+    except Exception as exc:
+      app.logger.exception("Error querying business_plans table: %s", exc)
+      return (
+        jsonify(
+          {
+            "error": "database_query_error",
+          }
+        ),
+        500,
+      )
+    finally:
+      try:
+        conn.close()
+      except Exception:
+        pass
+
+    if plan is None:
+      return (jsonify({"error": "not_found"}), 404)
+    return jsonify(plan_json(plan))
+
+  # ------------------------------------------------
+  # Location-market profiles
+  # ------------------------------------------------
+  location_lock = threading.Lock()
+
+  def get_location_profiles() -> LocationProfiles:
+    with location_lock:
+      profiles = app.extensions.get("location_profiles")
+      if profiles is None:
+        profiles = LocationProfiles.from_env()
+        app.extensions["location_profiles"] = profiles
+      return profiles
+
+  @app.route("/api/location-profile", methods=["GET", "OPTIONS"])
+  def location_profile():
+    """
+    Competitor density, rating, price level and Census demographics for a
+    business type around a point, from the precomputed geohash tiles.
+    Requires `business_type` and either `address` or `lat`/`lng`. With
+    `wait=false`, tiles not yet built are scheduled and listed as `pending`
+    instead of being fetched inline.
+    """
+    if request.method == "OPTIONS":
+      # Preflight request for CORS.
+      return ("", 204)
+
+    business_type = (request.args.get("business_type") or "").strip()
+    address = (request.args.get("address") or "").strip() or None
+    lat = lng = None
+    if not business_type:
+      return (jsonify({"error": "missing_business_type"}), 400)
+    if address is None:
+      try:
+        lat = float(request.args.get("lat", ""))
+        lng = float(request.args.get("lng", ""))
+      except ValueError:
+        return (jsonify({"error": "missing_location"}), 400)
+      if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return (jsonify({"error": "invalid_location"}), 400)
+    wait = (request.args.get("wait") or "true").strip().lower() not in ("0", "false", "no")
+
+    missing = missing_mysql_response()
+    if missing is not None:
+      return missing
+
+    try:
+      profile = get_location_profiles().profile(
+        business_type, address=address, lat=lat, lng=lng, wait=wait
+      )
+    except MarketNotConfigured as exc:
+      app.logger.error("Location profiles are not configured: %s", exc)
+      return (jsonify({"error": "missing_market_data_configuration"}), 500)
+    except PROVIDER_ERRORS as exc:
+      app.logger.warning("Location profile unavailable: %s", exc)
+      response = jsonify({"error": "provider_unavailable"})
+      response.status_code = 503
+      retry_in = exc.retry_in if isinstance(exc, CircuitOpen) else 5
+      response.headers["Retry-After"] = str(max(1, int(round(retry_in))))
+      return response
+    except Exception as exc:
+      app.logger.exception("Error building location profile: %s", exc)
+      return (
+        jsonify(
+          {
+            "error": "database_query_error",
+          }
+        ),
+        500,
+      )
+
+    if profile is None:
+      return (jsonify({"error": "address_not_found"}), 404)
+    return jsonify(profile)
+
   return app
 
 
@@ -0,0 +1,3 @@
+"""
+Offline benchmark suite: `python -m bench`.
+"""
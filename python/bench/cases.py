@@ -0,0 +1,490 @@
+"""
+Benchmark cases.
+
+Each case takes the shared `BenchContext` and returns a flat dict of
+metrics. Naming convention used by `--compare`: `*_us` is a latency (lower
+is better), `*_per_sec` a throughput (higher is better); anything else is
+informational.
+"""
+
+import datetime as dt
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+import types
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from unittest import mock
+
+import numpy as np
+
+import db
+
+from .standin import StandIn
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+Metrics = Dict[str, Any]
+
+
+def latency(fn: Callable[[], Any], calls: int, warmup: int = 5) -> Metrics:
+    for _ in range(min(warmup, calls)):
+        fn()
+    samples: List[float] = []
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        s = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - s)
+    total = time.perf_counter() - t0
+    samples.sort()
+    return {
+        "calls": calls,
+        "mean_us": round(statistics.fmean(samples) * 1e6, 1),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6, 1),
+        "calls_per_sec": round(calls / total, 1) if total else None,
+    }
+
+
+class BenchContext:
+    """
+    Temp directory, the SQLite stand-in and the patches that route `db`,
+    `mysql.connector` and the app's environment to it.
+    """
+
+    def __init__(self, workdir: str, scale: float = 1.0):
+        self.workdir = workdir
+        self.scale = scale
+        self.standin = StandIn(os.path.join(workdir, "standin.db"))
+        self._stack = ExitStack()
+        self._app: Any = None
+
+    def n(self, base: int) -> int:
+        return max(1, int(base * self.scale))
+
+    def __enter__(self) -> "BenchContext":
+        env = {
+            "MYSQL_HOST": "standin",
+            "MYSQL_USER": "bench",
+            "MYSQL_PASSWORD": "bench",
+            "MYSQL_DB": "bench",
+            "START_DATE": "2000-01-01",
+            "PLAN_SPILL_PATH": os.path.join(self.workdir, "plan_spill.jsonl"),
+            "TRUST_TENANT_HEADER": "1",
+        }
+        self._stack.enter_context(mock.patch.dict(os.environ, env))
+        self._stack.enter_context(mock.patch.object(db, "connect", self.standin.connect))
+        # api.py's lookup routes call mysql.connector.connect directly.
+        try:
+            import mysql.connector as connector  # type: ignore
+        except Exception:
+            connector = types.ModuleType("mysql.connector")
+            package = types.ModuleType("mysql")
+            package.connector = connector  # type: ignore[attr-defined]
+            self._stack.enter_context(
+                mock.patch.dict(sys.modules, {"mysql": package, "mysql.connector": connector})
+            )
+        self._stack.enter_context(
+            mock.patch.object(connector, "connect", self.standin.connect, create=True)
+        )
+        self.standin.create_dissertation_table()
+        self.standin.seed_lookup_tables(
+            [f"Business type {i:03d}" for i in range(150)],
+            [(str(100 + i), f"Industry {i:03d}") for i in range(100)],
+        )
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._app is not None:
+            buffer = self._app.extensions.get("plan_buffer")
+            if buffer is not None:
+                buffer.close()
+        self._stack.close()
+        self.standin.close()
+
+    @property
+    def app(self) -> Any:
+        if self._app is None:
+            import api
+
+            self._app = api.create_app()
+            self._app.logger.disabled = True
+        return self._app
+
+    def fixture_dir(self, symbols: int) -> str:
+        """
+        Alpha Vantage fixtures for `symbols` tickers, cloned from the
+        synthetic IBM responses with the values scaled per ticker.
+        """
+        out = os.path.join(self.workdir, f"fixtures_{symbols}")
+        if os.path.isdir(out):
+            return out
+        shutil.copytree(FIXTURES, out)
+        src = os.path.join(FIXTURES, "alphavantage")
+        for i in range(symbols):
+            sym = f"B{i:04d}"
+            factor = 0.5 + (i % 17) / 8.0
+            for name in os.listdir(src):
+                with open(os.path.join(src, name), encoding="utf-8") as fh:
+                    data = json.load(fh)
+                for report in data.get("quarterlyReports", []):
+                    for k, v in report.items():
+                        if k != "fiscalDateEnding" and v.lstrip("-").isdigit():
+                            report[k] = str(int(int(v) * factor))
+                if "Industry" in data:
+                    data["Industry"] = f"INDUSTRY {i % 12:02d}"
+                with open(os.path.join(out, "alphavantage", name.replace("IBM", sym)), "w", encoding="utf-8") as fh:
+                    json.dump(data, fh)
+        return out
+
+
+def _financial_rows(n: int) -> List[tuple]:
+    from financials.schema import COLUMNS, NUMERIC_FIELDS
+
+    rng = np.random.default_rng(3)
+    numeric = set(NUMERIC_FIELDS)
+    base = dt.date(2015, 3, 31)
+    rows = []
+    for i in range(n):
+        revenue = float(rng.uniform(1e6, 1e9))
+        cogs = revenue * 0.4
+        liabilities = revenue * 2.0
+        equity = revenue * 0.5
+        current = revenue
+        values = {
+            "totalRevenue": revenue, "costOfRevenue": cogs, "grossProfit": revenue - cogs,
+            "totalAssets": liabilities + equity, "totalLiabilities": liabilities,
+            "totalShareholderEquity": equity, "totalCurrentAssets": current,
+            "totalNonCurrentAssets": liabilities + equity - current,
+            "netIncome.x": revenue * 0.1, "totalCurrentLiabilities": current * 0.8,
+        }
+        rows.append(tuple(
+            f"S{i // 40:04d}" if c == "symbol"
+            else base + dt.timedelta(days=91 * (i % 40)) if c == "fiscalDateEnding"
+            else f"IND{i % 12}" if c == "industry"
+            else dt.date(2025, 1, 1) if c == "pull_date"
+            else "USD" if "Currency" in c
+            else str(int(values.get(c, revenue * 0.05))) if c in numeric
+            else None
+            for c in COLUMNS
+        ))
+    return rows
+
+
+# ------------------------------------------------
+# API (Flask test client)
+# ------------------------------------------------
+def api_lookups(ctx: BenchContext) -> Metrics:
+    client = ctx.app.test_client()
+    out: Metrics = {}
+    for name, path in (("business_types", "/api/business-types"), ("industry_types", "/api/industry-types")):
+        m = latency(lambda: client.get(path), ctx.n(300))
+        out.update({f"{name}_{k}": v for k, v in m.items()})
+    return out
+
+
+INTAKE = {
+    "business_start_date": "03-01-2021",
+    "current_revenue": "1,250,000",
+    "current_cogs": 480000,
+    "tax_rate": 21,
+    "marketing_expense": "35,000",
+    "current_num_employees": 12,
+    "customer_age_range": "25-44",
+    "customer_type": "B2C",
+    "business_name": "Bench Coffee",
+    "business_type": "Coffee Shop",
+    "industry": "Food Services",
+    "address": "1 Main St, New York, NY",
+    "email_address": "owner@example.com",
+}
+
+
+def api_plans(ctx: BenchContext) -> Metrics:
+    client = ctx.app.test_client()
+    headers = {"X-Tenant-Id": "bench"}
+    submit = latency(lambda: client.post("/api/financials", json=INTAKE, headers=headers), ctx.n(1000))
+
+    buffer = ctx.app.extensions["plan_buffer"]
+    t0 = time.perf_counter()
+    while buffer.depth() or buffer.pending("bench"):
+        if time.perf_counter() - t0 > 30:
+            break
+        time.sleep(0.01)
+    drain = time.perf_counter() - t0
+
+    plan_id = client.post("/api/financials", json=INTAKE, headers=headers).get_json()["plan_id"]
+    read = latency(lambda: client.get(f"/api/plans/{plan_id}", headers=headers), ctx.n(300))
+    out = {f"submit_{k}": v for k, v in submit.items()}
+    out.update({f"read_{k}": v for k, v in read.items()})
+    out["drain_seconds"] = round(drain, 3)
+    out["write_batches"] = buffer.stats["batches"]
+    out["rejected"] = buffer.stats["rejected"]
+    return out
+
+
+def api_export(ctx: BenchContext) -> Metrics:
+    rows = _financial_rows(ctx.n(4000))
+    conn = ctx.standin.connect()
+    from financials.schema import COLUMNS
+
+    db.upsert_rows(conn, "dissertation_data", COLUMNS, rows)
+    conn.close()
+    client = ctx.app.test_client()
+    out: Metrics = {}
+    for fmt in ("csv", "xlsx"):
+        size = 0
+
+        def run() -> None:
+            nonlocal size
+            resp = client.get(f"/api/exports/dissertation-data?format={fmt}")
+            size = len(resp.get_data())
+            resp.close()
+
+        m = latency(run, 3, warmup=1)
+        out[f"{fmt}_rows_per_sec"] = round(len(rows) / (m["mean_us"] / 1e6), 1)
+        out[f"{fmt}_bytes"] = size
+    out["rows"] = len(rows)
+    return out
+
+
+# ------------------------------------------------
+# Ingest
+# ------------------------------------------------
+def ingest_replay(ctx: BenchContext) -> Metrics:
+    from data_pull.ingest import FixtureTransport, IngestEngine
+    from data_pull.ingest.sources import FinancialStatementsSource
+
+    symbols = ctx.n(150)
+    transport = FixtureTransport(ctx.fixture_dir(symbols))
+    source = FinancialStatementsSource([f"B{i:04d}" for i in range(symbols)])
+    engine = IngestEngine(transport, connect=ctx.standin.connect)
+    t0 = time.perf_counter()
+    (result,) = engine.run([source])
+    seconds = time.perf_counter() - t0
+    return {
+        "symbols": symbols,
+        "rows": result.rows,
+        "quarantined": result.quarantined,
+        "status": result.status,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(result.rows / seconds, 1) if seconds else None,
+    }
+
+
+def ingest_http(ctx: BenchContext) -> Metrics:
+    """
+    The same ingest over real HTTP against the local mock server, with a
+    fixed 20 ms upstream latency, so the transport's pooling and the
+    engine's per-source concurrency are what gets measured.
+    """
+    from data_pull.ingest import HttpTransport, IngestEngine, sources, transport as transport_mod
+    from mock_apis import MockServer
+
+    symbols = ctx.n(60)
+    profile = {"latency": {"dist": "fixed", "ms": 20}, "quota": None}
+    with ExitStack() as stack:
+        mock_server = stack.enter_context(MockServer(seed=0))
+        mock_server.state.configure({"alphavantage": profile})
+        stack.enter_context(mock.patch.object(sources, "ALPHA_URL", mock_server.base_url + "/query"))
+        stack.enter_context(mock.patch.dict(os.environ, {"ALPHAVANTAGE_API_KEY": "bench"}))
+        # The shared limiter would otherwise pace requests at the live key's rate.
+        stack.enter_context(mock.patch.dict(transport_mod.DEFAULT_RATES, {"alphavantage": {"rate": 1e6, "burst": 1000}}))
+        stack.enter_context(mock.patch.object(transport_mod, "_limiters", {}))
+        source = sources.FinancialStatementsSource([f"H{i:04d}" for i in range(symbols)])
+        engine = IngestEngine(HttpTransport(), connect=ctx.standin.connect)
+        t0 = time.perf_counter()
+        (result,) = engine.run([source])
+        seconds = time.perf_counter() - t0
+        requests_made = mock_server.state.snapshot()["alphavantage"]["requests"]
+    return {
+        "symbols": symbols,
+        "requests": requests_made,
+        "rows": result.rows,
+        "status": result.status,
+        "seconds": round(seconds, 3),
+        "symbols_per_sec": round(symbols / seconds, 1) if seconds else None,
+        "rows_per_sec": round(result.rows / seconds, 1) if seconds else None,
+    }
+
+
+def ingest_upsert(ctx: BenchContext) -> Metrics:
+    from financials.schema import COLUMNS, KEY_COLUMNS
+
+    rows = _financial_rows(ctx.n(5000))
+    update = [c for c in COLUMNS if c not in KEY_COLUMNS]
+    out: Metrics = {"rows": len(rows)}
+    for batch in (100, 500):
+        conn = ctx.standin.connect()
+        cur = conn.cursor()
+        cur.execute("DELETE FROM `dissertation_data`")
+        conn.commit()
+        t0 = time.perf_counter()
+        db.upsert_rows(conn, "dissertation_data", COLUMNS, rows, update, batch)
+        insert = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        db.upsert_rows(conn, "dissertation_data", COLUMNS, rows, update, batch)
+        update_s = time.perf_counter() - t0
+        conn.close()
+        out[f"insert_b{batch}_rows_per_sec"] = round(len(rows) / insert, 1)
+        out[f"update_b{batch}_rows_per_sec"] = round(len(rows) / update_s, 1)
+    return out
+
+
+# ------------------------------------------------
+# Numeric paths
+# ------------------------------------------------
+def math_coerce(ctx: BenchContext) -> Metrics:
+    from financials.schema import COLUMNS, NUMERIC_FIELDS, coerce_numeric
+
+    rows = _financial_rows(ctx.n(2000))
+    idx = [COLUMNS.index(c) for c in NUMERIC_FIELDS if c in COLUMNS]
+    block = np.array(rows, dtype=object)[:, idx]
+    m = latency(lambda: coerce_numeric(block), 20, warmup=2)
+    cells = block.size
+    return {"cells": cells, "mean_us": m["mean_us"], "cells_per_sec": round(cells / (m["mean_us"] / 1e6), 1)}
+
+
+def math_validator(ctx: BenchContext) -> Metrics:
+    from data_pull.ingest.validation import FinancialsValidator
+    from financials.schema import COLUMNS
+
+    rows = _financial_rows(ctx.n(2000))
+    validator = FinancialsValidator()
+    accepted = 0
+
+    def run() -> None:
+        nonlocal accepted
+        accepted = len(validator.validate(COLUMNS, rows).accepted)
+
+    m = latency(run, 10, warmup=1)
+    return {
+        "rows": len(rows),
+        "accepted": accepted,
+        "mean_us": m["mean_us"],
+        "rows_per_sec": round(len(rows) / (m["mean_us"] / 1e6), 1),
+    }
+
+
+def math_snapshot(ctx: BenchContext) -> Metrics:
+    from financials.schema import NUMERIC_FIELDS
+    from financials.snapshot_store import SnapshotStore, _SyntheticSource
+
+    source = _SyntheticSource(ctx.n(500), 40, NUMERIC_FIELDS)
+    store = SnapshotStore(source=source, check_interval=1e9)
+    t0 = time.perf_counter()
+    store.preload()
+    load = time.perf_counter() - t0
+    rng = np.random.default_rng(5)
+    probes = [
+        (source.symbols[int(i)], source.dates[int(q)])
+        for i, q in zip(rng.integers(0, len(source.symbols), 5000), rng.integers(0, 40, 5000))
+    ]
+    it = iter(probes * 10)
+    point = latency(lambda: store.value(*next(it), "totalRevenue"), 20000, warmup=100)
+    industry = source.industries[source.symbols[0]]
+    when = source.dates[-1]
+    peers = latency(lambda: store.peers(industry, when, "totalRevenue"), ctx.n(500))
+    return {
+        "symbols": len(source.symbols),
+        "load_seconds": round(load, 3),
+        "point_p50_us": point["p50_us"],
+        "point_calls_per_sec": point["calls_per_sec"],
+        "peers_p50_us": peers["p50_us"],
+    }
+
+
+def plans_validate(ctx: BenchContext) -> Metrics:
+    from plans import validate_intake
+
+    return latency(lambda: validate_intake(INTAKE), ctx.n(5000))
+
+
+# ------------------------------------------------
+# Location profiles
+# ------------------------------------------------
+def locations_profile(ctx: BenchContext) -> Metrics:
+    """
+    Cold profiles build 3x3 tiles from the mock Places / Yelp / geocoding
+    endpoints (20 ms upstream latency); warm ones are answered from the
+    in-process LRU, or from one tile query when the LRU is too small.
+    """
+    from data_pull.ingest.sources import CensusSource
+    from locations import LocationProfiles, MarketClient, ensure_tables
+    from locations.tiles import STATE_FIPS
+    from mock_apis import MockServer
+    from mock_apis.providers import MOCK_CITIES
+
+    addresses = [f"{100 + i} Main St, {city}, {state}" for i, (city, _, state) in enumerate(MOCK_CITIES * ctx.n(3))]
+    conn = ctx.standin.connect()
+    ensure_tables(conn)
+    conn.close()
+    ctx.standin.execute(CensusSource.create_sql)
+    for i, (city, state, code) in enumerate(MOCK_CITIES):
+        ctx.standin.execute(
+            "INSERT INTO `census_place_data` VALUES (%s, %s, %s, %s, %s, %s)",
+            (2022, STATE_FIPS[code], f"{i:05d}", f"{city} city, {state}", 100_000 * (i + 1), 55_000 + 5_000 * i),
+        )
+
+    profile = {"latency": {"dist": "fixed", "ms": 20}, "quota": None}
+    with ExitStack() as stack:
+        mock_server = stack.enter_context(MockServer(seed=0))
+        mock_server.state.configure({
+            "google": {**profile, "page_token_delay_ms": 0},
+            "yelp": profile,
+        })
+        stack.enter_context(mock.patch.dict(os.environ, {
+            **mock_server.env(),
+            "GOOGLE_PLACES_API_KEY": "bench",
+            "YELP_API_KEY": "bench",
+        }))
+        market = MarketClient(page_token_wait=0)
+        warm = LocationProfiles(connect=ctx.standin.connect, market=market)
+        cold_db = LocationProfiles(connect=ctx.standin.connect, market=market, cache_size=1)
+        stack.callback(warm.close)
+        stack.callback(cold_db.close)
+
+        t0 = time.perf_counter()
+        for address in addresses:
+            warm.profile("coffee", address=address)
+        build = time.perf_counter() - t0
+        upstream = sum(v["requests"] for v in mock_server.state.snapshot().values())
+
+        cycle = iter(addresses * 1000)
+        memory = latency(lambda: warm.profile("coffee", address=next(cycle)), ctx.n(2000))
+        from_db = latency(lambda: cold_db.profile("coffee", address=next(cycle)), ctx.n(300))
+
+    out: Metrics = {
+        "addresses": len(addresses),
+        "tiles_built": warm.stats["built"],
+        "upstream_requests": upstream,
+        "cold_profile_ms": round(build / len(addresses) * 1000, 1),
+    }
+    out.update({f"memory_{k}": v for k, v in memory.items()})
+    out.update({f"db_{k}": v for k, v in from_db.items()})
+    return out
+
+
+CASES: Dict[str, Callable[[BenchContext], Metrics]] = {
+    "api.lookups": api_lookups,
+    "api.plans": api_plans,
+    "api.export": api_export,
+    "ingest.replay": ingest_replay,
+    "ingest.http": ingest_http,
+    "ingest.upsert": ingest_upsert,
+    "math.coerce": math_coerce,
+    "math.validator": math_validator,
+    "math.snapshot": math_snapshot,
+    "plans.validate": plans_validate,
+    "locations.profile": locations_profile,
+}
+
+
+def select(patterns: Optional[Sequence[str]]) -> List[str]:
+    if not patterns:
+        return list(CASES)
+    return [name for name in CASES if any(name.startswith(p) for p in patterns)]
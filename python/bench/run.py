@@ -0,0 +1,136 @@
+"""
+Run the offline benchmark suite and compare results between commits.
+
+Everything runs in-process against synthetic fixtures and a SQLite stand-in
+for MySQL, so no keys, network or database are needed.
+
+    python -m bench --out bench_results/$(git rev-parse --short HEAD).json
+    python -m bench --only api. math. --scale 0.2
+    python -m bench --compare bench_results/base.json --out new.json
+"""
+
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from .cases import CASES, BenchContext, select
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", *args], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except Exception:
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(names: List[str], scale: float) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        with BenchContext(workdir, scale) as ctx:
+            for name in names:
+                print(f"[bench] {name} ...", file=sys.stderr, flush=True)
+                t0 = time.perf_counter()
+                try:
+                    metrics = CASES[name](ctx)
+                except Exception as ex:
+                    metrics = {"error": f"{type(ex).__name__}: {ex}"}
+                metrics["wall_seconds"] = round(time.perf_counter() - t0, 3)
+                results[name] = metrics
+    return {"environment": environment(), "scale": scale, "results": results}
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Print per-metric changes and return the metrics that regressed by more
+    than `threshold` (a fraction).
+    """
+    regressions: List[str] = []
+    b_commit = base.get("environment", {}).get("commit")
+    n_commit = new.get("environment", {}).get("commit")
+    print(f"\n{'metric':<52} {b_commit or 'base':>12} {n_commit or 'new':>12} {'change':>9}")
+    for case, metrics in new.get("results", {}).items():
+        old = base.get("results", {}).get(case, {})
+        for key, value in metrics.items():
+            lower_better = key.endswith("_us")
+            higher_better = key.endswith("_per_sec")
+            if not (lower_better or higher_better):
+                continue
+            before = old.get(key)
+            if not isinstance(before, (int, float)) or not isinstance(value, (int, float)) or not before:
+                continue
+            change = (value - before) / before
+            worse = change > threshold if lower_better else change < -threshold
+            flag = "  <-- regression" if worse else ""
+            print(f"{case + ' ' + key:<52} {before:>12,.1f} {value:>12,.1f} {change:>+8.1%}{flag}")
+            if worse:
+                regressions.append(f"{case}.{key}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    parser.add_argument("--only", nargs="*", help="case name prefixes, e.g. api. math.validator")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply dataset sizes and call counts")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="regression threshold (fraction, default 0.2)")
+    parser.add_argument("--list", action="store_true", help="list cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in CASES:
+            print(name)
+        return 0
+
+    names = select(args.only)
+    if not names:
+        print("No benchmark cases match.", file=sys.stderr)
+        return 2
+
+    # The engines log every unit at INFO/WARNING; keep the output readable.
+    logging.basicConfig(level=logging.ERROR)
+    report = run(names, args.scale)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+        print(f"Wrote {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+    failed = [n for n, m in report["results"].items() if "error" in m]
+    for name in failed:
+        print(f"{name}: {report['results'][name]['error']}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            base = json.load(fh)
+        regressions = compare(base, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 1 if failed else 0
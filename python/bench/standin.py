@@ -0,0 +1,241 @@
+"""
+SQLite-backed stand-in for a mysql-connector connection.
+
+Covers the MySQL dialect this repo actually emits (backtick identifiers,
+`%s` placeholders, INSERT IGNORE, ON DUPLICATE KEY UPDATE ... VALUES(),
+inline KEY definitions, CAST AS DOUBLE, STDDEV_POP, information_schema
+column lookups) so the API, exports, plan store and ingest upsert path can
+be benchmarked offline against real SQL execution. It is not a general
+MySQL emulator.
+"""
+
+import datetime as dt
+import math
+import re
+import sqlite3
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+from financials.schema import COLUMNS as DISSERTATION_COLUMNS
+from financials.schema import KEY_COLUMNS, TABLE as DISSERTATION_TABLE
+
+_INDEX_RE = re.compile(r",\s*(UNIQUE\s+)?KEY\s+`(\w+)`\s*\(([^)]*)\)", re.I)
+_UPDATE_RE = re.compile(r"ON DUPLICATE KEY UPDATE\s+(.*)$", re.I | re.S)
+_VALUES_FN_RE = re.compile(r"VALUES\((`[^`]+`|\w+)\)", re.I)
+_TABLE_RE = re.compile(r"CREATE TABLE IF NOT EXISTS\s+`(\w+)`", re.I)
+
+
+def _adapt_datetime(value: dt.datetime) -> str:
+    return value.isoformat(sep=" ")
+
+
+def _convert_datetime(raw: bytes) -> dt.datetime:
+    return dt.datetime.fromisoformat(raw.decode())
+
+
+def _convert_date(raw: bytes) -> Any:
+    text = raw.decode()
+    try:
+        return dt.date.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+sqlite3.register_adapter(dt.datetime, _adapt_datetime)
+sqlite3.register_adapter(dt.date, lambda d: d.isoformat())
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("DATE", _convert_date)
+
+
+class _StddevPop:
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def step(self, value: Any) -> None:
+        if value is None:
+            return
+        x = float(value)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def finalize(self) -> Optional[float]:
+        return math.sqrt(self.m2 / self.n) if self.n else None
+
+
+def translate(sql: str) -> Tuple[str, List[str]]:
+    """
+    MySQL statement -> (SQLite statement, follow-up statements).
+    """
+    extra: List[str] = []
+    out = sql.replace("%s", "?")
+    out = re.sub(r"\bINSERT IGNORE INTO\b", "INSERT OR IGNORE INTO", out, flags=re.I)
+
+    m = _UPDATE_RE.search(out)
+    if m:
+        sets = _VALUES_FN_RE.sub(lambda v: "excluded." + v.group(1), m.group(1))
+        out = out[: m.start()] + "ON CONFLICT DO UPDATE SET " + sets
+
+    t = _TABLE_RE.search(out)
+    if t:
+        table = t.group(1)
+        out = re.sub(r"\b(?:BIG)?INT AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT", out, flags=re.I)
+
+        def index(mi: "re.Match[str]") -> str:
+            if mi.group(1):
+                return f", UNIQUE ({mi.group(3)})"
+            extra.append(
+                f"CREATE INDEX IF NOT EXISTS `{table}__{mi.group(2)}` ON `{table}` ({mi.group(3)})"
+            )
+            return ""
+
+        out = _INDEX_RE.sub(index, out)
+    return out, extra
+
+
+class StandInCursor:
+    def __init__(self, conn: "StandInConnection"):
+        self._conn = conn
+        self._cur = conn._db.cursor()
+        self._rows: Optional[List[Tuple[Any, ...]]] = None
+
+    @property
+    def with_rows(self) -> bool:
+        return self._rows is not None or self._cur.description is not None
+
+    @property
+    def rowcount(self) -> int:
+        return self._cur.rowcount
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        self._rows = None
+        if "information_schema.columns" in sql:
+            info = self._conn._db.execute(f"PRAGMA table_info(`{params[0]}`)").fetchall()
+            self._rows = [(r[1],) for r in info]
+            return
+        stmt, extra = translate(sql)
+        with self._conn._lock:
+            self._cur.execute(stmt, tuple(params))
+            for follow in extra:
+                self._conn._db.execute(follow)
+
+    def executemany(self, sql: str, rows: Sequence[Sequence[Any]]) -> None:
+        self._rows = None
+        stmt, _ = translate(sql)
+        with self._conn._lock:
+            self._cur.executemany(stmt, [tuple(r) for r in rows])
+
+    def fetchall(self) -> List[Tuple[Any, ...]]:
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        return [tuple(r) for r in self._cur.fetchall()]
+
+    def fetchmany(self, size: int = 1) -> List[Tuple[Any, ...]]:
+        if self._rows is not None:
+            rows, self._rows = self._rows[:size], self._rows[size:]
+            return rows
+        return [tuple(r) for r in self._cur.fetchmany(size)]
+
+    def fetchone(self) -> Optional[Tuple[Any, ...]]:
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self) -> None:
+        self._cur.close()
+
+
+class StandInConnection:
+    """
+    One handle on the stand-in database, shaped like a mysql-connector
+    connection.
+    """
+
+    def __init__(self, path: str):
+        self._db = sqlite3.connect(
+            path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            timeout=10,
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.create_aggregate("STDDEV_POP", 1, _StddevPop)
+        self._lock = threading.Lock()
+
+    def cursor(self, *args: Any, **kwargs: Any) -> StandInCursor:
+        return StandInCursor(self)
+
+    def commit(self) -> None:
+        self._db.commit()
+
+    def rollback(self) -> None:
+        self._db.rollback()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def is_connected(self) -> bool:
+        return True
+
+
+class StandIn:
+    """
+    A WAL-mode SQLite file plus a `connect` factory with db.connect's
+    signature. A file (not shared-cache memory) so the write-behind thread
+    and request handlers can use separate connections concurrently.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._anchor = StandInConnection(path)
+
+    def connect(self, *args: Any, **kwargs: Any) -> StandInConnection:
+        return StandInConnection(self.path)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        cur = self._anchor.cursor()
+        cur.execute(sql, params)
+        self._anchor.commit()
+        cur.close()
+
+    def create_dissertation_table(self) -> None:
+        cols = ", ".join(
+            f"`{c}` {'DATE' if c in ('fiscalDateEnding', 'pull_date') else 'TEXT'}"
+            for c in DISSERTATION_COLUMNS
+        )
+        keys = ", ".join(f"`{c}`" for c in KEY_COLUMNS)
+        self.execute(
+            f"CREATE TABLE IF NOT EXISTS `{DISSERTATION_TABLE}` ({cols}, "
+            f"UNIQUE KEY `idx_symbol_fiscalDate` ({keys}))"
+        )
+
+    def seed_lookup_tables(self, business_types: Sequence[str], industries: Sequence[Tuple[str, str]]) -> None:
+        self.execute(
+            "CREATE TABLE IF NOT EXISTS `business_types` ("
+            "`id` INT AUTO_INCREMENT PRIMARY KEY, `display_name` VARCHAR(255))"
+        )
+        self.execute(
+            "CREATE TABLE IF NOT EXISTS `industry_types` ("
+            "`id` INT AUTO_INCREMENT PRIMARY KEY, `naics_code` VARCHAR(10), `display_name` VARCHAR(255))"
+        )
+        cur = self._anchor.cursor()
+        cur.executemany("INSERT INTO `business_types` (`display_name`) VALUES (%s)", [(b,) for b in business_types])
+        cur.executemany(
+            "INSERT INTO `industry_types` (`naics_code`, `display_name`) VALUES (%s, %s)", list(industries)
+        )
+        self._anchor.commit()
+        cur.close()
+
+    def count(self, table: str) -> int:
+        cur = self._anchor.cursor()
+        cur.execute(f"SELECT COUNT(*) FROM `{table}`")
+        n = cur.fetchone()[0]
+        cur.close()
+        return int(n)
+
+    def close(self) -> None:
+        self._anchor.close()
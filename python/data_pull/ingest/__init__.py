@@ -0,0 +1,45 @@
+"""
+Shared ingest framework for the macro / market data sources.
+
+Replaces the serial R loaders (FRED, BLS, Census, earnings calendar) with
+pluggable source adapters driven by one parallel engine:
+
+    python -m data_pull.ingest fred bls census
+    python -m data_pull.ingest fred --fixtures fixtures/ --dry-run
+
+Recurring runs go through the scheduler (see scheduler.py):
+
+    python -m data_pull.ingest.scheduler
+
+Run from the `python/` directory, like api.py.
+"""
+
+from .engine import IngestEngine, RunResult, ensure_run_log, log_run
+from .sources import (
+    SOURCES,
+    BlsSource,
+    CensusSource,
+    EarningsCalendarSource,
+    FredSource,
+    SourceAdapter,
+    SourceError,
+)
+from .transport import FixtureTransport, HttpTransport, RateLimiter, get_rate_limiter
+
+__all__ = [
+    "SOURCES",
+    "BlsSource",
+    "CensusSource",
+    "EarningsCalendarSource",
+    "FixtureTransport",
+    "FredSource",
+    "HttpTransport",
+    "IngestEngine",
+    "RateLimiter",
+    "RunResult",
+    "SourceAdapter",
+    "SourceError",
+    "ensure_run_log",
+    "get_rate_limiter",
+    "log_run",
+]
@@ -0,0 +1,76 @@
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+import db
+
+from .engine import STATUS_SUCCESS, IngestEngine
+from .scheduler import AdvisoryLock, BudgetedTransport, default_budgets, job_lock_name
+from .sources import SOURCES
+from .transport import FixtureTransport, HttpTransport
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m data_pull.ingest",
+        description="Refresh macro and market data sources in parallel.",
+    )
+    parser.add_argument(
+        "sources", nargs="*", default=["fred", "bls", "census"],
+        help=f"sources to run ({', '.join(SOURCES)}); default: fred bls census",
+    )
+    parser.add_argument("--fixtures", help="serve responses from this fixture directory")
+    parser.add_argument("--record", action="store_true", help="record missing fixtures from the live APIs")
+    parser.add_argument("--dry-run", action="store_true", help="fetch and parse only; skip MySQL")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="[ingest] %(message)s")
+    db.load_env()
+
+    unknown = [s for s in args.sources if s not in SOURCES]
+    if unknown:
+        print(f"Unknown source(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    if not args.dry_run:
+        missing = db.missing_mysql_env()
+        if missing:
+            print(f"Missing required variables: {', '.join(missing)}", file=sys.stderr)
+            return 2
+
+    # The same per-source locks and daily budgets as the scheduler, so a
+    # manual run never overlaps a scheduled one or overdraws the quota.
+    names = list(dict.fromkeys(args.sources))
+    locks = []
+    if not args.dry_run:
+        for name in list(names):
+            lock = AdvisoryLock(db.connect, job_lock_name(name))
+            if lock.acquire():
+                locks.append(lock)
+            else:
+                print(f"{name}: skipped, a scheduled or manual run holds the lock", file=sys.stderr)
+                names.remove(name)
+
+    budgets = default_budgets(None if args.dry_run else db.connect)
+    if args.fixtures:
+        transport = FixtureTransport(args.fixtures, record=args.record)
+    else:
+        transport = BudgetedTransport(HttpTransport(), budgets)
+
+    try:
+        engine = IngestEngine(transport, batch_size=args.batch_size, dry_run=args.dry_run)
+        results = engine.run([SOURCES[name]() for name in names])
+    finally:
+        for lock in locks:
+            lock.release()
+        for budget in budgets.values():
+            budget.close()
+    for r in results:
+        print(r.summary())
+    ok = len(names) == len(set(args.sources)) and all(r.status == STATUS_SUCCESS for r in results)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,231 @@
+"""
+Parallel ingest engine.
+
+Sources run side by side; within a source, work units are fetched on a
+bounded thread pool while the source's own thread upserts completed rows in
+batches. Sources with a validator have each batch checked first; failing
+rows go to the source's quarantine table. Every source run is recorded in
+`ingest_run_log`, which follows the layout of `earnings_calendar_log`.
+"""
+
+import datetime as dt
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import db
+
+from .sources import SourceAdapter
+from .validation import QUARANTINE_SQL, write_quarantine
+
+logger = logging.getLogger(__name__)
+
+
+RUN_LOG_SQL = (
+    "CREATE TABLE IF NOT EXISTS `ingest_run_log` ("
+    "`id` INT AUTO_INCREMENT PRIMARY KEY,"
+    "`source` VARCHAR(50),"
+    "`run_timestamp` DATETIME,"
+    "`records_inserted` INT,"
+    "`runtime_seconds` DOUBLE,"
+    "`status` VARCHAR(20),"
+    "`units_total` INT,"
+    "`units_failed` INT,"
+    "`error_message` VARCHAR(1000),"
+    "`records_quarantined` INT,"
+    "KEY `idx_source_ts` (`source`, `run_timestamp`))"
+)
+
+STATUS_SUCCESS = "SUCCESS"
+STATUS_PARTIAL = "PARTIAL"
+STATUS_ERROR = "ERROR"
+
+
+class RunResult:
+    def __init__(self, source: str):
+        self.source = source
+        self.started_at = dt.datetime.now()
+        self.rows = 0
+        self.quarantined = 0
+        self.units_total = 0
+        self.failures: List[Tuple[Any, str]] = []
+        self.runtime_seconds = 0.0
+        self.status = STATUS_SUCCESS
+        self.error: Optional[str] = None
+
+    def summary(self) -> str:
+        line = (
+            f"{self.source}: {self.status} rows={self.rows} "
+            f"quarantined={self.quarantined} "
+            f"units={self.units_total} failed={len(self.failures)} "
+            f"({self.runtime_seconds:.1f}s)"
+        )
+        if self.error:
+            line += f" error={self.error}"
+        return line
+
+
+def ensure_run_log(conn: Any) -> None:
+    cur = conn.cursor()
+    try:
+        cur.execute(RUN_LOG_SQL)
+        # Logs created before quarantine counts were recorded.
+        if "records_quarantined" not in {c.lower() for c in db.existing_columns(conn, "ingest_run_log")}:
+            cur.execute("ALTER TABLE `ingest_run_log` ADD COLUMN `records_quarantined` INT")
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def log_run(conn: Any, result: RunResult) -> None:
+    error = result.error
+    if not error and result.failures:
+        error = "; ".join(f"{u}: {msg}" for u, msg in result.failures[:5])
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "INSERT INTO `ingest_run_log` "
+            "(source, run_timestamp, records_inserted, runtime_seconds, status, "
+            "units_total, units_failed, error_message, records_quarantined) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            (
+                result.source,
+                result.started_at.replace(microsecond=0),
+                result.rows,
+                round(result.runtime_seconds, 3),
+                result.status,
+                result.units_total,
+                len(result.failures),
+                error[:1000] if error else None,
+                result.quarantined,
+            ),
+        )
+        conn.commit()
+    finally:
+        cur.close()
+
+
+class IngestEngine:
+    """
+    Runs source adapters against a transport and (unless `dry_run`) MySQL.
+
+    `connect` is called once per source so each source thread owns its
+    connection; mysql-connector connections are not thread-safe.
+    """
+
+    def __init__(
+        self,
+        transport: Any,
+        connect: Optional[Callable[[], Any]] = None,
+        batch_size: int = 500,
+        dry_run: bool = False,
+        log_runs: bool = True,
+    ):
+        self.transport = transport
+        self.connect = connect or db.connect
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        # The scheduler records its own run history and turns this off.
+        self.log_runs = log_runs
+
+    def run(self, sources: Sequence[SourceAdapter]) -> List[RunResult]:
+        if len(sources) == 1:
+            return [self.run_source(sources[0])]
+        with ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="ingest") as pool:
+            return list(pool.map(self.run_source, sources))
+
+    def run_source(self, source: SourceAdapter) -> RunResult:
+        result = RunResult(source.name)
+        start = time.monotonic()
+        conn = None
+        try:
+            if not self.dry_run:
+                conn = self.connect()
+                self._ensure_tables(conn, source)
+            source.prepare(self.transport, conn)
+            self._fetch_and_store(conn, source, result)
+        except Exception as ex:
+            logger.exception("%s: run failed", source.name)
+            result.status = STATUS_ERROR
+            result.error = str(ex)
+        result.runtime_seconds = time.monotonic() - start
+
+        if result.status != STATUS_ERROR and result.failures:
+            all_failed = len(result.failures) >= result.units_total
+            result.status = STATUS_ERROR if all_failed else STATUS_PARTIAL
+
+        if conn is not None:
+            if self.log_runs:
+                try:
+                    log_run(conn, result)
+                except Exception as ex:
+                    print(f"{source.name}: failed to write ingest_run_log: {ex}", file=sys.stderr)
+            try:
+                conn.close()
+            except Exception:
+                pass
+        return result
+
+    def _ensure_tables(self, conn: Any, source: SourceAdapter) -> None:
+        ensure_run_log(conn)
+        cur = conn.cursor()
+        try:
+            if source.create_sql:
+                cur.execute(source.create_sql)
+            if source.quarantine_table:
+                cur.execute(QUARANTINE_SQL.format(table=source.quarantine_table))
+            if source.ensure_columns:
+                present = {c.lower() for c in db.existing_columns(conn, source.table)}
+                for column, ddl in source.ensure_columns.items():
+                    if column.lower() not in present:
+                        cur.execute(
+                            f"ALTER TABLE {db.quote_ident(source.table)} "
+                            f"ADD COLUMN {db.quote_ident(column)} {ddl}"
+                        )
+            conn.commit()
+        finally:
+            cur.close()
+
+    def _fetch_and_store(self, conn: Any, source: SourceAdapter, result: RunResult) -> None:
+        units = list(source.units())
+        result.units_total = len(units)
+        buffer: List[Tuple[Any, ...]] = []
+
+        def flush() -> None:
+            if not buffer:
+                return
+            rows: List[Tuple[Any, ...]] = buffer
+            if source.validator is not None:
+                checked = source.validator.validate(source.columns, buffer)
+                rows = checked.accepted
+                result.quarantined += len(checked.quarantined)
+                if conn is not None and source.quarantine_table:
+                    write_quarantine(
+                        conn, source.quarantine_table, source.name,
+                        source.columns, checked.quarantined,
+                    )
+            if conn is not None:
+                db.upsert_rows(
+                    conn, source.table, source.columns, rows,
+                    source.update_columns, self.batch_size,
+                )
+            result.rows += len(rows)
+            buffer.clear()
+
+        workers = max(1, min(source.max_concurrency, len(units) or 1))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=source.name) as pool:
+            futures = {pool.submit(source.fetch, u, self.transport): u for u in units}
+            for fut in as_completed(futures):
+                unit = futures[fut]
+                try:
+                    rows = fut.result()
+                except Exception as ex:
+                    logger.warning("%s: unit %s failed: %s", source.name, unit, ex)
+                    result.failures.append((unit, str(ex)))
+                    continue
+                buffer.extend(rows)
+                if len(buffer) >= self.batch_size:
+                    flush()
+        flush()
@@ -0,0 +1,596 @@
+"""
+In-process scheduler for recurring ingest jobs.
+
+Replaces r/scheduler_load_earnings_calendar.R and manual runs of
+pull_ticker_industry_sector_official.py:
+
+- cron-style schedules (minute hour day-of-month month day-of-week)
+- random start jitter so jobs sharing a minute don't hit an API together
+- per-provider concurrency limits and daily request budgets, counted in
+  `ingest_quota_usage` so they survive restarts and cover the jobs run as
+  subprocesses
+- MySQL advisory locks (GET_LOCK) so two scheduler processes, or a manual
+  run (`python -m data_pull.ingest`, the ticker metadata script), never
+  execute the same job at once
+- run history (duration, rows, status) in `ingest_run_log`
+
+    python -m data_pull.ingest.scheduler            # run forever
+    python -m data_pull.ingest.scheduler --list
+    python -m data_pull.ingest.scheduler --once fred
+"""
+
+import argparse
+import datetime as dt
+import logging
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import db
+
+from .engine import (
+    STATUS_ERROR,
+    STATUS_SUCCESS,
+    IngestEngine,
+    RunResult,
+    ensure_run_log,
+    log_run,
+)
+from .sources import SOURCES
+from .transport import HttpTransport
+
+logger = logging.getLogger(__name__)
+
+STATUS_SKIPPED = "SKIPPED"
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+# ------------------------------------------------
+# Cron schedules
+# ------------------------------------------------
+class CronSchedule:
+    """
+    Five-field cron expression supporting `*`, `a-b`, `*/n`, `a-b/n` and
+    comma lists. Day-of-week uses 0-6 with 0 = Sunday (7 is accepted too).
+    """
+
+    FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+    def __init__(self, expr: str):
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        values = [self._parse(p, lo, hi) for p, (_, lo, hi) in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        self.weekdays = {d % 7 for d in weekdays}
+        # Standard cron: when both day fields are restricted, either may match.
+        self.day_any = parts[2] == "*"
+        self.weekday_any = parts[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> Set[int]:
+        out: Set[int] = set()
+        for item in field.split(","):
+            step = 1
+            if "/" in item:
+                item, step_s = item.split("/", 1)
+                step = int(step_s)
+                if step <= 0:
+                    raise ValueError(f"invalid step in {field!r}")
+            if item == "*":
+                start, end = lo, hi
+            elif "-" in item:
+                a, b = item.split("-", 1)
+                start, end = int(a), int(b)
+            else:
+                start = int(item)
+                end = hi if step > 1 else start
+            if start < lo or end > hi or start > end:
+                raise ValueError(f"value out of range in {field!r}")
+            out.update(range(start, end + 1, step))
+        return out
+
+    def _day_matches(self, t: dt.datetime) -> bool:
+        dom = t.day in self.days
+        dow = (t.weekday() + 1) % 7 in self.weekdays
+        if self.day_any and self.weekday_any:
+            return True
+        if self.day_any:
+            return dow
+        if self.weekday_any:
+            return dom
+        return dom or dow
+
+    def next_after(self, after: dt.datetime) -> dt.datetime:
+        t = after.replace(second=0, microsecond=0) + dt.timedelta(minutes=1)
+        # Walk by the coarsest mismatching field; bounded to ~5 years.
+        limit = after + dt.timedelta(days=366 * 5)
+        while t <= limit:
+            if t.month not in self.months:
+                year = t.year + (t.month == 12)
+                month = t.month % 12 + 1
+                t = t.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(t):
+                t = (t + dt.timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if t.hour not in self.hours:
+                t = (t + dt.timedelta(hours=1)).replace(minute=0)
+                continue
+            if t.minute not in self.minutes:
+                t += dt.timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"cron expression never fires: {self.expr!r}")
+
+
+# ------------------------------------------------
+# Quotas
+# ------------------------------------------------
+QUOTA_SQL = (
+    "CREATE TABLE IF NOT EXISTS `ingest_quota_usage` ("
+    "`provider` VARCHAR(32) NOT NULL,"
+    "`day` DATE NOT NULL,"
+    "`used` INT NOT NULL,"
+    "PRIMARY KEY (`provider`, `day`))"
+)
+
+
+class QuotaBudget:
+    """
+    Requests allowed per provider per calendar day (None = unlimited).
+
+    With `connect`, usage is a row per (provider, day) in
+    `ingest_quota_usage`, charged with a conditional UPDATE so every process
+    sharing the database draws from the same allowance. Without it usage is
+    counted in memory.
+    """
+
+    def __init__(self, provider: str, per_day: Optional[int], connect: Optional[Callable[..., Any]] = None):
+        self.provider = provider
+        self.per_day = per_day
+        self.connect = connect
+        self._conn: Optional[Any] = None
+        self._day = dt.date.today()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def _roll(self) -> None:
+        today = dt.date.today()
+        if today != self._day:
+            self._day = today
+            self._used = 0
+
+    def _execute(self, sql: str, params: Tuple[Any, ...]) -> Any:
+        """Run on the budget's own autocommit connection; reconnect once if it dropped."""
+        for attempt in range(2):
+            try:
+                if self._conn is None:
+                    self._conn = self.connect(autocommit=True)
+                    cur = self._conn.cursor()
+                    cur.execute(QUOTA_SQL)
+                    cur.close()
+                cur = self._conn.cursor()
+                cur.execute(sql, params)
+                self._conn.commit()
+                return cur
+            except Exception:
+                self.close()
+                if attempt:
+                    raise
+
+    def _stored_used(self) -> int:
+        cur = self._execute(
+            "SELECT `used` FROM `ingest_quota_usage` WHERE `provider` = %s AND `day` = %s",
+            (self.provider, self._day),
+        )
+        row = cur.fetchone()
+        cur.close()
+        return int(row[0]) if row else 0
+
+    def remaining(self) -> Optional[int]:
+        with self._lock:
+            self._roll()
+            if self.per_day is None:
+                return None
+            used = self._used if self.connect is None else self._stored_used()
+            return max(0, self.per_day - used)
+
+    def consume(self, n: int = 1) -> None:
+        with self._lock:
+            self._roll()
+            if self.connect is None:
+                if self.per_day is not None and self._used + n > self.per_day:
+                    raise QuotaExceeded(f"{self.provider}: daily budget of {self.per_day} requests exhausted")
+                self._used += n
+                return
+
+            cur = self._execute(
+                "INSERT IGNORE INTO `ingest_quota_usage` (`provider`, `day`, `used`) VALUES (%s, %s, 0)",
+                (self.provider, self._day),
+            )
+            cur.close()
+            if self.per_day is None:
+                cur = self._execute(
+                    "UPDATE `ingest_quota_usage` SET `used` = `used` + %s "
+                    "WHERE `provider` = %s AND `day` = %s",
+                    (n, self.provider, self._day),
+                )
+                cur.close()
+                return
+            cur = self._execute(
+                "UPDATE `ingest_quota_usage` SET `used` = `used` + %s "
+                "WHERE `provider` = %s AND `day` = %s AND `used` + %s <= %s",
+                (n, self.provider, self._day, n, self.per_day),
+            )
+            charged = cur.rowcount
+            cur.close()
+            if charged == 0:
+                raise QuotaExceeded(f"{self.provider}: daily budget of {self.per_day} requests exhausted")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+class BudgetedTransport:
+    """
+    Charges every HTTP attempt, retries included, against its provider's
+    QuotaBudget through the inner transport's `before_attempt` hook.
+    Responses replayed from fixtures are not charged.
+    """
+
+    def __init__(self, inner: Any, budgets: Dict[str, QuotaBudget]):
+        self.inner = inner
+        self.budgets = budgets
+
+    def request(self, provider: str, *args: Any, **kwargs: Any) -> Any:
+        budget = self.budgets.get(provider)
+        if budget is not None:
+            kwargs["before_attempt"] = budget.consume
+        return self.inner.request(provider, *args, **kwargs)
+
+
+def _env_int(name: str) -> Optional[int]:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        return None
+
+
+def default_budgets(connect: Optional[Callable[..., Any]] = None) -> Dict[str, QuotaBudget]:
+    # QUOTA_<PROVIDER>_PER_DAY overrides; BLS v2 documents 500 queries/day.
+    # Alpha Vantage is shared by the earnings job and the ticker metadata
+    # script, so set QUOTA_ALPHAVANTAGE_PER_DAY to the key's allowance.
+    defaults = {"fred": None, "bls": 500, "census": None, "alphavantage": None}
+    budgets = {}
+    for provider, default in defaults.items():
+        per_day = _env_int(f"QUOTA_{provider.upper()}_PER_DAY")
+        budgets[provider] = QuotaBudget(provider, per_day if per_day is not None else default, connect)
+    return budgets
+
+
+# ------------------------------------------------
+# Jobs
+# ------------------------------------------------
+# Set for command jobs: the lock the scheduler already holds on their behalf.
+JOB_LOCK_ENV = "INGEST_JOB_LOCK_HELD"
+
+
+def job_lock_name(name: str) -> str:
+    return f"ingest_job:{name}"
+
+
+class Job:
+    """
+    `action(transport)` performs the work and returns (rows, status, error).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        schedule: str,
+        provider: str,
+        action: Callable[[Any], Tuple[int, str, Optional[str]]],
+        jitter_seconds: float = 60,
+    ):
+        self.name = name
+        self.schedule = CronSchedule(schedule)
+        self.provider = provider
+        self.action = action
+        self.jitter_seconds = jitter_seconds
+        self.lock_name = job_lock_name(name)
+        self.next_run: Optional[dt.datetime] = None
+
+
+def ingest_job_action(source_name: str) -> Callable[[Any], Tuple[int, str, Optional[str]]]:
+    def run(transport: Any) -> Tuple[int, str, Optional[str]]:
+        engine = IngestEngine(transport, log_runs=False)
+        result = engine.run_source(SOURCES[source_name]())
+        error = result.error
+        if not error and result.failures:
+            error = "; ".join(f"{u}: {msg}" for u, msg in result.failures[:5])
+        return result.rows, result.status, error
+    return run
+
+
+def command_job_action(
+    argv: List[str],
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> Callable[[Any], Tuple[int, str, Optional[str]]]:
+    """
+    Run a script as a subprocess. Its HTTP calls don't pass through the
+    scheduler's transport, so the script charges `ingest_quota_usage` itself.
+    """
+    def run(transport: Any) -> Tuple[int, str, Optional[str]]:
+        proc = subprocess.run(argv, cwd=cwd, capture_output=True, text=True, env={**os.environ, **(env or {})})
+        if proc.returncode == 0:
+            return 0, STATUS_SUCCESS, None
+        tail = (proc.stderr or proc.stdout or "").strip()[-500:]
+        return 0, STATUS_ERROR, f"exit {proc.returncode}: {tail}"
+    return run
+
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def default_jobs() -> List[Job]:
+    """Schedules may be overridden with SCHEDULE_<JOB> (a cron expression)."""
+    specs = [
+        ("fred", "0 6 * * *", "fred", ingest_job_action("fred")),
+        ("bls", "30 6 * * *", "bls", ingest_job_action("bls")),
+        ("census", "0 7 1 * *", "census", ingest_job_action("census")),
+        ("earnings", "0 5 * * 1-5", "alphavantage", ingest_job_action("earnings")),
+        (
+            "ticker_metadata",
+            "0 3 * * 0",
+            "alphavantage",
+            command_job_action(
+                [sys.executable, "-m", "data_pull.pull_ticker_industry_sector_official"],
+                cwd=PYTHON_DIR,
+                env={JOB_LOCK_ENV: job_lock_name("ticker_metadata")},
+            ),
+        ),
+    ]
+    jobs = []
+    for name, schedule, provider, action in specs:
+        schedule = (os.getenv(f"SCHEDULE_{name.upper()}") or schedule).strip()
+        jobs.append(Job(name, schedule, provider, action))
+    return jobs
+
+
+# ------------------------------------------------
+# Advisory locks
+# ------------------------------------------------
+class AdvisoryLock:
+    """
+    MySQL named lock held on a dedicated connection for the job's duration.
+    The server releases it automatically if the process dies.
+    """
+
+    def __init__(self, connect: Callable[..., Any], name: str):
+        self.connect = connect
+        self.name = name
+        self.conn: Optional[Any] = None
+
+    def acquire(self) -> bool:
+        self.conn = self.connect(autocommit=True)
+        cur = self.conn.cursor()
+        try:
+            cur.execute("SELECT GET_LOCK(%s, 0)", (self.name,))
+            (got,) = cur.fetchone()
+        finally:
+            cur.close()
+        if got != 1:
+            self._close()
+            return False
+        return True
+
+    def release(self) -> None:
+        if self.conn is None:
+            return
+        try:
+            cur = self.conn.cursor()
+            cur.execute("SELECT RELEASE_LOCK(%s)", (self.name,))
+            cur.fetchone()
+            cur.close()
+        except Exception:
+            pass
+        self._close()
+
+    def _close(self) -> None:
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+
+
+# ------------------------------------------------
+# Scheduler
+# ------------------------------------------------
+class Scheduler:
+    def __init__(
+        self,
+        jobs: List[Job],
+        budgets: Optional[Dict[str, QuotaBudget]] = None,
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        max_workers: int = 4,
+        connect: Callable[..., Any] = db.connect,
+        transport: Optional[Any] = None,
+    ):
+        self.jobs = {j.name: j for j in jobs}
+        self.budgets = budgets if budgets is not None else default_budgets(connect)
+        concurrency = provider_concurrency or {}
+        self._provider_slots = {
+            j.provider: threading.BoundedSemaphore(concurrency.get(j.provider, 1))
+            for j in jobs
+        }
+        self.connect = connect
+        self.transport = BudgetedTransport(transport or HttpTransport(), self.budgets)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sched")
+        self._running: Set[str] = set()
+        self._running_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run_job(self, name: str, jitter: bool = True) -> RunResult:
+        job = self.jobs[name]
+        result = RunResult(job.name)
+        if jitter and job.jitter_seconds > 0:
+            time.sleep(random.uniform(0, job.jitter_seconds))
+
+        budget = self.budgets.get(job.provider)
+        if budget is not None and budget.remaining() == 0:
+            result.status = STATUS_SKIPPED
+            result.error = f"{job.provider} daily quota exhausted"
+            self._record(result)
+            return result
+
+        with self._provider_slots[job.provider]:
+            lock = AdvisoryLock(self.connect, job.lock_name)
+            try:
+                acquired = lock.acquire()
+            except Exception as ex:
+                result.status = STATUS_ERROR
+                result.error = f"advisory lock failed: {ex}"
+                self._record(result)
+                return result
+            if not acquired:
+                result.status = STATUS_SKIPPED
+                result.error = "another run holds the lock"
+                self._record(result)
+                return result
+
+            start = time.monotonic()
+            try:
+                result.rows, result.status, result.error = job.action(self.transport)
+            except Exception as ex:
+                logger.exception("%s: job failed", job.name)
+                result.status = STATUS_ERROR
+                result.error = str(ex)
+            finally:
+                result.runtime_seconds = time.monotonic() - start
+                lock.release()
+
+        self._record(result)
+        return result
+
+    def _record(self, result: RunResult) -> None:
+        logger.info(result.summary())
+        try:
+            conn = self.connect()
+        except Exception as ex:
+            print(f"{result.source}: failed to write ingest_run_log: {ex}", file=sys.stderr)
+            return
+        try:
+            ensure_run_log(conn)
+            log_run(conn, result)
+        except Exception as ex:
+            print(f"{result.source}: failed to write ingest_run_log: {ex}", file=sys.stderr)
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _dispatch(self, job: Job) -> None:
+        with self._running_lock:
+            if job.name in self._running:
+                logger.warning("%s: previous run still in progress, skipping", job.name)
+                return
+            self._running.add(job.name)
+
+        def task() -> None:
+            try:
+                self.run_job(job.name)
+            finally:
+                with self._running_lock:
+                    self._running.discard(job.name)
+
+        self._pool.submit(task)
+
+    def run_forever(self) -> None:
+        now = dt.datetime.now()
+        for job in self.jobs.values():
+            job.next_run = job.schedule.next_after(now)
+            logger.info("%s: next run %s", job.name, job.next_run)
+
+        while not self._stop.is_set():
+            now = dt.datetime.now()
+            for job in self.jobs.values():
+                if job.next_run is not None and job.next_run <= now:
+                    self._dispatch(job)
+                    job.next_run = job.schedule.next_after(now)
+            upcoming = min(j.next_run for j in self.jobs.values() if j.next_run)
+            wait = max(1.0, (upcoming - dt.datetime.now()).total_seconds())
+            self._stop.wait(min(wait, 60))
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._pool.shutdown(wait=True)
+        for budget in self.budgets.values():
+            budget.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m data_pull.ingest.scheduler",
+        description="Run recurring ingest jobs.",
+    )
+    parser.add_argument("--list", action="store_true", help="show jobs and their next run")
+    parser.add_argument("--once", metavar="JOB", help="run one job now (no jitter) and exit")
+    parser.add_argument("--max-workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="[scheduler] %(message)s")
+    db.load_env()
+
+    jobs = default_jobs()
+    if args.list:
+        now = dt.datetime.now()
+        for job in jobs:
+            print(f"{job.name:<16} {job.schedule.expr:<14} {job.provider:<13} next={job.schedule.next_after(now)}")
+        return 0
+
+    missing = db.missing_mysql_env()
+    if missing:
+        print(f"Missing required variables: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    scheduler = Scheduler(jobs, max_workers=args.max_workers)
+    if args.once:
+        if args.once not in scheduler.jobs:
+            print(f"Unknown job: {args.once}", file=sys.stderr)
+            return 2
+        result = scheduler.run_job(args.once, jitter=False)
+        print(result.summary())
+        return 0 if result.status == STATUS_SUCCESS else 1
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+"""
+HTTP transports and shared rate limiting for ingest sources.
+
+Adapters never call `requests` directly; they go through a transport so a
+run can be pointed at recorded fixture responses instead of the live APIs.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from outbound import RETRY_STATUSES, ResilientClient, get_client
+
+
+# ------------------------------------------------
+# Rate limiting
+# ------------------------------------------------
+class RateLimiter:
+    """
+    Thread-safe token bucket: `rate` requests per second, bursting to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._last) * self.rate
+                )
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def _alpha_rate() -> float:
+    # Mirrors API_SLEEP_SECONDS used by the serial loaders (default 2s, cap 15s).
+    try:
+        sleep = float(os.getenv("API_SLEEP_SECONDS", "2"))
+    except ValueError:
+        sleep = 2.0
+    sleep = min(max(sleep, 0.05), 15)
+    return 1.0 / sleep
+
+
+# Published per-key limits, kept slightly under the ceiling.
+DEFAULT_RATES: Dict[str, Dict[str, float]] = {
+    "fred": {"rate": 1.8, "burst": 5},        # 120 requests / minute
+    "bls": {"rate": 4.0, "burst": 4},         # 50 requests / 10 seconds
+    "census": {"rate": 5.0, "burst": 10},
+    "alphavantage": {"rate": _alpha_rate(), "burst": 1},
+}
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Process-wide limiter per provider, shared by every adapter and thread
+    that talks to that provider's API key.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            cfg = DEFAULT_RATES.get(provider, {"rate": 1.0, "burst": 1})
+            limiter = RateLimiter(cfg["rate"], int(cfg["burst"]))
+            _limiters[provider] = limiter
+        return limiter
+
+
+# ------------------------------------------------
+# Responses and transports
+# ------------------------------------------------
+class TransportResponse:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+
+class HttpTransport:
+    """
+    Live transport over the shared outbound client, which applies the
+    provider's timeouts, jittered retries, circuit breaker and bulkhead. The
+    provider's rate limiter gates every attempt, retries included.
+
+    `timeout` / `retries` override the provider policies for this transport
+    only (it then gets its own client, and its own breaker state).
+
+    `fixture_key` is accepted (and ignored) so adapters can use the same call
+    signature against FixtureTransport. `before_attempt` runs ahead of the
+    rate limiter on every attempt (the scheduler charges quota with it).
+    """
+
+    RETRY_STATUS = RETRY_STATUSES
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        pool_size: int = 16,
+        client: Optional[ResilientClient] = None,
+    ):
+        overrides: Dict[str, Any] = {}
+        if timeout is not None:
+            overrides["read_timeout"] = timeout
+        if retries is not None:
+            overrides["retries"] = retries
+        if client is None:
+            client = ResilientClient(overrides=overrides, pool_size=pool_size) if overrides else get_client()
+        self.client = client
+
+    def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Any] = None,
+        fixture_key: Optional[str] = None,
+        before_attempt: Optional[Callable[[], Any]] = None,
+    ) -> TransportResponse:
+        limiter = get_rate_limiter(provider)
+
+        def gate() -> None:
+            if before_attempt is not None:
+                before_attempt()
+            limiter.acquire()
+
+        resp = self.client.request(
+            provider, method, url, params=params, json=json_body, before_attempt=gate
+        )
+        return TransportResponse(resp.status_code, resp.text)
+
+
+class FixtureTransport:
+    """
+    Serves responses from `<directory>/<fixture_key>.json|.csv|.txt`.
+
+    With `record=True` a missing fixture is fetched through a live
+    HttpTransport and written to disk, so a fixture set can be captured once
+    and replayed offline afterwards.
+    """
+
+    EXTENSIONS = (".json", ".csv", ".txt")
+
+    def __init__(self, directory: str, record: bool = False):
+        self.directory = directory
+        self.record = record
+        self._live: Optional[HttpTransport] = None
+
+    def _find(self, fixture_key: str) -> Optional[str]:
+        for ext in self.EXTENSIONS:
+            path = os.path.join(self.directory, fixture_key + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Any] = None,
+        fixture_key: Optional[str] = None,
+        before_attempt: Optional[Callable[[], Any]] = None,
+    ) -> TransportResponse:
+        if not fixture_key:
+            raise ValueError(f"{provider}: fixture_key is required for fixture runs")
+        path = self._find(fixture_key)
+        if path is not None:
+            with open(path, "r", encoding="utf-8") as fh:
+                return TransportResponse(200, fh.read())
+        if not self.record:
+            body = json.dumps({"error": "fixture_not_found", "key": fixture_key})
+            return TransportResponse(404, body)
+
+        if self._live is None:
+            self._live = HttpTransport()
+        resp = self._live.request(provider, method, url, params, json_body, before_attempt=before_attempt)
+        if resp.ok:
+            ext = ".csv" if (params or {}).get("datatype") == "csv" else ".json"
+            path = os.path.join(self.directory, fixture_key + ext)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(resp.text)
+        return resp
@@ -0,0 +1,326 @@
+"""
+Vectorized data-quality checks for financial statement batches.
+
+The validator runs column-wise over a whole upsert batch (one 2-D NumPy
+block) rather than row by row:
+
+- key check: symbol present, fiscalDateEnding parseable
+- type coercion: numeric fields parse or are a known placeholder
+- accounting identities within a relative tolerance
+- per-industry z-scores of size-free ratios against running baselines
+- duplicate (symbol, fiscalDateEnding) keys inside the batch (the last
+  row that passes every other check wins)
+
+Rows failing any check are returned separately so the engine can write
+them to a quarantine table instead of `dissertation_data`.
+"""
+
+import datetime as dt
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from financials.schema import NUMERIC_FIELDS, PLACEHOLDERS, coerce_numeric
+
+REASON_KEY = 1
+REASON_TYPE = 2
+REASON_IDENTITY = 4
+REASON_OUTLIER = 8
+REASON_DUPLICATE = 16
+
+REASON_NAMES = {
+    REASON_KEY: "missing_key",
+    REASON_TYPE: "non_numeric",
+    REASON_IDENTITY: "identity",
+    REASON_OUTLIER: "outlier",
+    REASON_DUPLICATE: "duplicate",
+}
+
+# total = sum(plus) - sum(minus)
+IDENTITIES: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...] = (
+    ("totalAssets", ("totalLiabilities", "totalShareholderEquity"), ()),
+    ("totalAssets", ("totalCurrentAssets", "totalNonCurrentAssets"), ()),
+    ("grossProfit", ("totalRevenue",), ("costOfRevenue",)),
+)
+
+# ratio name -> (numerator, denominator)
+OUTLIER_RATIOS: Dict[str, Tuple[str, str]] = {
+    "gross_margin": ("grossProfit", "totalRevenue"),
+    "net_margin": ("netIncome.x", "totalRevenue"),
+    "leverage": ("totalLiabilities", "totalAssets"),
+    "current_ratio": ("totalCurrentAssets", "totalCurrentLiabilities"),
+}
+
+QUARANTINE_SQL = (
+    "CREATE TABLE IF NOT EXISTS `{table}` ("
+    "`id` BIGINT AUTO_INCREMENT PRIMARY KEY,"
+    "`source` VARCHAR(50),"
+    "`symbol` VARCHAR(10),"
+    "`fiscalDateEnding` DATE NULL,"
+    "`reasons` VARCHAR(100),"
+    "`details` VARCHAR(1000),"
+    "`payload` JSON,"
+    "`quarantined_at` DATETIME,"
+    "KEY `idx_symbol_fiscalDate` (`symbol`, `fiscalDateEnding`))"
+)
+
+
+def reason_names(mask: int) -> str:
+    return ",".join(name for bit, name in REASON_NAMES.items() if mask & bit)
+
+
+class ValidationResult:
+    def __init__(self, accepted: List[Tuple[Any, ...]], quarantined: List[Tuple[Tuple[Any, ...], int, str]]):
+        self.accepted = accepted
+        # (original row, reason bitmask, detail text)
+        self.quarantined = quarantined
+
+
+class IndustryBaseline:
+    """
+    Running count / sum / sum of squares of each ratio per industry, so a
+    batch holding one company can still be compared with its peers.
+    """
+
+    def __init__(self, ratios: Sequence[str]):
+        self.ratios = tuple(ratios)
+        self.index: Dict[str, int] = {}
+        k = len(self.ratios)
+        self.n = np.zeros((0, k))
+        self.s = np.zeros((0, k))
+        self.ss = np.zeros((0, k))
+
+    def rows_for(self, industries: np.ndarray) -> np.ndarray:
+        """Map industry labels to baseline rows, adding unseen industries."""
+        out = np.empty(len(industries), dtype=np.int64)
+        new = [ind for ind in dict.fromkeys(industries.tolist()) if ind not in self.index]
+        if new:
+            for ind in new:
+                self.index[ind] = len(self.index)
+            grow = np.zeros((len(new), len(self.ratios)))
+            self.n = np.vstack([self.n, grow])
+            self.s = np.vstack([self.s, grow])
+            self.ss = np.vstack([self.ss, grow])
+        for i, ind in enumerate(industries.tolist()):
+            out[i] = self.index[ind]
+        return out
+
+    def batch_sums(self, groups: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-industry (count, sum, sum of squares) of `values`, NaN-aware."""
+        ok = np.isfinite(values)
+        v = np.where(ok, values, 0.0)
+        size = len(self.index)
+        shape = (size, values.shape[1])
+        n, s, ss = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+        for j in range(values.shape[1]):
+            n[:, j] = np.bincount(groups, weights=ok[:, j], minlength=size)
+            s[:, j] = np.bincount(groups, weights=v[:, j], minlength=size)
+            ss[:, j] = np.bincount(groups, weights=v[:, j] ** 2, minlength=size)
+        return n, s, ss
+
+    def add(self, n: np.ndarray, s: np.ndarray, ss: np.ndarray) -> None:
+        self.n += n
+        self.s += s
+        self.ss += ss
+
+    def seed(self, industry: str, ratio: str, count: float, mean: float, std: float) -> None:
+        g = self.rows_for(np.array([industry], dtype=object))[0]
+        j = self.ratios.index(ratio)
+        self.n[g, j] = count
+        self.s[g, j] = mean * count
+        self.ss[g, j] = (std ** 2 + mean ** 2) * count
+
+
+class FinancialsValidator:
+    """
+    `identity_tolerance` is relative to the identity total; `z_threshold`
+    applies only once an industry has `min_group` observations of a ratio.
+    """
+
+    def __init__(
+        self,
+        identity_tolerance: float = 0.02,
+        z_threshold: float = 6.0,
+        min_group: int = 30,
+        identities: Sequence[Tuple[str, Tuple[str, ...], Tuple[str, ...]]] = IDENTITIES,
+        ratios: Optional[Dict[str, Tuple[str, str]]] = None,
+    ):
+        self.identity_tolerance = identity_tolerance
+        self.z_threshold = z_threshold
+        self.min_group = min_group
+        self.identities = tuple(identities)
+        self.ratios = dict(ratios if ratios is not None else OUTLIER_RATIOS)
+        self.baseline = IndustryBaseline(list(self.ratios))
+
+    def seed_baseline(self, conn: Any, table: str = "dissertation_data") -> None:
+        """Initialise industry ratio statistics from rows already loaded."""
+        selects = ", ".join(
+            f"CAST(NULLIF(`{num}`, 'None') AS DOUBLE) / "
+            f"NULLIF(CAST(NULLIF(`{den}`, 'None') AS DOUBLE), 0) AS `{name}`"
+            for name, (num, den) in self.ratios.items()
+        )
+        aggs = ", ".join(
+            f"COUNT(`{name}`), AVG(`{name}`), STDDEV_POP(`{name}`)" for name in self.ratios
+        )
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"SELECT industry, {aggs} FROM (SELECT industry, {selects} FROM `{table}` "
+                "WHERE industry IS NOT NULL) r GROUP BY industry"
+            )
+            for row in cur.fetchall():
+                for j, name in enumerate(self.ratios):
+                    count, mean, std = row[1 + 3 * j: 4 + 3 * j]
+                    if count:
+                        self.baseline.seed(row[0], name, float(count), float(mean), float(std or 0))
+        finally:
+            cur.close()
+
+    def validate(self, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> ValidationResult:
+        if not rows:
+            return ValidationResult([], [])
+        col = {name: i for i, name in enumerate(columns)}
+        block = np.empty((len(rows), len(columns)), dtype=object)
+        block[:] = [tuple(r) for r in rows]
+        n = len(rows)
+        reasons = np.zeros(n, dtype=np.int64)
+        details: Dict[int, List[str]] = {}
+
+        def note(mask: np.ndarray, bit: int, text: Any) -> None:
+            hit = np.flatnonzero(mask)
+            reasons[hit] |= bit
+            for i in hit.tolist():
+                details.setdefault(i, []).append(text(i) if callable(text) else text)
+
+        # ---- keys ----
+        symbols = block[:, col["symbol"]].astype(str)
+        dates = np.array(
+            [_parse_date(v) for v in block[:, col["fiscalDateEnding"]].tolist()], dtype="datetime64[D]"
+        )
+        bad_key = np.isin(symbols, PLACEHOLDERS) | np.isnat(dates)
+        note(bad_key, REASON_KEY, "symbol or fiscalDateEnding missing")
+
+        # ---- types ----
+        num_cols = [f for f in NUMERIC_FIELDS if f in col]
+        num_idx = [col[f] for f in num_cols]
+        values, invalid = coerce_numeric(block[:, num_idx])
+        bad_type = invalid.any(axis=1)
+        note(bad_type, REASON_TYPE, lambda i: "non-numeric: " + ", ".join(
+            num_cols[j] for j in np.flatnonzero(invalid[i])[:5]
+        ))
+        field = {name: values[:, j] for j, name in enumerate(num_cols)}
+
+        # ---- accounting identities ----
+        for total, plus, minus in self.identities:
+            if total not in field or any(f not in field for f in plus + minus):
+                continue
+            rhs = np.zeros(n)
+            for f in plus:
+                rhs = rhs + field[f]
+            for f in minus:
+                rhs = rhs - field[f]
+            lhs = field[total]
+            scale = np.maximum(np.abs(lhs), 1.0)
+            with np.errstate(invalid="ignore"):
+                off = np.abs(lhs - rhs) > self.identity_tolerance * scale
+            off &= np.isfinite(lhs) & np.isfinite(rhs)
+            label = f"{total} != " + " + ".join(plus) + "".join(f" - {m}" for m in minus)
+            note(off, REASON_IDENTITY, label)
+
+        # ---- per-industry outliers ----
+        if "industry" in col and self.ratios:
+            industries = np.array(
+                [v if v not in (None, "") else "" for v in block[:, col["industry"]].tolist()],
+                dtype=object,
+            )
+            ratio = np.full((n, len(self.ratios)), np.nan)
+            for j, (num, den) in enumerate(self.ratios.values()):
+                if num in field and den in field:
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        ratio[:, j] = np.where(field[den] != 0, field[num] / field[den], np.nan)
+            base = self.baseline
+            groups = base.rows_for(industries)
+            # Score against the running baseline plus this batch's rows that
+            # passed the structural checks.
+            clean = reasons == 0
+            bn, bs, bss = base.batch_sums(groups[clean], ratio[clean])
+            cnt = (base.n + bn)[groups]
+            mean = (base.s + bs)[groups] / np.maximum(cnt, 1)
+            var = (base.ss + bss)[groups] / np.maximum(cnt, 1) - mean ** 2
+            std = np.sqrt(np.maximum(var, 0))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                z = np.abs(ratio - mean) / std
+            flagged = (cnt >= self.min_group) & (std > 0) & (z > self.z_threshold)
+            flagged &= (industries != "")[:, None]
+            names = list(self.ratios)
+            note(flagged.any(axis=1), REASON_OUTLIER, lambda i: "outlier: " + ", ".join(
+                f"{names[j]} z={z[i, j]:.1f}" for j in np.flatnonzero(flagged[i])
+            ))
+            # Only rows that passed every check feed future baselines.
+            passed = reasons == 0
+            base.add(*base.batch_sums(groups[passed], ratio[passed]))
+
+        # ---- duplicate keys (keep the last row that passed every check) ----
+        keys = np.char.add(np.char.add(symbols, "|"), dates.astype(str))
+        valid = np.flatnonzero(reasons == 0)
+        _, last_rev = np.unique(keys[valid][::-1], return_index=True)
+        keep = np.zeros(n, dtype=bool)
+        keep[valid[len(valid) - 1 - last_rev]] = True
+        note(~keep & ~bad_key & np.isin(keys, keys[keep]), REASON_DUPLICATE, "duplicate key in batch")
+
+        # ---- split, normalising placeholders to NULL ----
+        cleaned = block.copy()
+        sub = cleaned[:, num_idx]
+        sub[np.isnan(values) & ~invalid] = None
+        cleaned[:, num_idx] = sub
+        accepted = [tuple(r) for r in cleaned[reasons == 0].tolist()]
+        quarantined = [
+            (tuple(rows[i]), int(reasons[i]), "; ".join(details.get(i, [])))
+            for i in np.flatnonzero(reasons).tolist()
+        ]
+        return ValidationResult(accepted, quarantined)
+
+
+def _parse_date(value: Any) -> Any:
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, dt.date):
+        return value
+    if isinstance(value, str):
+        try:
+            return dt.date.fromisoformat(value.strip()[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def write_quarantine(
+    conn: Any,
+    table: str,
+    source: str,
+    columns: Sequence[str],
+    quarantined: Sequence[Tuple[Tuple[Any, ...], int, str]],
+) -> int:
+    if not quarantined:
+        return 0
+    col = {name: i for i, name in enumerate(columns)}
+    now = dt.datetime.now().replace(microsecond=0)
+    params = []
+    for row, mask, detail in quarantined:
+        symbol = row[col["symbol"]] if "symbol" in col else None
+        fiscal = _parse_date(row[col["fiscalDateEnding"]]) if "fiscalDateEnding" in col else None
+        payload = json.dumps(dict(zip(columns, row)), default=str)
+        params.append((source, symbol, fiscal, reason_names(mask), detail[:1000], payload, now))
+    cur = conn.cursor()
+    try:
+        cur.executemany(
+            f"INSERT INTO `{table}` "
+            "(source, symbol, fiscalDateEnding, reasons, details, payload, quarantined_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            params,
+        )
+        conn.commit()
+    finally:
+        cur.close()
+    return len(params)
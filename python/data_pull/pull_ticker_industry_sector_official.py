@@ -1,3 +1,4 @@
+# Run from python/: python -m data_pull.pull_ticker_industry_sector_official
 import os
 import time
 import pandas as pd
@@ -6,6 +7,16 @@ import mysql.connector
 from dotenv import load_dotenv
 from math import floor
 
+import db
+import outbound
+from data_pull.ingest.scheduler import (
+    JOB_LOCK_ENV,
+    AdvisoryLock,
+    QuotaExceeded,
+    default_budgets,
+    job_lock_name,
+)
+
 # ------------------------------------------------
 # Load environment variables
 # ------------------------------------------------
@@ -17,8 +28,11 @@ MYSQL_USER = os.getenv("MYSQL_USER")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
 MYSQL_DB = os.getenv("MYSQL_DB")
 API_SLEEP = float(os.getenv("API_SLEEP_SECONDS", "2"))
+ALPHA_BASE_URL = os.getenv("ALPHAVANTAGE_BASE_URL", "https://www.alphavantage.co").rstrip("/")
 
 API_SLEEP = min(API_SLEEP, 15)  # cap at 15 seconds
+# Retries of a throttled (HTTP 200 "Note" / "Information") response.
+THROTTLE_RETRIES = 3
 
 if not ALPHA_KEY:
     raise Exception("Missing ALPHAVANTAGE_API_KEY in .env")
@@ -44,6 +58,21 @@ conn = mysql.connector.connect(
 )
 cursor = conn.cursor()
 
+# ------------------------------------------------
+# Job lock and Alpha Vantage budget
+# ------------------------------------------------
+# Same lock as the scheduler's ticker_metadata job, which already holds it
+# when it is the one running this script.
+LOCK_NAME = job_lock_name("ticker_metadata")
+lock = None
+if os.getenv(JOB_LOCK_ENV) != LOCK_NAME:
+    lock = AdvisoryLock(db.connect, LOCK_NAME)
+    if not lock.acquire():
+        raise SystemExit("ticker_metadata is already running (scheduled or manual run)")
+
+# Charged to the same daily counter as the scheduler's Alpha Vantage jobs.
+budget = default_budgets(db.connect)["alphavantage"]
+
 UPSERT_SQL = """
 INSERT INTO ticker_metadata (symbol, market_cap, industry, sector)
 VALUES (%s, %s, %s, %s)
@@ -57,48 +86,69 @@ ON DUPLICATE KEY UPDATE
 # Helper to call Alpha Overview
 # ------------------------------------------------
 def get_overview(symbol):
-    url = (
-        "https://www.alphavantage.co/query"
-        f"?function=OVERVIEW&symbol={symbol}&apikey={ALPHA_KEY}"
-    )
-    for attempt in range(2):  # retry once
-        r = requests.get(url, timeout=30)
-        if r.status_code in [429, 500, 502, 503, 504]:
-            time.sleep(1)
-            continue
+    # Timeouts, jittered retries and the circuit breaker come from the
+    # shared "alphavantage" policy (see outbound/policy.py). Alpha Vantage
+    # reports throttling as HTTP 200 with a Note / Information body, which
+    # that policy cannot see, so those are retried here.
+    for attempt in range(THROTTLE_RETRIES + 1):
+        try:
+            # Every HTTP attempt, the policy's retries included, is charged.
+            r = outbound.get(
+                "alphavantage",
+                f"{ALPHA_BASE_URL}/query",
+                params={"function": "OVERVIEW", "symbol": symbol, "apikey": ALPHA_KEY},
+                before_attempt=budget.consume,
+            )
+        except (outbound.ProviderUnavailable, requests.RequestException):
+            return None
+        if not r.ok:
+            return None
         data = r.json()
-        return {
-            "symbol": symbol,
-            "market_cap": data.get("MarketCapitalization"),
-            "industry": data.get("Industry"),
-            "sector": data.get("Sector")
-        }
-    return None
+        if "Note" not in data and "Information" not in data:
+            break
+        if attempt == THROTTLE_RETRIES:
+            return None
+        time.sleep(outbound.backoff_delay(attempt, 15.0, 60.0))
+    return {
+        "symbol": symbol,
+        "market_cap": data.get("MarketCapitalization"),
+        "industry": data.get("Industry"),
+        "sector": data.get("Sector")
+    }
 
 # ------------------------------------------------
 # Main loop
 # ------------------------------------------------
-for i, sym in enumerate(symbols, start=1):
-
-    # one-line progress indicator
-    print(f"Processing {i} of {total}", end="\r")
-
-    meta = get_overview(sym)
-    if meta is None:
-        continue
-
-    cursor.execute(
-        UPSERT_SQL,
-        (
-            meta["symbol"],
-            meta["market_cap"],
-            meta["industry"],
-            meta["sector"]
+try:
+    for i, sym in enumerate(symbols, start=1):
+
+        # one-line progress indicator
+        print(f"Processing {i} of {total}", end="\r")
+
+        try:
+            meta = get_overview(sym)
+        except QuotaExceeded as ex:
+            print(f"\nStopping: {ex}")
+            break
+        if meta is None:
+            continue
+
+        cursor.execute(
+            UPSERT_SQL,
+            (
+                meta["symbol"],
+                meta["market_cap"],
+                meta["industry"],
+                meta["sector"]
+            )
         )
-    )
-    conn.commit()
+        conn.commit()
 
-    time.sleep(API_SLEEP)
+        time.sleep(API_SLEEP)
+finally:
+    budget.close()
+    if lock is not None:
+        lock.release()
 
 print("\nDone.")
 cursor.close()
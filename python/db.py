@@ -0,0 +1,141 @@
+"""
+Shared MySQL helpers for the ingest, scheduler and API modules.
+
+Configuration comes from the same MYSQL_* environment variables used by
+api.py and the R loaders (optionally loaded from .env).
+"""
+
+import os
+from typing import Any, List, Optional, Sequence
+
+try:
+    from dotenv import load_dotenv
+except Exception:
+    load_dotenv = None
+
+
+MYSQL_ENV_VARS = ("MYSQL_HOST", "MYSQL_USER", "MYSQL_PASSWORD", "MYSQL_DB")
+
+
+def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    v = os.getenv(name)
+    if v is None:
+        return default
+    v = v.strip()
+    return v or default
+
+
+def load_env() -> None:
+    if load_dotenv:
+        try:
+            load_dotenv()
+        except Exception:
+            # Variables may already be configured in the environment.
+            pass
+
+
+def missing_mysql_env() -> List[str]:
+    return [k for k in MYSQL_ENV_VARS if not getenv(k)]
+
+
+def connect(database: Optional[str] = None, autocommit: bool = False) -> Any:
+    """
+    Open a mysql-connector connection from MYSQL_* environment variables.
+
+    Raises RuntimeError when required variables are missing so callers can
+    report a clean message instead of a driver traceback.
+    """
+    missing = missing_mysql_env()
+    if missing:
+        raise RuntimeError(f"Missing required variables: {', '.join(missing)}")
+
+    import mysql.connector  # type: ignore
+
+    return mysql.connector.connect(
+        host=getenv("MYSQL_HOST"),
+        port=int(getenv("MYSQL_PORT", "3306")),
+        user=getenv("MYSQL_USER"),
+        password=getenv("MYSQL_PASSWORD"),
+        database=database or getenv("MYSQL_DB"),
+        autocommit=autocommit,
+    )
+
+
+def quote_ident(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def build_upsert_sql(
+    table: str,
+    columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE statement for executemany().
+
+    `update_columns` defaults to every column; pass an empty sequence to get
+    INSERT IGNORE semantics on the key instead.
+    """
+    cols = ", ".join(quote_ident(c) for c in columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    if update_columns is None:
+        update_columns = columns
+    if not update_columns:
+        return f"INSERT IGNORE INTO {quote_ident(table)} ({cols}) VALUES ({placeholders})"
+    updates = ", ".join(
+        f"{quote_ident(c)} = VALUES({quote_ident(c)})" for c in update_columns
+    )
+    return (
+        f"INSERT INTO {quote_ident(table)} ({cols}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+
+def upsert_rows(
+    conn: Any,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    update_columns: Optional[Sequence[str]] = None,
+    batch_size: int = 500,
+) -> int:
+    """
+    Batched upsert: one executemany() + commit per `batch_size` rows.
+
+    mysql-connector rewrites executemany() INSERTs into a single multi-row
+    statement, so each batch is one round trip.
+    """
+    if not rows:
+        return 0
+    sql = build_upsert_sql(table, columns, update_columns)
+    written = 0
+    cur = conn.cursor()
+    try:
+        for start in range(0, len(rows), batch_size):
+            batch = [tuple(r) for r in rows[start:start + batch_size]]
+            cur.executemany(sql, batch)
+            conn.commit()
+            written += len(batch)
+    finally:
+        try:
+            cur.close()
+        except Exception:
+            pass
+    return written
+
+
+def existing_columns(conn: Any, table: str) -> List[str]:
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = DATABASE()
+              AND table_name = %s
+            """,
+            (table,),
+        )
+        return [row[0] for row in cur.fetchall()]
+    finally:
+        cur.close()
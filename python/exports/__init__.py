@@ -0,0 +1,22 @@
+"""
+Streaming exports of financial data as CSV, XLSX or Parquet.
+
+Row sources are re-exported here; the writers live in `exports.writers`
+(not re-exported so its benchmark can be run with `python -m`).
+"""
+
+from .queries import (
+    AGGREGATE_FIELDS,
+    PLAN_COLUMNS,
+    dissertation_export,
+    industry_aggregates_export,
+    plans_export,
+)
+
+__all__ = [
+    "AGGREGATE_FIELDS",
+    "PLAN_COLUMNS",
+    "dissertation_export",
+    "industry_aggregates_export",
+    "plans_export",
+]
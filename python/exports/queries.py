@@ -0,0 +1,217 @@
+"""
+Row sources for exports.
+
+Each function returns `(columns, numeric_columns, rows)` where `rows` is a
+lazy iterator, so nothing is materialised beyond one page. dissertation_data
+is read in keyset pages on its unique (symbol, fiscalDateEnding) key rather
+than one long-running statement, which would otherwise stay open for as
+long as the slowest client takes to download. Rows with a NULL key column
+fall outside the keyset and are read afterwards in a single pass.
+Submitted plans are exported by id only, one flattened row per plan.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import db
+from financials.schema import COLUMNS, KEY_COLUMNS, NUMERIC_FIELDS, TABLE, coerce_numeric
+from plans import store as plan_store
+
+ExportRows = Tuple[Sequence[str], Sequence[str], Iterator[Tuple[Any, ...]]]
+
+AGGREGATE_FIELDS: Tuple[str, ...] = (
+    "totalRevenue", "grossProfit", "operatingIncome", "netIncome.x",
+    "totalAssets", "totalLiabilities", "totalShareholderEquity",
+    "operatingCashflow",
+)
+
+# Plan columns first, then the intake answers from the `financials` JSON.
+PLAN_PROFILE_COLUMNS: Tuple[str, ...] = (
+    "plan_id", "created_at", "business_name", "business_type", "industry",
+    "address", "user_email",
+)
+PLAN_COLUMNS: Tuple[str, ...] = (
+    *PLAN_PROFILE_COLUMNS, "business_start_date",
+    *plan_store.NUMERIC_FIELDS, *plan_store.TEXT_FIELDS,
+)
+
+
+def _check_columns(requested: Sequence[str], allowed: Sequence[str]) -> None:
+    unknown = [c for c in requested if c not in allowed]
+    if unknown:
+        raise ValueError(f"unknown columns: {', '.join(unknown)}")
+
+
+def _numeric_page(page: List[Tuple[Any, ...]], num_idx: List[int]) -> List[Tuple[Any, ...]]:
+    if not num_idx or not page:
+        return page
+    block = np.array(page, dtype=object)
+    values, _ = coerce_numeric(block[:, num_idx])
+    block[:, num_idx] = np.where(np.isnan(values), None, values)
+    return [tuple(r) for r in block.tolist()]
+
+
+def dissertation_export(
+    conn: Any,
+    columns: Optional[Sequence[str]] = None,
+    symbols: Optional[Sequence[str]] = None,
+    industry: Optional[str] = None,
+    limit: Optional[int] = None,
+    page_size: int = 2000,
+) -> ExportRows:
+    """
+    Statement rows ordered by (symbol, fiscalDateEnding), followed by any
+    rows with a NULL key column. Numeric fields are converted from their
+    varchar storage to floats (placeholders -> None).
+    """
+    cols = list(columns or COLUMNS)
+    _check_columns(cols, COLUMNS)
+    numeric = [c for c in cols if c in NUMERIC_FIELDS]
+    num_idx = [cols.index(c) for c in numeric]
+
+    # Key columns are selected first so the page boundary can be read back.
+    select = [*KEY_COLUMNS, *cols]
+    select_sql = ", ".join(db.quote_ident(c) for c in select)
+    key_sql = ", ".join(db.quote_ident(c) for c in KEY_COLUMNS)
+    filters: List[str] = []
+    params: List[Any] = []
+    if symbols:
+        filters.append(f"`symbol` IN ({', '.join(['%s'] * len(symbols))})")
+        params.extend(symbols)
+    if industry:
+        filters.append("`industry` = %s")
+        params.append(industry)
+
+    not_null = " AND ".join(f"{db.quote_ident(k)} IS NOT NULL" for k in KEY_COLUMNS)
+    any_null = " OR ".join(f"{db.quote_ident(k)} IS NULL" for k in KEY_COLUMNS)
+
+    def query(where: List[str], n: Optional[int]) -> str:
+        return (
+            f"SELECT {select_sql} FROM {db.quote_ident(TABLE)} WHERE "
+            + " AND ".join([*filters, *where])
+            + f" ORDER BY {key_sql}"
+            + ("" if n is None else f" LIMIT {int(n)}")
+        )
+
+    def rows() -> Iterator[Tuple[Any, ...]]:
+        last: Optional[Tuple[Any, Any]] = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            where = [not_null]
+            args = list(params)
+            if last is not None:
+                where.append(f"({key_sql}) > (%s, %s)")
+                args.extend(last)
+            n = page_size if remaining is None else min(page_size, remaining)
+            cur = conn.cursor()
+            try:
+                cur.execute(query(where, n), tuple(args))
+                page = cur.fetchall()
+            finally:
+                cur.close()
+            if page:
+                last = (page[-1][0], page[-1][1])
+                yield from _numeric_page([r[len(KEY_COLUMNS):] for r in page], num_idx)
+                if remaining is not None:
+                    remaining -= len(page)
+            if len(page) < n:
+                break
+
+        # A row comparison with NULL is never true, so rows with a NULL key
+        # column cannot be paged by key; they come last, from one statement.
+        if remaining is not None and remaining <= 0:
+            return
+        cur = conn.cursor()
+        try:
+            cur.execute(query([f"({any_null})"], remaining), tuple(params))
+            while True:
+                page = cur.fetchmany(page_size)
+                if not page:
+                    return
+                yield from _numeric_page([r[len(KEY_COLUMNS):] for r in page], num_idx)
+        finally:
+            try:
+                cur.fetchall()
+            except Exception:
+                pass
+            cur.close()
+
+    return cols, numeric, rows()
+
+
+def industry_aggregates_export(
+    conn: Any,
+    fields: Optional[Sequence[str]] = None,
+    industry: Optional[str] = None,
+    fetch_size: int = 1000,
+) -> ExportRows:
+    """
+    Per industry and fiscal quarter: company count plus mean and total of
+    each field. The grouped result is small, so it is streamed from a single
+    unbuffered cursor.
+    """
+    fields = list(fields or AGGREGATE_FIELDS)
+    _check_columns(fields, NUMERIC_FIELDS)
+
+    aggs: List[str] = []
+    columns = ["industry", "fiscalDateEnding", "companies"]
+    for f in fields:
+        num = f"CAST(NULLIF(NULLIF({db.quote_ident(f)}, 'None'), '') AS DOUBLE)"
+        aggs.append(f"AVG({num}), SUM({num})")
+        columns.extend([f"{f}_mean", f"{f}_total"])
+    sql = (
+        f"SELECT `industry`, `fiscalDateEnding`, COUNT(DISTINCT `symbol`), {', '.join(aggs)} "
+        f"FROM {db.quote_ident(TABLE)} WHERE `industry` IS NOT NULL"
+        + (" AND `industry` = %s" if industry else "")
+        + " GROUP BY `industry`, `fiscalDateEnding` ORDER BY `industry`, `fiscalDateEnding`"
+    )
+
+    def rows() -> Iterator[Tuple[Any, ...]]:
+        cur = conn.cursor()
+        try:
+            cur.execute(sql, (industry,) if industry else ())
+            while True:
+                page = cur.fetchmany(fetch_size)
+                if not page:
+                    return
+                for r in page:
+                    yield tuple(float(v) if i >= 3 and v is not None else v for i, v in enumerate(r))
+        finally:
+            try:
+                # An unbuffered cursor must be drained before the connection
+                # can be reused or closed cleanly.
+                cur.fetchall()
+            except Exception:
+                pass
+            cur.close()
+
+    return columns, columns[2:], rows()
+
+
+def plans_export(
+    conn: Any,
+    tenant_id: str,
+    plan_ids: Sequence[str],
+    pending: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> ExportRows:
+    """
+    One row per plan, in `plan_ids` order; ids not found for the tenant are
+    skipped. There is deliberately no "all plans" variant: without
+    authentication the random plan_id is the only proof of ownership.
+    `pending` holds plans still in the write-behind buffer, by plan_id.
+    """
+    queued = pending or {}
+
+    def rows() -> Iterator[Tuple[Any, ...]]:
+        for plan_id in plan_ids:
+            plan = queued.get(plan_id) or plan_store.get_plan(conn, tenant_id, plan_id)
+            if plan is None:
+                continue
+            answers = plan["financials"]
+            yield tuple(
+                plan.get(c) if c in PLAN_PROFILE_COLUMNS else answers.get(c)
+                for c in PLAN_COLUMNS
+            )
+
+    return PLAN_COLUMNS, plan_store.NUMERIC_FIELDS, rows()
@@ -0,0 +1,439 @@
+"""
+Streaming CSV / XLSX / Parquet writers.
+
+Each writer takes column names and an iterable of row tuples and yields
+encoded byte chunks as it goes, so a Flask response can send a large export
+without holding the file in memory:
+
+- CSV is flushed every `chunk_bytes`.
+- XLSX is written as a deflated zip straight to the output (zip data
+  descriptors, no seeking) with inline strings, so memory does not grow
+  with the row count. Sheets roll over at Excel's row limit.
+- Parquet uses pyarrow (optional) and emits one row group per
+  `row_group_size` rows.
+
+    python -m exports.writers --bench --format xlsx --rows 500000
+"""
+
+import argparse
+import csv
+import functools
+import io
+import json
+import math
+import re
+import sys
+import time
+import zipfile
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+Row = Sequence[Any]
+
+XLSX_MAX_ROWS = 1_048_576
+
+
+class ChunkSink:
+    """
+    Write-only file object that buffers bytes until `drain()`.
+
+    Supports `tell()` but not `seek()`, which makes zipfile stream entries
+    with data descriptors instead of rewriting local headers.
+    """
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._size = 0
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        if data:
+            b = bytes(data)
+            self._parts.append(b)
+            self._size += len(b)
+            self._pos += len(b)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def pending(self) -> int:
+        return self._size
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return out
+
+
+def _cell_text(v: Any) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, float) and math.isnan(v):
+        return ""
+    if hasattr(v, "isoformat"):
+        return v.isoformat()
+    return str(v)
+
+
+# ------------------------------------------------
+# CSV
+# ------------------------------------------------
+def csv_stream(
+    columns: Sequence[str],
+    rows: Iterable[Row],
+    chunk_bytes: int = 64 * 1024,
+    batch_rows: int = 500,
+) -> Iterator[bytes]:
+    # csv writes None as "" and dates via str(), so rows go through as-is.
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, batch_rows))
+        if not batch:
+            break
+        writer.writerows(batch)
+        if buf.tell() >= chunk_bytes:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+# ------------------------------------------------
+# XLSX
+# ------------------------------------------------
+_XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+# XML 1.0 has no encoding for these; one in a cell corrupts the workbook.
+_XML_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_text(v: Any) -> str:
+    text = _XML_ILLEGAL.sub("", _cell_text(v))
+    if "&" in text or "<" in text or ">" in text:
+        text = escape(text)
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_number(v: Any) -> str:
+    if v != v or v in (math.inf, -math.inf):
+        return "<c/>"
+    return f"<c><v>{v!r}</v></c>"
+
+
+# Dispatch on exact type; this is the per-cell hot path.
+_XLSX_CELL: Dict[type, Callable[[Any], str]] = {
+    str: _xlsx_text,
+    float: _xlsx_number,
+    int: _xlsx_number,
+    bool: lambda v: f'<c t="b"><v>{int(v)}</v></c>',
+    type(None): lambda v: "<c/>",
+}
+
+
+def _xlsx_cell(v: Any) -> str:
+    return _XLSX_CELL.get(v.__class__, _xlsx_text)(v)
+
+
+def _xlsx_row(r: int, values: Row) -> str:
+    return f'<row r="{r}">' + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+
+def _xlsx_package_parts(sheet_names: Sequence[str]) -> Dict[str, str]:
+    n = len(sheet_names)
+    sheets = "".join(
+        f'<sheet name="{escape(name)}" sheetId="{i}" r:id="rId{i}"/>'
+        for i, name in enumerate(sheet_names, start=1)
+    )
+    sheet_rels = "".join(
+        f'<Relationship Id="rId{i}" Type="{_NS_REL}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+        for i in range(1, n + 1)
+    )
+    overrides = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, n + 1)
+    )
+    return {
+        "xl/workbook.xml": (
+            f'{_XML_HEAD}<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}"><sheets>{sheets}</sheets></workbook>'
+        ),
+        "xl/_rels/workbook.xml.rels": (
+            f'{_XML_HEAD}<Relationships xmlns="{_NS_PKG_REL}">{sheet_rels}'
+            f'<Relationship Id="rId{n + 1}" Type="{_NS_REL}/styles" Target="styles.xml"/></Relationships>'
+        ),
+        "xl/styles.xml": (
+            f'{_XML_HEAD}<styleSheet xmlns="{_NS_MAIN}">'
+            '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+            '<borders count="1"><border/></borders>'
+            '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+            '<cellXfs count="1"><xf xfId="0"/></cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            "</styleSheet>"
+        ),
+        "_rels/.rels": (
+            f'{_XML_HEAD}<Relationships xmlns="{_NS_PKG_REL}">'
+            f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>"
+        ),
+        "[Content_Types].xml": (
+            f'{_XML_HEAD}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f"{overrides}</Types>"
+        ),
+    }
+
+
+def xlsx_stream(
+    columns: Sequence[str],
+    rows: Iterable[Row],
+    sheet_name: str = "data",
+    chunk_bytes: int = 256 * 1024,
+    max_rows: int = XLSX_MAX_ROWS,
+) -> Iterator[bytes]:
+    sink = ChunkSink()
+    header = _xlsx_row(1, columns)
+    sheet_open = f'{_XML_HEAD}<worksheet xmlns="{_NS_MAIN}"><sheetData>'
+    sheet_close = "</sheetData></worksheet>"
+    names: List[str] = []
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        it = iter(rows)
+        row = next(it, None)
+        while True:
+            names.append(sheet_name if not names else f"{sheet_name}_{len(names) + 1}")
+            with zf.open(f"xl/worksheets/sheet{len(names)}.xml", "w", force_zip64=True) as part:
+                part.write((sheet_open + header).encode("utf-8"))
+                r = 1
+                pending: List[str] = []
+                while row is not None and r < max_rows:
+                    r += 1
+                    pending.append(_xlsx_row(r, row))
+                    if len(pending) >= 256:
+                        part.write("".join(pending).encode("utf-8"))
+                        pending.clear()
+                        if sink.pending() >= chunk_bytes:
+                            yield sink.drain()
+                    row = next(it, None)
+                if pending:
+                    part.write("".join(pending).encode("utf-8"))
+                part.write(sheet_close.encode("utf-8"))
+            yield sink.drain()
+            if row is None:
+                break
+        for name, body in _xlsx_package_parts(names).items():
+            zf.writestr(name, body)
+    yield sink.drain()
+
+
+# ------------------------------------------------
+# Parquet
+# ------------------------------------------------
+def parquet_available() -> bool:
+    import importlib.util
+
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def parquet_stream(
+    columns: Sequence[str],
+    rows: Iterable[Row],
+    numeric: Sequence[str] = (),
+    row_group_size: int = 10_000,
+) -> Iterator[bytes]:
+    """
+    `numeric` columns are written as float64, everything else as strings.
+    """
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except Exception as ex:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from ex
+
+    numeric_set = set(numeric)
+    schema = pa.schema(
+        [(c, pa.float64() if c in numeric_set else pa.string()) for c in columns]
+    )
+    is_num = [c in numeric_set for c in columns]
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        batch: List[Row] = []
+
+        def write_batch() -> None:
+            cols = list(zip(*batch))
+            arrays = [
+                pa.array(
+                    [None if v is None or (isinstance(v, float) and math.isnan(v)) else float(v) for v in col]
+                    if num else [None if v is None else _cell_text(v) for v in col],
+                    type=field.type,
+                )
+                for col, num, field in zip(cols, is_num, schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            batch.clear()
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                write_batch()
+                yield sink.drain()
+        if batch:
+            write_batch()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+# ------------------------------------------------
+# Registry
+# ------------------------------------------------
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def stream(
+    fmt: str,
+    columns: Sequence[str],
+    rows: Iterable[Row],
+    numeric: Sequence[str] = (),
+    sheet_name: str = "data",
+) -> Iterator[bytes]:
+    if fmt == "csv":
+        return csv_stream(columns, rows)
+    if fmt == "xlsx":
+        return xlsx_stream(columns, rows, sheet_name=sheet_name)
+    if fmt == "parquet":
+        return parquet_stream(columns, rows, numeric=numeric)
+    raise ValueError(f"unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+# ------------------------------------------------
+# Benchmark
+# ------------------------------------------------
+def _synthetic_rows(n: int, columns: Sequence[str], numeric: Sequence[str]) -> Iterator[Row]:
+    import datetime as dt
+
+    num = set(numeric)
+    base = dt.date(2010, 3, 31)
+    for i in range(n):
+        sym = f"SYM{i // 40:05d}"
+        when = base + dt.timedelta(days=91 * (i % 40))
+        yield tuple(
+            sym if c == "symbol"
+            else when if c == "fiscalDateEnding"
+            else (i * 7919 % 1_000_003) * 1000.5 if c in num
+            else "USD"
+            for c in columns
+        )
+
+
+def benchmark(
+    fmt: str,
+    rows: int,
+    source: Optional[Callable[[], Tuple[Sequence[str], Sequence[str], Iterable[Row]]]] = None,
+) -> Dict[str, Any]:
+    import resource
+
+    from financials.schema import COLUMNS, NUMERIC_FIELDS
+
+    if source is None:
+        columns, numeric = COLUMNS, NUMERIC_FIELDS
+        data: Iterable[Row] = _synthetic_rows(rows, columns, numeric)
+    else:
+        columns, numeric, data = source()
+
+    if fmt == "parquet" and parquet_available():
+        # Count the library's own footprint in the baseline, not the export.
+        import pyarrow.parquet  # type: ignore  # noqa: F401
+
+    # ru_maxrss is KiB on Linux and only ever grows, so compare against the
+    # peak before the export started.
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    t0 = time.perf_counter()
+    total = 0
+    chunks = 0
+    largest = 0
+    for chunk in stream(fmt, columns, data, numeric=numeric):
+        total += len(chunk)
+        chunks += 1
+        largest = max(largest, len(chunk))
+    seconds = time.perf_counter() - t0
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {
+        "format": fmt,
+        "rows": rows,
+        "columns": len(columns),
+        "bytes": total,
+        "chunks": chunks,
+        "largest_chunk_bytes": largest,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds) if seconds else None,
+        "peak_rss_bytes": rss_after,
+        "rss_growth_bytes": rss_after - rss_before,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m exports.writers")
+    parser.add_argument("--bench", action="store_true", help="stream a synthetic dissertation_data export and report peak RSS")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--from-db", action="store_true", help="export dissertation_data from MySQL instead")
+    args = parser.parse_args(argv)
+
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    from_db = None
+    if args.from_db:
+        import db
+
+        from .queries import dissertation_export
+
+        db.load_env()
+        from_db = functools.partial(dissertation_export, db.connect(), limit=args.rows)
+
+    try:
+        print(json.dumps(benchmark(args.format, args.rows, from_db), indent=2))
+    except RuntimeError as ex:
+        print(str(ex), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
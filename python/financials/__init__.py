@@ -0,0 +1,15 @@
+"""
+Read-side access to the company financials in `dissertation_data`.
+
+The snapshot store lives in `financials.snapshot_store` (not re-exported
+here so it can also be run with `python -m`).
+"""
+
+from .schema import COLUMNS, KEY_COLUMNS, NUMERIC_FIELDS, coerce_numeric
+
+__all__ = [
+    "COLUMNS",
+    "KEY_COLUMNS",
+    "NUMERIC_FIELDS",
+    "coerce_numeric",
+]
@@ -0,0 +1,131 @@
+"""
+Column metadata and type coercion for the `dissertation_data` table.
+
+Alpha Vantage statement fields land in varchar columns, so anything reading
+them numerically goes through `coerce_numeric`.
+"""
+
+from typing import Any, Tuple
+
+import numpy as np
+
+
+TABLE = "dissertation_data"
+KEY_COLUMNS = ("symbol", "fiscalDateEnding")
+
+# Every column, in table order.
+COLUMNS: Tuple[str, ...] = (
+    "fiscalDateEnding", "reportedCurrency.x", "grossProfit", "totalRevenue",
+    "costOfRevenue", "costofGoodsAndServicesSold", "operatingIncome",
+    "sellingGeneralAndAdministrative", "researchAndDevelopment",
+    "operatingExpenses", "investmentIncomeNet", "netInterestIncome",
+    "interestIncome", "interestExpense", "nonInterestIncome",
+    "otherNonOperatingIncome", "depreciation", "depreciationAndAmortization",
+    "incomeBeforeTax", "incomeTaxExpense", "interestAndDebtExpense",
+    "netIncomeFromContinuingOperations", "comprehensiveIncomeNetOfTax", "ebit",
+    "ebitda", "netIncome.x", "symbol", "reportedCurrency.y", "totalAssets",
+    "totalCurrentAssets", "cashAndCashEquivalentsAtCarryingValue",
+    "cashAndShortTermInvestments", "inventory", "currentNetReceivables",
+    "totalNonCurrentAssets", "propertyPlantEquipment",
+    "accumulatedDepreciationAmortizationPPE", "intangibleAssets",
+    "intangibleAssetsExcludingGoodwill", "goodwill", "investments",
+    "longTermInvestments", "shortTermInvestments", "otherCurrentAssets",
+    "otherNonCurrentAssets", "totalLiabilities", "totalCurrentLiabilities",
+    "currentAccountsPayable", "deferredRevenue", "currentDebt",
+    "shortTermDebt", "totalNonCurrentLiabilities", "capitalLeaseObligations",
+    "longTermDebt", "currentLongTermDebt", "longTermDebtNoncurrent",
+    "shortLongTermDebtTotal", "otherCurrentLiabilities",
+    "otherNonCurrentLiabilities", "totalShareholderEquity", "treasuryStock",
+    "retainedEarnings", "commonStock", "commonStockSharesOutstanding",
+    "reportedCurrency", "operatingCashflow", "paymentsForOperatingActivities",
+    "proceedsFromOperatingActivities", "changeInOperatingLiabilities",
+    "changeInOperatingAssets", "depreciationDepletionAndAmortization",
+    "capitalExpenditures", "changeInReceivables", "changeInInventory",
+    "profitLoss", "cashflowFromInvestment", "cashflowFromFinancing",
+    "proceedsFromRepaymentsOfShortTermDebt",
+    "paymentsForRepurchaseOfCommonStock", "paymentsForRepurchaseOfEquity",
+    "paymentsForRepurchaseOfPreferredStock", "dividendPayout",
+    "dividendPayoutCommonStock", "dividendPayoutPreferredStock",
+    "proceedsFromIssuanceOfCommonStock",
+    "proceedsFromIssuanceOfLongTermDebtAndCapitalSecuritiesNet",
+    "proceedsFromIssuanceOfPreferredStock", "proceedsFromRepurchaseOfEquity",
+    "proceedsFromSaleOfTreasuryStock", "changeInCashAndCashEquivalents",
+    "changeInExchangeRate", "netIncome.y", "industry", "sharesOutstanding",
+    "sharePrice", "pull_date",
+)
+
+# Statement values stored as varchar (plus the two double columns).
+NUMERIC_FIELDS: Tuple[str, ...] = (
+    "grossProfit", "totalRevenue", "costOfRevenue",
+    "costofGoodsAndServicesSold", "operatingIncome",
+    "sellingGeneralAndAdministrative", "researchAndDevelopment",
+    "operatingExpenses", "investmentIncomeNet", "netInterestIncome",
+    "interestIncome", "interestExpense", "nonInterestIncome",
+    "otherNonOperatingIncome", "depreciation", "depreciationAndAmortization",
+    "incomeBeforeTax", "incomeTaxExpense", "interestAndDebtExpense",
+    "netIncomeFromContinuingOperations", "comprehensiveIncomeNetOfTax", "ebit",
+    "ebitda", "netIncome.x", "totalAssets", "totalCurrentAssets",
+    "cashAndCashEquivalentsAtCarryingValue", "cashAndShortTermInvestments",
+    "inventory", "currentNetReceivables", "totalNonCurrentAssets",
+    "propertyPlantEquipment", "accumulatedDepreciationAmortizationPPE",
+    "intangibleAssets", "intangibleAssetsExcludingGoodwill", "goodwill",
+    "investments", "longTermInvestments", "shortTermInvestments",
+    "otherCurrentAssets", "otherNonCurrentAssets", "totalLiabilities",
+    "totalCurrentLiabilities", "currentAccountsPayable", "deferredRevenue",
+    "currentDebt", "shortTermDebt", "totalNonCurrentLiabilities",
+    "capitalLeaseObligations", "longTermDebt", "currentLongTermDebt",
+    "longTermDebtNoncurrent", "shortLongTermDebtTotal",
+    "otherCurrentLiabilities", "otherNonCurrentLiabilities",
+    "totalShareholderEquity", "treasuryStock", "retainedEarnings",
+    "commonStock", "commonStockSharesOutstanding", "operatingCashflow",
+    "paymentsForOperatingActivities", "proceedsFromOperatingActivities",
+    "changeInOperatingLiabilities", "changeInOperatingAssets",
+    "depreciationDepletionAndAmortization", "capitalExpenditures",
+    "changeInReceivables", "changeInInventory", "profitLoss",
+    "cashflowFromInvestment", "cashflowFromFinancing",
+    "proceedsFromRepaymentsOfShortTermDebt",
+    "paymentsForRepurchaseOfCommonStock", "paymentsForRepurchaseOfEquity",
+    "paymentsForRepurchaseOfPreferredStock", "dividendPayout",
+    "dividendPayoutCommonStock", "dividendPayoutPreferredStock",
+    "proceedsFromIssuanceOfCommonStock",
+    "proceedsFromIssuanceOfLongTermDebtAndCapitalSecuritiesNet",
+    "proceedsFromIssuanceOfPreferredStock", "proceedsFromRepurchaseOfEquity",
+    "proceedsFromSaleOfTreasuryStock", "changeInCashAndCashEquivalents",
+    "changeInExchangeRate", "netIncome.y", "sharesOutstanding", "sharePrice",
+)
+
+# Strings Alpha Vantage / R exports use for "no value".
+PLACEHOLDERS = ("", "None", "none", "NULL", "null", "NA", "NaN", "nan", "-", "N/A", "n/a")
+
+
+def coerce_numeric(values: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert an array-like of strings/numbers to float64 in one pass.
+
+    Returns `(floats, invalid)`: placeholders become NaN and are *not*
+    flagged; any other unparsable value becomes NaN and is flagged in
+    `invalid`. Works on 1-D columns and 2-D batches alike.
+    """
+    arr = np.asarray(values, dtype=object)
+    shape = arr.shape
+    text = np.char.strip(arr.astype(str).ravel())
+    placeholder = np.isin(text, PLACEHOLDERS)
+    text = np.where(placeholder, "nan", text)
+    try:
+        out = text.astype(np.float64)
+        invalid = np.zeros(out.shape, dtype=bool)
+    except ValueError:
+        # Slow path only when something unparsable is present: convert each
+        # distinct string once and scatter back.
+        uniq, inverse = np.unique(text, return_inverse=True)
+        conv = np.empty(len(uniq), dtype=np.float64)
+        bad = np.zeros(len(uniq), dtype=bool)
+        for i, s in enumerate(uniq):
+            try:
+                conv[i] = float(s)
+            except ValueError:
+                conv[i] = np.nan
+                bad[i] = True
+        out = conv[inverse]
+        invalid = bad[inverse]
+    return out.reshape(shape), invalid.reshape(shape)
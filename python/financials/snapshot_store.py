@@ -0,0 +1,570 @@
+"""
+Point-in-time snapshot store for `dissertation_data`.
+
+Each symbol's quarterly history is loaded once (one indexed query on
+`idx_symbol_fiscalDate`) into a dense NumPy block holding only the numeric
+statement fields. Lookups by (symbol, fiscalDateEnding), as-of lookups and
+industry peer lookups are then served from memory.
+
+The store is bounded by bytes (LRU eviction of whole symbols) and drops a
+symbol when its `pull_date` changes in MySQL. That check runs on a
+background thread and only re-reads per-symbol pull dates when a one-row
+change marker for the table has moved.
+
+    python -m financials.snapshot_store --bench            # synthetic 4k universe
+    python -m financials.snapshot_store --bench --from-db  # real table
+"""
+
+import argparse
+import bisect
+import datetime as dt
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import db
+
+from .schema import NUMERIC_FIELDS, TABLE, coerce_numeric
+
+logger = logging.getLogger(__name__)
+
+DateLike = Any  # datetime.date, datetime.datetime, numpy.datetime64 or ISO string
+
+
+def _to_date(value: DateLike) -> dt.date:
+    if type(value) is dt.date:
+        return value
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return dt.date.fromisoformat(value[:10])
+    return np.datetime64(value, "D").astype(dt.date)
+
+
+def _day(value: DateLike) -> np.datetime64:
+    return np.datetime64(_to_date(value), "D")
+
+
+class SymbolHistory:
+    """
+    One symbol's quarters: sorted `dates` (datetime64[D]) and a
+    `values[len(dates), len(fields)]` block.
+
+    `keys`/`rows` mirror `dates` as plain Python dates so scalar lookups use
+    bisect and dict access instead of paying NumPy's per-call overhead.
+    """
+
+    __slots__ = ("symbol", "industry", "pull_date", "dates", "values", "keys", "rows")
+
+    def __init__(
+        self,
+        symbol: str,
+        industry: Optional[str],
+        pull_date: Optional[dt.date],
+        dates: np.ndarray,
+        values: np.ndarray,
+    ):
+        self.symbol = symbol
+        self.industry = industry
+        self.pull_date = pull_date
+        self.dates = dates
+        self.values = values
+        self.keys: List[dt.date] = dates.astype(dt.date).tolist()
+        self.rows: Dict[dt.date, int] = {d: i for i, d in enumerate(self.keys)}
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.dates.nbytes
+            + self.values.nbytes
+            + sys.getsizeof(self.keys)
+            + sys.getsizeof(self.rows)
+            + 32 * len(self.keys)  # date objects
+        )
+
+    def index_of(self, fiscal_date: DateLike) -> int:
+        return self.rows.get(_to_date(fiscal_date), -1)
+
+    def index_as_of(self, when: DateLike) -> int:
+        """Latest quarter with fiscalDateEnding <= `when`, or -1."""
+        return bisect.bisect_right(self.keys, _to_date(when)) - 1
+
+
+class Snapshot:
+    """Lightweight view of one quarter; fields are read on access."""
+
+    __slots__ = ("_history", "_row", "_fields")
+
+    def __init__(self, history: SymbolHistory, row: int, fields: Dict[str, int]):
+        self._history = history
+        self._row = row
+        self._fields = fields
+
+    @property
+    def symbol(self) -> str:
+        return self._history.symbol
+
+    @property
+    def fiscal_date(self) -> dt.date:
+        return self._history.keys[self._row]
+
+    def __getitem__(self, field: str) -> float:
+        return float(self._history.values[self._row, self._fields[field]])
+
+    def get(self, field: str, default: Optional[float] = None) -> Optional[float]:
+        col = self._fields.get(field)
+        if col is None:
+            return default
+        v = float(self._history.values[self._row, col])
+        return default if v != v else v
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        row = self._history.values[self._row].tolist()
+        return {
+            name: (None if row[i] != row[i] else row[i])
+            for name, i in self._fields.items()
+        }
+
+
+# ------------------------------------------------
+# MySQL loader
+# ------------------------------------------------
+class MySQLSnapshotSource:
+    """Reads `dissertation_data` for the store; one connection per call."""
+
+    def __init__(self, fields: Sequence[str], connect: Callable[[], Any] = db.connect):
+        self.fields = tuple(fields)
+        self.connect = connect
+        self._select = ", ".join(
+            db.quote_ident(c)
+            for c in ("symbol", "fiscalDateEnding", "industry", "pull_date") + self.fields
+        )
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> Iterator[Tuple[Any, ...]]:
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            while True:
+                chunk = cur.fetchmany(5000)
+                if not chunk:
+                    break
+                yield from chunk
+            cur.close()
+        finally:
+            conn.close()
+
+    def load_symbol(self, symbol: str) -> List[Tuple[Any, ...]]:
+        return list(self._query(
+            f"SELECT {self._select} FROM `{TABLE}` "
+            "WHERE symbol = %s AND fiscalDateEnding IS NOT NULL ORDER BY fiscalDateEnding",
+            (symbol,),
+        ))
+
+    def load_all(self) -> Iterator[Tuple[Any, ...]]:
+        return self._query(
+            f"SELECT {self._select} FROM `{TABLE}` "
+            "WHERE symbol IS NOT NULL AND fiscalDateEnding IS NOT NULL "
+            "ORDER BY symbol, fiscalDateEnding"
+        )
+
+    def pull_dates(self) -> Dict[str, Tuple[Optional[dt.date], Optional[str]]]:
+        """symbol -> (latest pull_date, industry)."""
+        return {
+            row[0]: (row[1], row[2])
+            for row in self._query(
+                f"SELECT symbol, MAX(pull_date), MAX(industry) FROM `{TABLE}` "
+                "WHERE symbol IS NOT NULL GROUP BY symbol"
+            )
+        }
+
+    def change_marker(self) -> Tuple[Any, ...]:
+        """
+        One aggregate row that moves whenever rows are added or any row's
+        pull_date changes, so the per-symbol GROUP BY can be skipped.
+        """
+        return tuple(next(self._query(
+            f"SELECT COUNT(*), MAX(pull_date), SUM(TO_DAYS(pull_date)) FROM `{TABLE}`"
+        )))
+
+
+# ------------------------------------------------
+# Store
+# ------------------------------------------------
+class SnapshotStore:
+    """
+    Thread-safe, memory-bounded cache of SymbolHistory blocks.
+
+    `max_bytes` defaults to SNAPSHOT_CACHE_MAX_MB (256 MB). `check_interval`
+    is how often (seconds) `pull_date` is re-read from MySQL to invalidate
+    refreshed symbols; 0 disables the check. Lookups start that check on a
+    background thread and keep serving the cached snapshot meanwhile.
+    """
+
+    def __init__(
+        self,
+        source: Optional[Any] = None,
+        fields: Sequence[str] = NUMERIC_FIELDS,
+        max_bytes: Optional[int] = None,
+        dtype: Any = np.float64,
+        check_interval: float = 300,
+    ):
+        self.fields = tuple(fields)
+        self.field_index = {name: i for i, name in enumerate(self.fields)}
+        self.source = source if source is not None else MySQLSnapshotSource(self.fields)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("SNAPSHOT_CACHE_MAX_MB", "256")) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self.check_interval = check_interval
+
+        self._cache: "OrderedDict[str, SymbolHistory]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._industry_members: Dict[str, List[str]] = {}
+        self._known: Dict[str, Tuple[Optional[dt.date], Optional[str]]] = {}
+        self._last_check = 0.0
+        self._marker: Optional[Tuple[Any, ...]] = None
+        self._refreshing = False
+        self.hits = 0
+        self.misses = 0
+
+    # ---- building blocks ----
+    def build_history(self, symbol: str, rows: Sequence[Tuple[Any, ...]]) -> SymbolHistory:
+        """Rows are (symbol, fiscalDateEnding, industry, pull_date, *fields)."""
+        if rows:
+            dates = np.array([r[1] for r in rows], dtype="datetime64[D]")
+            values, _ = coerce_numeric([r[4:] for r in rows])
+            values = values.astype(self.dtype, copy=False)
+            order = np.argsort(dates, kind="stable")
+            dates, values = dates[order], values[order]
+            industry = rows[-1][2]
+            pulls = [r[3] for r in rows if r[3] is not None]
+            pull_date = max(pulls) if pulls else None
+        else:
+            dates = np.empty(0, dtype="datetime64[D]")
+            values = np.empty((0, len(self.fields)), dtype=self.dtype)
+            industry, pull_date = None, None
+        return SymbolHistory(symbol, industry, pull_date, dates, np.ascontiguousarray(values))
+
+    def put(self, history: SymbolHistory) -> None:
+        with self._lock:
+            old = self._cache.pop(history.symbol, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._cache[history.symbol] = history
+            self._bytes += history.nbytes
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._cache) > 1:
+            _, old = self._cache.popitem(last=False)
+            self._bytes -= old.nbytes
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+                self._bytes = 0
+                return
+            old = self._cache.pop(symbol, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+
+    # ---- freshness ----
+    def refresh(self, force: bool = False, wait: bool = True) -> int:
+        """
+        Re-read per-symbol pull_date and drop stale symbols. Returns the
+        number of symbols invalidated.
+
+        Only one check runs at a time; callers arriving meanwhile return 0
+        at once. With `wait=False` the check runs on a background thread
+        (and 0 is returned).
+        """
+        now = time.monotonic()
+        if not force and (not self.check_interval or now - self._last_check < self.check_interval):
+            return 0
+        with self._lock:
+            if self._refreshing:
+                return 0
+            if not force and (not self.check_interval or now - self._last_check < self.check_interval):
+                return 0
+            # Claimed before querying, so concurrent callers don't rescan.
+            self._refreshing = True
+            self._last_check = now
+        if wait:
+            return self._refresh(force)
+        threading.Thread(target=self._refresh_quietly, name="snapshot-refresh", daemon=True).start()
+        return 0
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self._refresh(False)
+        except Exception as ex:
+            logger.warning("snapshot freshness check failed: %s", ex)
+
+    def _refresh(self, force: bool) -> int:
+        try:
+            marker = self.source.change_marker()
+            if not force and marker == self._marker:
+                return 0
+            known = self.source.pull_dates()
+            dropped = 0
+            with self._lock:
+                for symbol, hist in list(self._cache.items()):
+                    latest = known.get(symbol)
+                    if latest is None or latest[0] != hist.pull_date:
+                        self._bytes -= hist.nbytes
+                        del self._cache[symbol]
+                        dropped += 1
+                self._known = known
+                self._marker = marker
+                members: Dict[str, List[str]] = {}
+                for symbol, (_, industry) in known.items():
+                    if industry:
+                        members.setdefault(industry, []).append(symbol)
+                self._industry_members = {k: sorted(v) for k, v in members.items()}
+            return dropped
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    # ---- loading ----
+    def history(self, symbol: str) -> SymbolHistory:
+        self.refresh(wait=False)
+        return self._load(symbol)
+
+    def _load(self, symbol: str) -> SymbolHistory:
+        with self._lock:
+            hist = self._cache.get(symbol)
+            if hist is not None:
+                self._cache.move_to_end(symbol)
+                self.hits += 1
+                return hist
+            self.misses += 1
+        hist = self.build_history(symbol, self.source.load_symbol(symbol))
+        self.put(hist)
+        return hist
+
+    def preload(self, symbols: Optional[Iterable[str]] = None) -> int:
+        """
+        Bulk-load the whole table in one ordered scan (or just `symbols`).
+        Returns the number of symbols loaded.
+        """
+        if symbols is not None:
+            n = 0
+            for s in symbols:
+                self.history(s)
+                n += 1
+            return n
+
+        n = 0
+        current: Optional[str] = None
+        rows: List[Tuple[Any, ...]] = []
+        for row in self.source.load_all():
+            if row[0] != current and rows:
+                self.put(self.build_history(current, rows))
+                n += 1
+                rows = []
+            current = row[0]
+            rows.append(row)
+        if rows:
+            self.put(self.build_history(current, rows))
+            n += 1
+        self.refresh(force=True)
+        return n
+
+    # ---- lookups ----
+    def get(self, symbol: str, fiscal_date: DateLike) -> Optional[Snapshot]:
+        hist = self.history(symbol)
+        i = hist.index_of(fiscal_date)
+        return Snapshot(hist, i, self.field_index) if i >= 0 else None
+
+    def as_of(self, symbol: str, when: DateLike) -> Optional[Snapshot]:
+        hist = self.history(symbol)
+        i = hist.index_as_of(when)
+        return Snapshot(hist, i, self.field_index) if i >= 0 else None
+
+    def value(self, symbol: str, fiscal_date: DateLike, field: str) -> Optional[float]:
+        hist = self.history(symbol)
+        i = hist.index_of(fiscal_date)
+        if i < 0:
+            return None
+        v = float(hist.values[i, self.field_index[field]])
+        return None if v != v else v
+
+    def series(
+        self, symbol: str, field: str, start: Optional[DateLike] = None, end: Optional[DateLike] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(dates, values) for one field; arrays are views, do not mutate."""
+        hist = self.history(symbol)
+        lo = 0 if start is None else int(np.searchsorted(hist.dates, _day(start)))
+        hi = len(hist.dates) if end is None else int(np.searchsorted(hist.dates, _day(end), side="right"))
+        return hist.dates[lo:hi], hist.values[lo:hi, self.field_index[field]]
+
+    def industry_symbols(self, industry: str) -> List[str]:
+        if not self._industry_members and self.check_interval:
+            self.refresh(force=True)
+        with self._lock:
+            members = self._industry_members.get(industry)
+            if members is not None:
+                return list(members)
+            return sorted(s for s, h in self._cache.items() if h.industry == industry)
+
+    def peers(
+        self, industry: str, when: DateLike, field: str, as_of: bool = True
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        `field` for every symbol in `industry` at `when` (latest quarter on
+        or before it when `as_of`, exact fiscalDateEnding otherwise).
+        """
+        col = self.field_index[field]
+        symbols = self.industry_symbols(industry)
+        out = np.full(len(symbols), np.nan)
+        self.refresh(wait=False)
+        for k, symbol in enumerate(symbols):
+            hist = self._load(symbol)
+            i = hist.index_as_of(when) if as_of else hist.index_of(when)
+            if i >= 0:
+                out[k] = hist.values[i, col]
+        return symbols, out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "symbols": len(self._cache),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# ------------------------------------------------
+# Benchmark
+# ------------------------------------------------
+class _SyntheticSource:
+    """In-memory stand-in shaped like the real universe (for --bench)."""
+
+    def __init__(self, n_symbols: int, n_quarters: int, fields: Sequence[str], seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.n_fields = len(fields)
+        self.symbols = [f"S{i:04d}" for i in range(n_symbols)]
+        self.industries = {s: f"IND{i % 60:02d}" for i, s in enumerate(self.symbols)}
+        start = np.datetime64("2014-03-31")
+        self.dates = [
+            (start + np.timedelta64(91 * q, "D")).astype(dt.date) for q in range(n_quarters)
+        ]
+        self.pull = dt.date(2025, 10, 1)
+        self._values = rng.normal(1e8, 5e7, size=(n_quarters, self.n_fields)).round()
+
+    def _rows(self, symbol: str) -> List[Tuple[Any, ...]]:
+        ind = self.industries[symbol]
+        # Strings, as they come out of the varchar columns.
+        text = self._values.astype(int).astype(str)
+        return [
+            (symbol, d, ind, self.pull) + tuple(text[q])
+            for q, d in enumerate(self.dates)
+        ]
+
+    def load_symbol(self, symbol: str) -> List[Tuple[Any, ...]]:
+        return self._rows(symbol)
+
+    def load_all(self) -> Iterator[Tuple[Any, ...]]:
+        for s in self.symbols:
+            yield from self._rows(s)
+
+    def pull_dates(self) -> Dict[str, Tuple[Optional[dt.date], Optional[str]]]:
+        return {s: (self.pull, self.industries[s]) for s in self.symbols}
+
+    def change_marker(self) -> Tuple[Any, ...]:
+        return (len(self.symbols) * len(self.dates), self.pull)
+
+
+def benchmark(store: SnapshotStore, lookups: int = 200_000) -> Dict[str, Any]:
+    import resource
+
+    t0 = time.perf_counter()
+    loaded = store.preload()
+    load_seconds = time.perf_counter() - t0
+    # ru_maxrss is KiB on Linux; includes the interpreter and the loader.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    with store._lock:
+        histories = list(store._cache.values())
+    rng = np.random.default_rng(1)
+    picks = rng.integers(0, len(histories), size=lookups)
+    probes = [
+        (h.symbol, h.keys[int(rng.integers(0, len(h.keys)))])
+        for h in (histories[i] for i in picks)
+        if len(h.dates)
+    ]
+    field = store.fields[0]
+
+    t0 = time.perf_counter()
+    for symbol, d in probes:
+        store.value(symbol, d, field)
+    point_ns = (time.perf_counter() - t0) / max(1, len(probes)) * 1e9
+
+    t0 = time.perf_counter()
+    for symbol, d in probes[:20_000]:
+        store.as_of(symbol, d)
+    as_of_ns = (time.perf_counter() - t0) / max(1, min(len(probes), 20_000)) * 1e9
+
+    industry = histories[0].industry or ""
+    when = histories[0].keys[-1]
+    n_peer = 2_000
+    t0 = time.perf_counter()
+    for _ in range(n_peer):
+        store.peers(industry, when, field)
+    peer_us = (time.perf_counter() - t0) / n_peer * 1e6
+
+    return {
+        "symbols": loaded,
+        "quarters": int(sum(len(h.dates) for h in histories)),
+        "fields": len(store.fields),
+        "dtype": str(store.dtype),
+        "cache_bytes": store.stats()["bytes"],
+        "peak_rss_bytes": peak_rss,
+        "load_seconds": round(load_seconds, 3),
+        "point_lookup_ns": round(point_ns, 1),
+        "as_of_lookup_ns": round(as_of_ns, 1),
+        "peer_lookup_us": round(peer_us, 1),
+        "peer_group_size": len(store.industry_symbols(industry)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m financials.snapshot_store")
+    parser.add_argument("--bench", action="store_true", help="measure footprint and lookup latency")
+    parser.add_argument("--from-db", action="store_true", help="benchmark against MySQL instead of synthetic data")
+    parser.add_argument("--symbols", type=int, default=4000)
+    parser.add_argument("--quarters", type=int, default=40)
+    parser.add_argument("--float32", action="store_true", help="store values as float32")
+    args = parser.parse_args(argv)
+
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    dtype = np.float32 if args.float32 else np.float64
+    if args.from_db:
+        db.load_env()
+        source: Any = MySQLSnapshotSource(NUMERIC_FIELDS)
+    else:
+        source = _SyntheticSource(args.symbols, args.quarters, NUMERIC_FIELDS)
+    store = SnapshotStore(source, max_bytes=1 << 40, dtype=dtype, check_interval=0)
+
+    for key, value in benchmark(store).items():
+        print(f"{key:>20}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,20 @@
+"""
+Location-market profiles: competitor and demographic aggregates per
+geohash tile and business type, cached in MySQL and served from the
+nearest tiles around an address.
+"""
+
+from .market import MarketClient, MarketDataError, MarketNotConfigured
+from .service import PROVIDER_ERRORS, LocationProfiles
+from .tiles import Tile, ensure_tables, normalize_type
+
+__all__ = [
+    "LocationProfiles",
+    "MarketClient",
+    "MarketDataError",
+    "MarketNotConfigured",
+    "PROVIDER_ERRORS",
+    "Tile",
+    "ensure_tables",
+    "normalize_type",
+]
@@ -0,0 +1,154 @@
+"""
+Geohash encoding, tile bounds and neighbour lookup.
+
+Precision 6 (the default tile) is about 1.2 km x 0.6 km at the equator;
+precision 5 about 4.9 km x 4.9 km.
+"""
+
+import functools
+import math
+from typing import Dict, List, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE: Dict[str, int] = {c: i for i, c in enumerate(BASE32)}
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def encode(lat: float, lng: float, precision: int = 6) -> str:
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        raise ValueError(f"coordinates out of range: {lat}, {lng}")
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    out = []
+    bits = 0
+    value = 0
+    even = True
+    while len(out) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                value = (value << 1) | 1
+                lng_lo = mid
+            else:
+                value <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(out)
+
+
+@functools.lru_cache(maxsize=65536)
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of the tile."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    even = True
+    for ch in geohash:
+        try:
+            value = _DECODE[ch]
+        except KeyError:
+            raise ValueError(f"invalid geohash: {geohash!r}")
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                if bit:
+                    lng_lo = mid
+                else:
+                    lng_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lat_lo, lng_lo, lat_hi, lng_hi
+
+
+def center(geohash: str) -> Tuple[float, float]:
+    south, west, north, east = bounds(geohash)
+    return (south + north) / 2, (west + east) / 2
+
+
+def contains(geohash: str, lat: float, lng: float) -> bool:
+    south, west, north, east = bounds(geohash)
+    return south <= lat < north and west <= lng < east
+
+
+def neighbors(geohash: str, rings: int = 1) -> List[str]:
+    """
+    The tile plus every tile within `rings` steps (3x3 for rings=1, 5x5 for
+    rings=2), nearest first. Poles clip; the antimeridian wraps.
+    """
+    south, west, north, east = bounds(geohash)
+    dlat, dlng = north - south, east - west
+    clat, clng = (south + north) / 2, (west + east) / 2
+    precision = len(geohash)
+    cells = []
+    for i in range(-rings, rings + 1):
+        for j in range(-rings, rings + 1):
+            lat = clat + i * dlat
+            if not -90 < lat < 90:
+                continue
+            lng = (clng + j * dlng + 180) % 360 - 180
+            cells.append((max(abs(i), abs(j)), abs(i) + abs(j), encode(lat, lng, precision)))
+    seen = set()
+    out = []
+    for _, _, cell in sorted(cells):
+        if cell not in seen:
+            seen.add(cell)
+            out.append(cell)
+    return out
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+@functools.lru_cache(maxsize=65536)
+def area_km2(geohash: str) -> float:
+    south, west, north, east = bounds(geohash)
+    mid = (south + north) / 2
+    height = haversine_m(south, west, north, west)
+    width = haversine_m(mid, west, mid, east)
+    return height * width / 1e6
+
+
+def covering_radius_m(geohash: str) -> float:
+    """Radius of the circle around the tile centre that covers the whole tile."""
+    south, west, north, east = bounds(geohash)
+    clat, clng = center(geohash)
+    return max(haversine_m(clat, clng, lat, lng) for lat in (south, north) for lng in (west, east))
+
+
+def covering(south: float, west: float, north: float, east: float, precision: int = 6) -> List[str]:
+    """Every tile of the given precision that intersects the box."""
+    s, w, n, e = bounds(encode(south, west, precision))
+    dlat, dlng = n - s, e - w
+    out = []
+    lat = s + dlat / 2
+    while lat - dlat / 2 <= north and lat < 90:
+        lng = w + dlng / 2
+        while lng - dlng / 2 <= east and lng < 180:
+            out.append(encode(lat, lng, precision))
+            lng += dlng
+        lat += dlat
+    return out
@@ -0,0 +1,251 @@
+"""
+Provider calls behind a tile refresh: Places nearby search, Yelp business
+search and Google geocoding, all through the shared `outbound` client so
+the google / yelp breakers, hedging and bulkheads apply.
+
+Base URLs follow the same GOOGLE_MAPS_BASE_URL / YELP_BASE_URL overrides as
+the test scripts, so `python -m mock_apis` can stand in for both.
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import db
+import outbound
+
+from .geohash import haversine_m
+
+GOOGLE_PAGE_LIMIT = 3
+YELP_PAGE_SIZE = 50
+YELP_MAX_RADIUS_M = 40_000
+YELP_PRICE = {"$": 1, "$$": 2, "$$$": 3, "$$$$": 4}
+# Google reports per-second quota as HTTP 200 with this status, which the
+# outbound client cannot see.
+GOOGLE_QUOTA_RETRIES = 3
+# Same business listed on both providers.
+DUPLICATE_RADIUS_M = 75
+
+
+class MarketDataError(Exception):
+    def __init__(self, provider: str, message: str):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+
+
+class MarketNotConfigured(MarketDataError):
+    """No API key for a provider the request needs; retrying will not help."""
+
+
+class Competitor:
+    __slots__ = ("name", "lat", "lng", "rating", "price_level", "reviews", "source")
+
+    def __init__(
+        self,
+        name: str,
+        lat: float,
+        lng: float,
+        rating: Optional[float],
+        price_level: Optional[int],
+        reviews: int,
+        source: str,
+    ):
+        self.name = name
+        self.lat = lat
+        self.lng = lng
+        self.rating = rating
+        self.price_level = price_level
+        self.reviews = reviews
+        self.source = source
+
+    @property
+    def match_key(self) -> str:
+        return re.sub(r"[^a-z0-9]", "", self.name.lower())
+
+
+class MarketClient:
+    """
+    Thin wrappers over the three endpoints. A provider without an API key is
+    skipped (`enabled` lists the ones configured).
+    """
+
+    def __init__(
+        self,
+        google_key: Optional[str] = None,
+        yelp_key: Optional[str] = None,
+        page_token_wait: Optional[float] = None,
+    ):
+        self.google_key = google_key if google_key is not None else db.getenv("GOOGLE_PLACES_API_KEY", "")
+        self.yelp_key = yelp_key if yelp_key is not None else db.getenv("YELP_API_KEY", "")
+        self.google_url = db.getenv("GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com").rstrip("/")
+        self.yelp_url = db.getenv("YELP_BASE_URL", "https://api.yelp.com").rstrip("/")
+        # Google rejects a next_page_token for a couple of seconds after
+        # issuing it.
+        self.page_token_wait = (
+            page_token_wait if page_token_wait is not None
+            else float(db.getenv("LOCATION_PAGE_TOKEN_WAIT_SECONDS", "2"))
+        )
+
+    @property
+    def enabled(self) -> List[str]:
+        return [name for name, key in (("google", self.google_key), ("yelp", self.yelp_key)) if key]
+
+    def _google(self, endpoint: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        for attempt in range(GOOGLE_QUOTA_RETRIES + 1):
+            resp = outbound.get("google", self.google_url + path, params=params)
+            if not resp.ok:
+                raise MarketDataError("google", f"{endpoint} HTTP {resp.status_code}")
+            data = resp.json()
+            if data.get("status") != "OVER_QUERY_LIMIT" or attempt == GOOGLE_QUOTA_RETRIES:
+                break
+            time.sleep(outbound.backoff_delay(attempt, 0.5, 4.0))
+        return data
+
+    # ------------------------------------------------
+    # Geocoding
+    # ------------------------------------------------
+    def _geocode(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.google_key:
+            raise MarketNotConfigured("google", "GOOGLE_PLACES_API_KEY is not set")
+        data = self._google("geocode", "/maps/api/geocode/json", {**params, "key": self.google_key})
+        status = data.get("status")
+        if status == "ZERO_RESULTS":
+            return None
+        if status != "OK" or not data.get("results"):
+            raise MarketDataError("google", f"geocode {status}: {data.get('error_message', '')}".strip())
+
+        result = data["results"][0]
+        location = result["geometry"]["location"]
+        locality = state = None
+        for comp in result.get("address_components", []):
+            types = comp.get("types", [])
+            if "locality" in types:
+                locality = comp.get("long_name")
+            elif "administrative_area_level_1" in types:
+                state = comp.get("short_name")
+        return {
+            "formatted_address": result.get("formatted_address"),
+            "lat": float(location["lat"]),
+            "lng": float(location["lng"]),
+            "locality": locality,
+            "state": state,
+        }
+
+    def geocode(self, address: str) -> Optional[Dict[str, Any]]:
+        return self._geocode({"address": address})
+
+    def reverse_geocode(self, lat: float, lng: float) -> Optional[Dict[str, Any]]:
+        return self._geocode({"latlng": f"{lat:.6f},{lng:.6f}"})
+
+    # ------------------------------------------------
+    # Competitors
+    # ------------------------------------------------
+    def places_nearby(self, lat: float, lng: float, radius: float, keyword: str) -> Tuple[List[Competitor], bool]:
+        """
+        Every page of a nearby search. The second value is True when Google's
+        60-result cap was hit, i.e. the count is a lower bound.
+        """
+        params: Dict[str, Any] = {
+            "location": f"{lat:.6f},{lng:.6f}",
+            "radius": int(round(radius)),
+            "keyword": keyword,
+            "key": self.google_key,
+        }
+        out: List[Competitor] = []
+        pages = 0
+        while True:
+            data = self._places_page(params)
+            pages += 1
+            for place in data.get("results", []):
+                loc = (place.get("geometry") or {}).get("location") or {}
+                if "lat" not in loc or "lng" not in loc:
+                    continue
+                out.append(Competitor(
+                    place.get("name") or "",
+                    float(loc["lat"]),
+                    float(loc["lng"]),
+                    place.get("rating"),
+                    place.get("price_level"),
+                    int(place.get("user_ratings_total") or 0),
+                    "google",
+                ))
+            token = data.get("next_page_token")
+            if not token or pages >= GOOGLE_PAGE_LIMIT:
+                return out, len(out) >= 20 * GOOGLE_PAGE_LIMIT
+            params = {"pagetoken": token, "key": self.google_key}
+
+    def _places_page(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        is_token = "pagetoken" in params
+        for _ in range(3 if is_token else 1):
+            if is_token and self.page_token_wait > 0:
+                time.sleep(self.page_token_wait)
+            data = self._google("nearbysearch", "/maps/api/place/nearbysearch/json", params)
+            status = data.get("status")
+            if status in ("OK", "ZERO_RESULTS"):
+                return data
+            if not (is_token and status == "INVALID_REQUEST"):
+                break
+        raise MarketDataError("google", f"nearbysearch {status}: {data.get('error_message', '')}".strip())
+
+    def yelp_search(self, lat: float, lng: float, radius: float, term: str, max_results: int = 100) -> List[Competitor]:
+        url = f"{self.yelp_url}/v3/businesses/search"
+        headers = {"Authorization": f"Bearer {self.yelp_key}"}
+        out: List[Competitor] = []
+        offset = 0
+        while offset < max_results:
+            resp = outbound.get("yelp", url, headers=headers, params={
+                "term": term,
+                "latitude": f"{lat:.6f}",
+                "longitude": f"{lng:.6f}",
+                "radius": min(int(round(radius)), YELP_MAX_RADIUS_M),
+                "limit": YELP_PAGE_SIZE,
+                "offset": offset,
+            })
+            if not resp.ok:
+                raise MarketDataError("yelp", f"search HTTP {resp.status_code}")
+            data = resp.json()
+            businesses = data.get("businesses") or []
+            for biz in businesses:
+                coords = biz.get("coordinates") or {}
+                if coords.get("latitude") is None or coords.get("longitude") is None:
+                    continue
+                out.append(Competitor(
+                    biz.get("name") or "",
+                    float(coords["latitude"]),
+                    float(coords["longitude"]),
+                    biz.get("rating"),
+                    YELP_PRICE.get(biz.get("price") or ""),
+                    int(biz.get("review_count") or 0),
+                    "yelp",
+                ))
+            offset += len(businesses)
+            if len(businesses) < YELP_PAGE_SIZE or offset >= int(data.get("total") or 0):
+                break
+        return out
+
+
+def merge_competitors(*lists: List[Competitor]) -> List[Competitor]:
+    """
+    One entry per business: listings with the same normalised name within
+    75 m are the same place. The listing with more reviews wins; a missing
+    price level is filled from the other.
+    """
+    merged: List[Competitor] = []
+    by_key: Dict[str, List[int]] = {}
+    for items in lists:
+        for c in items:
+            match = None
+            for i in by_key.get(c.match_key, []):
+                other = merged[i]
+                if haversine_m(c.lat, c.lng, other.lat, other.lng) <= DUPLICATE_RADIUS_M:
+                    match = i
+                    break
+            if match is None:
+                by_key.setdefault(c.match_key, []).append(len(merged))
+                merged.append(c)
+                continue
+            keep, drop = (c, merged[match]) if c.reviews > merged[match].reviews else (merged[match], c)
+            if keep.price_level is None:
+                keep.price_level = drop.price_level
+            merged[match] = keep
+    return merged
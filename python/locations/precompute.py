@@ -0,0 +1,131 @@
+"""
+Warm the location tile cache ahead of traffic.
+
+    python -m locations.precompute --types coffee bakery --bbox 30.20,-97.80,30.32,-97.68
+    python -m locations.precompute --types coffee --address "600 Congress Ave, Austin, TX"
+    python -m locations.precompute --from-plans --limit 500
+
+Only missing tiles and tiles older than LOCATION_TILE_TTL_HOURS are fetched
+unless --force is given.
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import db
+
+from . import geohash
+from .market import MarketNotConfigured
+from .service import PROVIDER_ERRORS, LocationProfiles
+from .tiles import normalize_type
+
+MAX_TILES = 5000
+
+
+def _floats(raw: str, n: int) -> Tuple[float, ...]:
+    try:
+        values = tuple(float(v) for v in raw.split(","))
+    except ValueError:
+        values = ()
+    if len(values) != n:
+        raise argparse.ArgumentTypeError(f"expected {n} comma-separated numbers, got {raw!r}")
+    return values
+
+
+def plan_targets(conn: Any, limit: int) -> List[Tuple[str, str]]:
+    """(business type, address) of the most recent plans that have both."""
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT `business_type`, `address` FROM `business_plans` "
+            "WHERE `business_type` IS NOT NULL AND `address` IS NOT NULL "
+            "ORDER BY `created_at` DESC LIMIT %s",
+            [limit],
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    return list(dict.fromkeys((str(t), str(a)) for t, a in rows if str(t).strip() and str(a).strip()))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m locations.precompute")
+    parser.add_argument("--types", nargs="+", default=[], help="business types (Places keyword / Yelp term)")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--address", action="append", help="tiles around a street address (repeatable)")
+    where.add_argument("--latlng", type=lambda s: _floats(s, 2), action="append", help="tiles around LAT,LNG")
+    where.add_argument("--bbox", type=lambda s: _floats(s, 4), help="every tile in SOUTH,WEST,NORTH,EAST")
+    where.add_argument("--from-plans", action="store_true", help="types and addresses of recent business plans")
+    parser.add_argument("--limit", type=int, default=200, help="plans to read with --from-plans")
+    parser.add_argument("--rings", type=int, help="neighbour rings around each point (default LOCATION_PROFILE_RINGS)")
+    parser.add_argument("--force", action="store_true", help="rebuild fresh tiles too")
+    args = parser.parse_args(argv)
+
+    db.load_env()
+    profiles = LocationProfiles.from_env()
+    rings = args.rings if args.rings is not None else profiles.rings
+    types = [normalize_type(t) for t in args.types if normalize_type(t)]
+    if not types and not args.from_plans:
+        parser.error("--types is required unless --from-plans is given")
+
+    # business type -> tiles to build
+    work: Dict[str, List[str]] = {}
+    try:
+        points: List[Tuple[Optional[str], float, float]] = []
+        if args.from_plans:
+            conn = db.connect()
+            try:
+                targets = plan_targets(conn, args.limit)
+            finally:
+                conn.close()
+            for business_type, address in targets:
+                located = profiles.locate(address)
+                if located is None:
+                    print(f"Skipping {address!r}: not found", file=sys.stderr)
+                    continue
+                points.append((business_type, located["lat"], located["lng"]))
+        for address in args.address or []:
+            located = profiles.locate(address)
+            if located is None:
+                print(f"Address not found: {address!r}", file=sys.stderr)
+                return 1
+            points.append((None, located["lat"], located["lng"]))
+        for lat, lng in args.latlng or []:
+            points.append((None, lat, lng))
+
+        if args.bbox:
+            cells = geohash.covering(*args.bbox, precision=profiles.precision)
+            for business_type in types:
+                work.setdefault(business_type, []).extend(cells)
+        for business_type, lat, lng in points:
+            cells = geohash.neighbors(geohash.encode(lat, lng, profiles.precision), rings)
+            for t in [normalize_type(business_type)] if business_type else types:
+                work.setdefault(t, []).extend(cells)
+
+        total = sum(len(set(cells)) for cells in work.values())
+        if total > MAX_TILES:
+            print(f"{total} tiles requested, more than {MAX_TILES}; narrow the area", file=sys.stderr)
+            return 1
+        for business_type, cells in work.items():
+            counts = profiles.precompute([business_type], cells, force=args.force)
+            print(
+                f"{business_type}: {counts['tiles']} tiles, {counts['fresh']} fresh, "
+                f"{counts['built']} built, {counts['failed']} failed"
+            )
+        return 0
+    except MarketNotConfigured as ex:
+        print(f"Not configured: {ex}", file=sys.stderr)
+        return 1
+    except PROVIDER_ERRORS as ex:
+        print(f"Provider error: {ex}", file=sys.stderr)
+        return 1
+    except Exception as ex:
+        print(f"Precompute failed: {ex}", file=sys.stderr)
+        return 1
+    finally:
+        profiles.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,395 @@
+"""
+Location-market profiles served from the geohash tile cache.
+
+A profile for an address is the sum of the tile it falls in and its
+neighbours (`rings`), so a lookup is a geocode (memory / `location_geocodes`
+/ Google) plus one indexed query for at most (2 * rings + 1)^2 tiles, or no
+query at all when every tile is in the in-process LRU.
+
+Tiles older than `ttl` are still served, flagged `stale`, and refreshed in
+the background; each (business type, geohash) is refreshed by at most one
+worker at a time. Missing tiles are built inline when `wait` is set,
+otherwise they are scheduled and reported as `pending`. Run
+`python -m locations.precompute` to warm areas ahead of traffic.
+"""
+
+import collections
+import datetime as dt
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+import db
+from outbound import ProviderUnavailable
+
+from . import geohash, tiles
+from .market import MarketClient, MarketDataError, MarketNotConfigured, merge_competitors
+from .tiles import Tile, normalize_type
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_ERRORS = (MarketDataError, ProviderUnavailable, requests.RequestException)
+
+
+class _LRU:
+    def __init__(self, size: int):
+        self.size = size
+        self._items: "collections.OrderedDict[Any, Any]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class LocationProfiles:
+    def __init__(
+        self,
+        connect: Optional[Callable[[], Any]] = None,
+        market: Optional[MarketClient] = None,
+        precision: int = 6,
+        ttl: dt.timedelta = dt.timedelta(days=7),
+        rings: int = 1,
+        cache_size: int = 20_000,
+        workers: int = 4,
+    ):
+        if not 4 <= precision <= 8:
+            raise ValueError("tile precision must be between 4 and 8")
+        self.connect = connect or db.connect
+        self.market = market or MarketClient()
+        self.precision = precision
+        self.ttl = ttl
+        self.rings = rings
+        self._tiles = _LRU(cache_size)
+        self._geocodes = _LRU(cache_size)
+        # Census place per tile centre; shared by every business type.
+        self._places = _LRU(cache_size)
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="location-tiles")
+        self.stats: Dict[str, int] = {
+            "profiles": 0, "memory_hits": 0, "db_hits": 0, "built": 0,
+            "build_errors": 0, "geocoded": 0,
+        }
+
+    @classmethod
+    def from_env(cls, connect: Optional[Callable[[], Any]] = None) -> "LocationProfiles":
+        return cls(
+            connect=connect,
+            precision=int(db.getenv("LOCATION_TILE_PRECISION", "6")),
+            ttl=dt.timedelta(hours=float(db.getenv("LOCATION_TILE_TTL_HOURS", "168"))),
+            rings=int(db.getenv("LOCATION_PROFILE_RINGS", "1")),
+            cache_size=int(db.getenv("LOCATION_CACHE_SIZE", "20000")),
+            workers=int(db.getenv("LOCATION_REFRESH_WORKERS", "4")),
+        )
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += n
+
+    # ------------------------------------------------
+    # Geocoding
+    # ------------------------------------------------
+    def locate(self, address: str) -> Optional[Dict[str, Any]]:
+        """Lat/lng, formatted address, city and state; None if Google finds nothing."""
+        key = tiles.address_key(address)
+        found = self._geocodes.get(key)
+        if found is not None:
+            return found
+        conn = self.connect()
+        try:
+            found = tiles.load_geocode(conn, address)
+            if found is None:
+                found = self.market.geocode(address)
+                self._count("geocoded")
+                if found is None:
+                    return None
+                tiles.save_geocode(conn, address, found)
+        finally:
+            conn.close()
+        self._geocodes.put(key, found)
+        return found
+
+    def _census_place(self, conn: Any, cell: str, hint: Optional[Dict[str, Any]]) -> Optional[Tuple[str, Optional[int], Optional[float]]]:
+        cached = self._places.get(cell)
+        if cached is not None:
+            return cached or None
+        # A geocoded address inside the tile saves the reverse lookup.
+        if hint is None or not hint.get("locality"):
+            hint = self.market.reverse_geocode(*geohash.center(cell)) or {}
+        place = tiles.census_place(conn, hint.get("locality"), hint.get("state"))
+        self._places.put(cell, place or ())
+        return place
+
+    # ------------------------------------------------
+    # Building tiles
+    # ------------------------------------------------
+    def build_tile(self, business_type: str, cell: str, hint: Optional[Dict[str, Any]] = None) -> Tile:
+        """
+        Fetch competitors around the tile from every configured provider,
+        keep the ones inside it, and store the aggregates. One provider
+        failing is tolerated; all of them failing raises its error.
+        """
+        enabled = self.market.enabled
+        if not enabled:
+            raise MarketNotConfigured("locations", "no market data provider configured")
+        lat, lng = geohash.center(cell)
+        radius = geohash.covering_radius_m(cell)
+
+        found: List[Any] = []
+        sources: List[str] = []
+        saturated = False
+        error: Optional[Exception] = None
+        for provider in enabled:
+            try:
+                if provider == "google":
+                    items, saturated = self.market.places_nearby(lat, lng, radius, business_type)
+                else:
+                    items = self.market.yelp_search(lat, lng, radius, business_type)
+            except PROVIDER_ERRORS as ex:
+                logger.warning("Tile %s/%s: %s failed: %s", cell, business_type, provider, ex)
+                error = ex
+                continue
+            found.append([c for c in items if geohash.contains(cell, c.lat, c.lng)])
+            sources.append(provider)
+        if not sources:
+            assert error is not None
+            raise error
+
+        competitors = merge_competitors(*found)
+        rated = [c.rating for c in competitors if c.rating is not None]
+        priced = [c.price_level for c in competitors if c.price_level is not None]
+
+        conn = self.connect()
+        try:
+            try:
+                place = self._census_place(conn, cell, hint)
+            except Exception as ex:
+                # Demographics are optional; a missing census table or a
+                # failed reverse geocode still leaves a usable tile.
+                logger.warning("Tile %s: census place lookup failed: %s", cell, ex)
+                place = None
+            tile = Tile(
+                cell,
+                business_type,
+                competitor_count=len(competitors),
+                rating_sum=sum(rated),
+                rating_count=len(rated),
+                price_sum=sum(priced),
+                price_count=len(priced),
+                review_count=sum(c.reviews for c in competitors),
+                saturated=saturated,
+                census_place=place[0] if place else None,
+                population=place[1] if place else None,
+                median_income=place[2] if place else None,
+                sources=",".join(sources),
+            )
+            tiles.save_tiles(conn, [tile])
+        finally:
+            conn.close()
+        self._tiles.put((business_type, cell), tile)
+        self._count("built")
+        return tile
+
+    def refresh(self, business_type: str, cell: str, hint: Optional[Dict[str, Any]] = None) -> Future:
+        """Schedule a rebuild, or join the one already running for this tile."""
+        key = (business_type, cell)
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut
+            fut = self._pool.submit(self.build_tile, business_type, cell, hint)
+            self._inflight[key] = fut
+
+        def done(f: Future) -> None:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if f.exception() is not None:
+                self._count("build_errors")
+                logger.warning("Tile %s/%s refresh failed: %s", cell, business_type, f.exception())
+
+        fut.add_done_callback(done)
+        return fut
+
+    def precompute(
+        self,
+        business_types: Iterable[str],
+        cells: Iterable[str],
+        force: bool = False,
+    ) -> Dict[str, int]:
+        """Build every missing or stale (or, with `force`, every) tile; blocks until done."""
+        cells = list(dict.fromkeys(cells))
+        counts = {"tiles": 0, "fresh": 0, "built": 0, "failed": 0}
+        for business_type in dict.fromkeys(normalize_type(t) for t in business_types if t):
+            current = {} if force else self._load(business_type, cells)
+            futures = []
+            for cell in cells:
+                counts["tiles"] += 1
+                tile = current.get(cell)
+                if tile is not None and tile.age() <= self.ttl:
+                    counts["fresh"] += 1
+                    continue
+                futures.append(self.refresh(business_type, cell))
+            for fut in futures:
+                try:
+                    fut.result()
+                    counts["built"] += 1
+                except Exception:
+                    # Already logged by the refresh callback.
+                    counts["failed"] += 1
+        return counts
+
+    # ------------------------------------------------
+    # Lookup
+    # ------------------------------------------------
+    def _load(self, business_type: str, cells: List[str]) -> Dict[str, Tile]:
+        """Tiles from memory, falling back to one query for the rest."""
+        out: Dict[str, Tile] = {}
+        wanted: List[str] = []
+        for cell in cells:
+            tile = self._tiles.get((business_type, cell))
+            if tile is not None and tile.age() <= self.ttl:
+                out[cell] = tile
+            else:
+                wanted.append(cell)
+        self._count("memory_hits", len(out))
+        if wanted:
+            conn = self.connect()
+            try:
+                stored = tiles.load_tiles(conn, business_type, wanted)
+            finally:
+                conn.close()
+            self._count("db_hits", len(stored))
+            for cell, tile in stored.items():
+                self._tiles.put((business_type, cell), tile)
+                out[cell] = tile
+        return out
+
+    def profile(
+        self,
+        business_type: str,
+        address: Optional[str] = None,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        wait: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Market profile around an address (or lat/lng). None when the address
+        cannot be geocoded. Raises a provider error only when no tile around
+        the point could be loaded or built.
+        """
+        business_type = normalize_type(business_type)
+        if not business_type:
+            raise ValueError("business_type is required")
+        if address:
+            located = self.locate(address)
+            if located is None:
+                return None
+        elif lat is not None and lng is not None:
+            located = {"formatted_address": None, "lat": float(lat), "lng": float(lng)}
+        else:
+            raise ValueError("address or lat/lng is required")
+        self._count("profiles")
+
+        home = geohash.encode(located["lat"], located["lng"], self.precision)
+        cells = geohash.neighbors(home, self.rings)
+        loaded = self._load(business_type, cells)
+
+        stale = [c for c in cells if c in loaded and loaded[c].age() > self.ttl]
+        missing = [c for c in cells if c not in loaded]
+        if not self.market.enabled:
+            # Serve whatever was precomputed; nothing can be refreshed.
+            if not loaded:
+                raise MarketNotConfigured("locations", "no market data provider configured")
+            return self._summarize(business_type, located, home, cells, loaded, stale, missing)
+        for cell in stale:
+            self.refresh(business_type, cell)
+        building = {
+            cell: self.refresh(business_type, cell, located if cell == home else None)
+            for cell in missing
+        }
+        pending: List[str] = []
+        error: Optional[Exception] = None
+        if wait and building:
+            wait_futures(list(building.values()))
+        for cell, fut in building.items():
+            if not fut.done():
+                pending.append(cell)
+            elif fut.exception() is not None:
+                error = fut.exception()
+                pending.append(cell)
+            else:
+                loaded[cell] = fut.result()
+        if not loaded and error is not None:
+            raise error
+        return self._summarize(business_type, located, home, cells, loaded, stale, pending)
+
+    def _summarize(
+        self,
+        business_type: str,
+        located: Dict[str, Any],
+        home: str,
+        cells: List[str],
+        loaded: Dict[str, Tile],
+        stale: List[str],
+        pending: List[str],
+    ) -> Dict[str, Any]:
+        parts = [loaded[c] for c in cells if c in loaded]
+        area = sum(geohash.area_km2(c) for c in cells if c in loaded)
+        count = sum(t.competitor_count for t in parts)
+        rating_n = sum(t.rating_count for t in parts)
+        price_n = sum(t.price_count for t in parts)
+        # Demographics belong to the point's own tile; a neighbour's place
+        # stands in until it is built.
+        census = next((t for t in ([loaded.get(home)] + parts) if t is not None and t.census_place), None)
+        own = loaded.get(home)
+
+        def rounded(value: Optional[float], digits: int) -> Optional[float]:
+            return round(value, digits) if value is not None else None
+
+        return {
+            "business_type": business_type,
+            "address": located.get("formatted_address"),
+            "lat": located["lat"],
+            "lng": located["lng"],
+            "geohash": home,
+            "tiles": len(parts),
+            "area_km2": round(area, 3),
+            "competitors": {
+                "count": count,
+                "per_km2": round(count / area, 2) if area else None,
+                "in_tile": own.competitor_count if own else None,
+                "mean_rating": rounded(sum(t.rating_sum for t in parts) / rating_n if rating_n else None, 2),
+                "mean_price_level": rounded(sum(t.price_sum for t in parts) / price_n if price_n else None, 2),
+                "reviews": sum(t.review_count for t in parts),
+                "lower_bound": any(t.saturated for t in parts),
+            },
+            "demographics": {
+                "census_place": census.census_place if census else None,
+                "population": census.population if census else None,
+                "median_income": census.median_income if census else None,
+            },
+            "refreshed_at": min(t.refreshed_at for t in parts).isoformat() if parts else None,
+            "stale": stale,
+            "pending": pending,
+        }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
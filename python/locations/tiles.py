@@ -0,0 +1,225 @@
+"""
+Storage for location-market tiles and the geocode cache.
+
+`location_tiles` holds one row per (geohash, business type) with additive
+aggregates: counts and rating / price sums rather than means, so any set
+of neighbouring tiles can be combined exactly. Demographics come from the
+Census place (`census_place_data`, loaded by the census ingest source / R
+loader) that contains the tile centre.
+"""
+
+import datetime as dt
+import hashlib
+import re
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import db
+
+TILES_TABLE = "location_tiles"
+GEOCODES_TABLE = "location_geocodes"
+CENSUS_TABLE = "census_place_data"
+
+TILES_SQL = (
+    "CREATE TABLE IF NOT EXISTS `location_tiles` ("
+    "`id` BIGINT AUTO_INCREMENT PRIMARY KEY,"
+    "`geohash` VARCHAR(12) NOT NULL,"
+    "`business_type` VARCHAR(255) NOT NULL,"
+    "`competitor_count` INT NOT NULL,"
+    "`rating_sum` DOUBLE NOT NULL,"
+    "`rating_count` INT NOT NULL,"
+    "`price_sum` DOUBLE NOT NULL,"
+    "`price_count` INT NOT NULL,"
+    "`review_count` BIGINT NOT NULL,"
+    "`saturated` TINYINT(1) NOT NULL,"
+    "`census_place` VARCHAR(255) NULL,"
+    "`population` BIGINT NULL,"
+    "`median_income` DOUBLE NULL,"
+    "`sources` VARCHAR(64) NOT NULL,"
+    "`refreshed_at` DATETIME(3) NOT NULL,"
+    "UNIQUE KEY `idx_geohash_type` (`geohash`, `business_type`),"
+    "KEY `idx_refreshed` (`refreshed_at`))"
+)
+
+GEOCODES_SQL = (
+    "CREATE TABLE IF NOT EXISTS `location_geocodes` ("
+    "`address_key` CHAR(40) NOT NULL PRIMARY KEY,"
+    "`address` VARCHAR(500) NOT NULL,"
+    "`formatted_address` VARCHAR(500) NULL,"
+    "`lat` DOUBLE NOT NULL,"
+    "`lng` DOUBLE NOT NULL,"
+    "`locality` VARCHAR(255) NULL,"
+    "`state` VARCHAR(8) NULL,"
+    "`created_at` DATETIME(3) NOT NULL)"
+)
+
+TILE_COLUMNS: Tuple[str, ...] = (
+    "geohash", "business_type", "competitor_count", "rating_sum",
+    "rating_count", "price_sum", "price_count", "review_count", "saturated",
+    "census_place", "population", "median_income", "sources", "refreshed_at",
+)
+GEOCODE_COLUMNS: Tuple[str, ...] = (
+    "address_key", "address", "formatted_address", "lat", "lng", "locality",
+    "state", "created_at",
+)
+
+STATE_FIPS: Dict[str, str] = {
+    "AL": "01", "AK": "02", "AZ": "04", "AR": "05", "CA": "06", "CO": "08",
+    "CT": "09", "DE": "10", "DC": "11", "FL": "12", "GA": "13", "HI": "15",
+    "ID": "16", "IL": "17", "IN": "18", "IA": "19", "KS": "20", "KY": "21",
+    "LA": "22", "ME": "23", "MD": "24", "MA": "25", "MI": "26", "MN": "27",
+    "MS": "28", "MO": "29", "MT": "30", "NE": "31", "NV": "32", "NH": "33",
+    "NJ": "34", "NM": "35", "NY": "36", "NC": "37", "ND": "38", "OH": "39",
+    "OK": "40", "OR": "41", "PA": "42", "RI": "44", "SC": "45", "SD": "46",
+    "TN": "47", "TX": "48", "UT": "49", "VT": "50", "VA": "51", "WA": "53",
+    "WV": "54", "WI": "55", "WY": "56", "PR": "72",
+}
+
+
+def normalize_type(business_type: str) -> str:
+    return re.sub(r"\s+", " ", business_type or "").strip().lower()[:255]
+
+
+def address_key(address: str) -> str:
+    norm = re.sub(r"\s+", " ", address or "").strip().lower()
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+
+class Tile:
+    """Aggregates for one (geohash, business type)."""
+
+    def __init__(
+        self,
+        geohash: str,
+        business_type: str,
+        competitor_count: int = 0,
+        rating_sum: float = 0.0,
+        rating_count: int = 0,
+        price_sum: float = 0.0,
+        price_count: int = 0,
+        review_count: int = 0,
+        saturated: bool = False,
+        census_place: Optional[str] = None,
+        population: Optional[int] = None,
+        median_income: Optional[float] = None,
+        sources: str = "",
+        refreshed_at: Optional[dt.datetime] = None,
+    ):
+        self.geohash = geohash
+        self.business_type = business_type
+        self.competitor_count = int(competitor_count)
+        self.rating_sum = float(rating_sum)
+        self.rating_count = int(rating_count)
+        self.price_sum = float(price_sum)
+        self.price_count = int(price_count)
+        self.review_count = int(review_count)
+        self.saturated = bool(saturated)
+        self.census_place = census_place
+        self.population = int(population) if population is not None else None
+        self.median_income = float(median_income) if median_income is not None else None
+        self.sources = sources
+        self.refreshed_at = refreshed_at or dt.datetime.now()
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "Tile":
+        return cls(**dict(zip(TILE_COLUMNS, row)))
+
+    def row(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, c) if c != "saturated" else int(self.saturated) for c in TILE_COLUMNS)
+
+    def age(self, now: Optional[dt.datetime] = None) -> dt.timedelta:
+        return (now or dt.datetime.now()) - self.refreshed_at
+
+    @property
+    def mean_rating(self) -> Optional[float]:
+        return self.rating_sum / self.rating_count if self.rating_count else None
+
+    @property
+    def mean_price_level(self) -> Optional[float]:
+        return self.price_sum / self.price_count if self.price_count else None
+
+
+def ensure_tables(conn: Any) -> None:
+    cur = conn.cursor()
+    try:
+        cur.execute(TILES_SQL)
+        cur.execute(GEOCODES_SQL)
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def load_tiles(conn: Any, business_type: str, geohashes: Iterable[str]) -> Dict[str, Tile]:
+    hashes = list(geohashes)
+    if not hashes:
+        return {}
+    cols = ", ".join(db.quote_ident(c) for c in TILE_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(hashes))
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT {cols} FROM `{TILES_TABLE}` "
+            f"WHERE `business_type` = %s AND `geohash` IN ({placeholders})",
+            [business_type, *hashes],
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    return {tile.geohash: tile for tile in map(Tile.from_row, rows)}
+
+
+def save_tiles(conn: Any, tiles: Sequence[Tile]) -> None:
+    update = [c for c in TILE_COLUMNS if c not in ("geohash", "business_type")]
+    db.upsert_rows(conn, TILES_TABLE, TILE_COLUMNS, [t.row() for t in tiles], update)
+
+
+def load_geocode(conn: Any, address: str) -> Optional[Dict[str, Any]]:
+    cols = ", ".join(db.quote_ident(c) for c in GEOCODE_COLUMNS)
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT {cols} FROM `{GEOCODES_TABLE}` WHERE `address_key` = %s",
+            [address_key(address)],
+        )
+        row = cur.fetchone()
+    finally:
+        cur.close()
+    return dict(zip(GEOCODE_COLUMNS, row)) if row else None
+
+
+def save_geocode(conn: Any, address: str, result: Dict[str, Any]) -> None:
+    record = {
+        **result,
+        "address_key": address_key(address),
+        "address": address[:500],
+        "created_at": dt.datetime.now(),
+    }
+    db.upsert_rows(conn, GEOCODES_TABLE, GEOCODE_COLUMNS, [tuple(record.get(c) for c in GEOCODE_COLUMNS)], ())
+
+
+def census_place(conn: Any, locality: Optional[str], state: Optional[str]) -> Optional[Tuple[str, Optional[int], Optional[float]]]:
+    """
+    (NAME, population, median income) of the most recent ACS row for a
+    city, matched the way r/load_census.R does: by name within the state.
+    """
+    fips = STATE_FIPS.get((state or "").upper())
+    if not locality or not fips:
+        return None
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT `name`, `population`, `median_income` FROM `{CENSUS_TABLE}` "
+            "WHERE `state_fips` = %s AND `name` LIKE %s "
+            "ORDER BY `acs_year` DESC, `population` DESC LIMIT 1",
+            [fips, f"{locality} %"],
+        )
+        row = cur.fetchone()
+    finally:
+        cur.close()
+    if not row:
+        return None
+    name, population, income = row
+    return (
+        name,
+        int(population) if population is not None else None,
+        float(income) if income is not None else None,
+    )
@@ -0,0 +1,3 @@
+"""
+Versioned schema migrations; see `migrations.runner`.
+"""
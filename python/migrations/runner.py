@@ -0,0 +1,583 @@
+"""
+Versioned, resumable schema migrations.
+
+Migrations live in `migrations/versions/` as modules named
+`NNNN_description.py` defining `up(ctx)`. Each `up` must be idempotent: it
+checks the current schema and only does what is missing. The runner
+records progress in `schema_migrations`, including a JSON checkpoint that
+long operations use to resume after an interruption.
+
+Long-running changes go through `MigrationContext.online_alter`, which
+asks MySQL for ALGORITHM=INPLACE, LOCK=NONE and, when the server refuses,
+falls back to a trigger-synced shadow-table copy done in bounded,
+throttled keyset chunks.
+
+    python -m migrations.runner              # apply pending migrations
+    python -m migrations.runner --status
+"""
+
+import argparse
+import datetime as dt
+import importlib
+import json
+import os
+import pkgutil
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import db
+
+VERSIONS_PACKAGE = "migrations.versions"
+
+MIGRATIONS_SQL = (
+    "CREATE TABLE IF NOT EXISTS `schema_migrations` ("
+    "`version` INT PRIMARY KEY,"
+    "`name` VARCHAR(200),"
+    "`status` VARCHAR(20),"
+    "`checkpoint` JSON NULL,"
+    "`detail` VARCHAR(1000),"
+    "`started_at` DATETIME,"
+    "`finished_at` DATETIME NULL)"
+)
+
+STATUS_RUNNING = "running"
+STATUS_APPLIED = "applied"
+STATUS_FAILED = "failed"
+
+# Server refused the requested ALGORITHM / LOCK for this ALTER.
+ER_ALTER_OPERATION_NOT_SUPPORTED = (1845, 1846)
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _now() -> dt.datetime:
+    return dt.datetime.now().replace(microsecond=0)
+
+
+class Migration:
+    def __init__(self, version: int, name: str, up: Callable[["MigrationContext"], None]):
+        self.version = version
+        self.name = name
+        self.up = up
+
+
+def discover() -> List[Migration]:
+    package = importlib.import_module(VERSIONS_PACKAGE)
+    found = []
+    for info in pkgutil.iter_modules(package.__path__):
+        m = re.match(r"^(\d{4})_(\w+)$", info.name)
+        if not m:
+            continue
+        module = importlib.import_module(f"{VERSIONS_PACKAGE}.{info.name}")
+        found.append(Migration(int(m.group(1)), m.group(2), module.up))
+    found.sort(key=lambda mig: mig.version)
+    versions = [mig.version for mig in found]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"duplicate migration versions: {versions}")
+    return found
+
+
+# ------------------------------------------------
+# Context handed to each migration
+# ------------------------------------------------
+class MigrationContext:
+    """
+    Helpers for writing online, resumable migrations.
+
+    `chunk_size` bounds every scan / copy statement; `sleep` is the pause
+    between chunks and `max_threads_running` pauses further while the server
+    is busier than that (like pt-online-schema-change's --max-load).
+    """
+
+    def __init__(
+        self,
+        conn: Any,
+        migration: Migration,
+        checkpoint: Optional[Dict[str, Any]],
+        save_checkpoint: Callable[[Dict[str, Any]], None],
+        chunk_size: int = 1000,
+        sleep: float = 0.05,
+        max_threads_running: int = 25,
+        dry_run: bool = False,
+    ):
+        self.conn = conn
+        self.migration = migration
+        self.checkpoint: Dict[str, Any] = dict(checkpoint or {})
+        self._save = save_checkpoint
+        self.chunk_size = chunk_size
+        self.sleep = sleep
+        self.max_threads_running = max_threads_running
+        self.dry_run = dry_run
+        self._last_progress = 0.0
+
+    # ---- plumbing ----
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> None:
+        if self.dry_run and not sql.lstrip().upper().startswith(("SELECT", "SHOW")):
+            self.log(f"dry-run: {sql}")
+            return
+        cur = self.conn.cursor()
+        try:
+            cur.execute(sql, tuple(params))
+            if cur.with_rows:
+                cur.fetchall()
+            self.conn.commit()
+        finally:
+            cur.close()
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        cur = self.conn.cursor()
+        try:
+            cur.execute(sql, tuple(params))
+            return cur.fetchall()
+        finally:
+            cur.close()
+
+    def log(self, message: str) -> None:
+        print(f"[migrate] {self.migration.version:04d} {message}", flush=True)
+
+    def progress(self, phase: str, done: int, total: Optional[int], force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_progress < 2:
+            return
+        self._last_progress = now
+        if total:
+            pct = min(100.0, 100.0 * done / total)
+            self.log(f"{phase}: {done:,}/{total:,} ({pct:.0f}%)")
+        else:
+            self.log(f"{phase}: {done:,}")
+
+    def save(self, **state: Any) -> None:
+        self.checkpoint.update(state)
+        if not self.dry_run:
+            self._save(self.checkpoint)
+
+    def throttle(self) -> None:
+        if self.sleep > 0:
+            time.sleep(self.sleep)
+        while True:
+            rows = self.query("SHOW GLOBAL STATUS LIKE 'Threads_running'")
+            running = int(rows[0][1]) if rows else 0
+            if running <= self.max_threads_running:
+                return
+            self.progress(f"paused, Threads_running={running}", 0, None)
+            time.sleep(1)
+
+    # ---- schema inspection ----
+    def table_exists(self, table: str) -> bool:
+        rows = self.query(
+            "SELECT COUNT(*) FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s",
+            (table,),
+        )
+        return bool(rows[0][0])
+
+    def index_exists(self, table: str, index: str) -> bool:
+        rows = self.query(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+            (table, index),
+        )
+        return bool(rows[0][0])
+
+    def has_index_on(self, table: str, leading_column: str) -> bool:
+        rows = self.query(
+            "SELECT COUNT(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = %s "
+            "AND column_name = %s AND seq_in_index = 1",
+            (table, leading_column),
+        )
+        return bool(rows[0][0])
+
+    def estimated_rows(self, table: str) -> int:
+        rows = self.query(
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s",
+            (table,),
+        )
+        return int(rows[0][0] or 0) if rows else 0
+
+    def columns(self, table: str) -> List[str]:
+        return db.existing_columns(self.conn, table)
+
+    # ---- pre-flight ----
+    def find_duplicates(
+        self, table: str, key: Sequence[str], limit: int = 20
+    ) -> Tuple[int, List[Tuple[Any, ...]]]:
+        """
+        Chunked keyset scan for duplicate keys, walking distinct values of
+        the leading key column `chunk_size` at a time. Needs an index led by
+        that column to avoid full scans (see `ensure_helper_index`).
+
+        Returns (number of duplicated keys, sample of (key..., count)).
+        """
+        t = db.quote_ident(table)
+        lead = db.quote_ident(key[0])
+        key_sql = ", ".join(db.quote_ident(k) for k in key)
+        not_null = " AND ".join(f"{db.quote_ident(k)} IS NOT NULL" for k in key)
+        total = self.estimated_rows(table)
+        found = 0
+        sample: List[Tuple[Any, ...]] = []
+        last = None
+        scanned = 0
+        while True:
+            where = f"WHERE {lead} IS NOT NULL" if last is None else f"WHERE {lead} > %s"
+            params = () if last is None else (last,)
+            bounds = self.query(
+                f"SELECT {lead} FROM {t} {where} GROUP BY {lead} ORDER BY {lead} "
+                f"LIMIT 1 OFFSET {self.chunk_size - 1}",
+                params,
+            )
+            upper = bounds[0][0] if bounds else None
+            range_sql = where + ("" if upper is None else f" AND {lead} <= %s")
+            range_params = params + (() if upper is None else (upper,))
+            # A UNIQUE index admits any number of keys containing NULL.
+            for row in self.query(
+                f"SELECT {key_sql}, COUNT(*) AS c FROM {t} {range_sql} AND {not_null} "
+                f"GROUP BY {key_sql} HAVING c > 1",
+                range_params,
+            ):
+                found += 1
+                if len(sample) < limit:
+                    sample.append(tuple(row))
+            counted = self.query(f"SELECT COUNT(*) FROM {t} {range_sql}", range_params)
+            scanned += int(counted[0][0])
+            self.progress("duplicate scan", scanned, total)
+            # End the read view after every chunk: one transaction across the
+            # whole scan would hold back purge and keep the metadata lock the
+            # following online ALTER has to upgrade.
+            self.conn.commit()
+            if upper is None:
+                break
+            last = upper
+            self.throttle()
+        self.progress("duplicate scan", scanned, total, force=True)
+        return found, sample
+
+    def ensure_helper_index(self, table: str, index: str, key: Sequence[str]) -> bool:
+        """
+        Add a non-unique index online so keyset scans are range reads.
+        Returns True when it was created (caller drops it afterwards).
+        """
+        if self.has_index_on(table, key[0]):
+            return False
+        cols = ", ".join(db.quote_ident(k) for k in key)
+        self.log(f"adding helper index {index} online")
+        self.execute(
+            f"ALTER TABLE {db.quote_ident(table)} ADD INDEX {db.quote_ident(index)} ({cols}), "
+            "ALGORITHM=INPLACE, LOCK=NONE"
+        )
+        return True
+
+    # ---- DDL ----
+    def online_alter(self, table: str, clause: str, key: Optional[Sequence[str]] = None) -> None:
+        """
+        ALTER TABLE `table` <clause> without blocking writes: in-place with
+        LOCK=NONE when the server supports it for this change, otherwise via
+        `shadow_alter` (which needs a unique `key` to walk the table).
+        """
+        if self.checkpoint.get("shadow"):
+            self.shadow_alter(table, clause, key or self.checkpoint["shadow"]["key"])
+            return
+        sql = f"ALTER TABLE {db.quote_ident(table)} {clause}, ALGORITHM=INPLACE, LOCK=NONE"
+        self.log(f"online DDL: {clause}")
+        try:
+            self.execute(sql)
+        except Exception as ex:
+            if getattr(ex, "errno", None) not in ER_ALTER_OPERATION_NOT_SUPPORTED:
+                raise
+            if not key:
+                raise MigrationError(
+                    f"in-place ALTER refused ({ex}) and no unique key given for a shadow copy"
+                )
+            self.log(f"in-place refused ({getattr(ex, 'msg', ex)}); using shadow copy")
+            self.shadow_alter(table, clause, key)
+
+    def shadow_alter(self, table: str, clause: str, key: Sequence[str]) -> None:
+        """
+        Copy `table` into an altered shadow table in keyset chunks while
+        triggers mirror concurrent writes, then swap with an atomic RENAME.
+        Rows with a NULL in any key column can't be reached by the keyset
+        walk and are copied in a separate pass; the swap only happens when
+        both tables hold the same number of rows. Resumes from the
+        checkpointed last key.
+        """
+        shadow = f"_{table}_new"
+        old = f"_{table}_old"
+        t, s = db.quote_ident(table), db.quote_ident(shadow)
+        state = self.checkpoint.get("shadow") or {}
+
+        if not state:
+            if self.table_exists(shadow):
+                self.execute(f"DROP TABLE {s}")
+            self.execute(f"CREATE TABLE {s} LIKE {t}")
+            self.execute(f"ALTER TABLE {s} {clause}")
+            state = {"table": table, "key": list(key), "last": None, "copied": 0}
+            self.save(shadow=state)
+
+        src_cols = self.columns(table)
+        dst_cols = set(self.columns(shadow))
+        cols = [c for c in src_cols if c in dst_cols]
+        col_sql = ", ".join(db.quote_ident(c) for c in cols)
+        key_sql = ", ".join(db.quote_ident(k) for k in key)
+        not_null = " AND ".join(f"{db.quote_ident(k)} IS NOT NULL" for k in key)
+        any_null = " OR ".join(f"{db.quote_ident(k)} IS NULL" for k in key)
+        self._create_sync_triggers(table, shadow, cols, key)
+
+        total = self.estimated_rows(table)
+        row_cmp = "(" + key_sql + ") > (" + ", ".join(["%s"] * len(key)) + ")"
+        while True:
+            last = state.get("last")
+            # A row comparison against NULL is never true, so the walk is
+            # restricted to complete keys.
+            where = f"WHERE {not_null}" + ("" if last is None else f" AND {row_cmp}")
+            rows = self.query(
+                f"SELECT {key_sql} FROM {t} {where} ORDER BY {key_sql} "
+                f"LIMIT 1 OFFSET {self.chunk_size - 1}",
+                last or (),
+            )
+            upper = list(rows[0]) if rows else None
+            bound = ""
+            params: List[Any] = list(last or [])
+            if upper is not None:
+                bound = "AND (" + key_sql + ") <= (" + ", ".join(["%s"] * len(key)) + ")"
+                params += upper
+            # IGNORE: rows already written by the triggers are newer.
+            self.execute(
+                f"INSERT IGNORE INTO {s} ({col_sql}) SELECT {col_sql} FROM {t} "
+                f"{where} {bound} ORDER BY {key_sql}",
+                params,
+            )
+            copied = self.query(f"SELECT COUNT(*) FROM {t} {where} {bound}", params)[0][0]
+            state["copied"] = int(state.get("copied", 0)) + int(copied)
+            if upper is None:
+                break
+            state["last"] = [v.isoformat() if hasattr(v, "isoformat") else v for v in upper]
+            self.save(shadow=state)
+            self.progress("shadow copy", state["copied"], total)
+            self.throttle()
+        self.progress("shadow copy", state["copied"], total, force=True)
+
+        if not state.get("nulls_copied"):
+            # Nothing in a unique key stops these from being inserted twice,
+            # so clear any earlier partial pass (or trigger copies, which the
+            # source still holds) first.
+            self.execute(f"DELETE FROM {s} WHERE {any_null}")
+            self.execute(f"INSERT INTO {s} ({col_sql}) SELECT {col_sql} FROM {t} WHERE {any_null}")
+            state["nulls_copied"] = True
+            self.save(shadow=state)
+
+        if not self.dry_run:
+            # One statement, one snapshot: trigger writes commit with the
+            # source writes, so the counts agree unless rows were lost.
+            src_rows, dst_rows = self.query(f"SELECT (SELECT COUNT(*) FROM {t}), (SELECT COUNT(*) FROM {s})")[0]
+            if int(src_rows) != int(dst_rows):
+                self._drop_sync_triggers(table)
+                self.execute(f"DROP TABLE IF EXISTS {s}")
+                self.checkpoint.pop("shadow", None)
+                self.save()
+                raise MigrationError(
+                    f"shadow copy of {table} has {dst_rows} rows, source has {src_rows}; "
+                    f"{table} left unchanged, re-run to copy again"
+                )
+
+        self.log("swapping tables")
+        if self.table_exists(old):
+            self.execute(f"DROP TABLE {db.quote_ident(old)}")
+        self.execute(f"RENAME TABLE {t} TO {db.quote_ident(old)}, {s} TO {t}")
+        self._drop_sync_triggers(table)
+        self.execute(f"DROP TABLE {db.quote_ident(old)}")
+        self.checkpoint.pop("shadow", None)
+        self.save()
+
+    def finish_interrupted_swap(self) -> bool:
+        """
+        Complete a shadow copy that stopped between the RENAME and the
+        cleanup: the shadow table is gone and the old one is still there.
+        Returns True when that was the case.
+        """
+        state = self.checkpoint.get("shadow")
+        table = (state or {}).get("table")
+        if not table:
+            return False
+        if self.table_exists(f"_{table}_new") or not self.table_exists(f"_{table}_old"):
+            return False
+        self.log("tables already swapped; finishing cleanup")
+        self._drop_sync_triggers(table)
+        self.execute(f"DROP TABLE {db.quote_ident(f'_{table}_old')}")
+        self.checkpoint.pop("shadow", None)
+        self.save()
+        return True
+
+    def _trigger_names(self, table: str) -> Dict[str, str]:
+        return {op: f"_{table}_sync_{op.lower()}" for op in ("INSERT", "UPDATE", "DELETE")}
+
+    def _create_sync_triggers(self, table: str, shadow: str, cols: Sequence[str], key: Sequence[str]) -> None:
+        t, s = db.quote_ident(table), db.quote_ident(shadow)
+        col_sql = ", ".join(db.quote_ident(c) for c in cols)
+        new_vals = ", ".join(f"NEW.{db.quote_ident(c)}" for c in cols)
+        old_match = " AND ".join(f"{s}.{db.quote_ident(k)} <=> OLD.{db.quote_ident(k)}" for k in key)
+        bodies = {
+            "INSERT": f"REPLACE INTO {s} ({col_sql}) VALUES ({new_vals})",
+            "UPDATE": f"BEGIN DELETE FROM {s} WHERE {old_match}; "
+                      f"REPLACE INTO {s} ({col_sql}) VALUES ({new_vals}); END",
+            "DELETE": f"DELETE FROM {s} WHERE {old_match}",
+        }
+        for op, name in self._trigger_names(table).items():
+            exists = self.query(
+                "SELECT COUNT(*) FROM information_schema.triggers "
+                "WHERE trigger_schema = DATABASE() AND trigger_name = %s",
+                (name,),
+            )[0][0]
+            if not exists:
+                self.execute(
+                    f"CREATE TRIGGER {db.quote_ident(name)} AFTER {op} ON {t} "
+                    f"FOR EACH ROW {bodies[op]}"
+                )
+
+    def _drop_sync_triggers(self, table: str) -> None:
+        for name in self._trigger_names(table).values():
+            self.execute(f"DROP TRIGGER IF EXISTS {db.quote_ident(name)}")
+
+
+# ------------------------------------------------
+# Runner
+# ------------------------------------------------
+class MigrationRunner:
+    LOCK_NAME = "schema_migrations"
+
+    def __init__(self, conn: Any, **ctx_options: Any):
+        self.conn = conn
+        self.ctx_options = ctx_options
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        cur = self.conn.cursor()
+        try:
+            cur.execute(sql, tuple(params))
+            return cur.fetchall() if cur.with_rows else []
+        finally:
+            cur.close()
+
+    def _write(self, sql: str, params: Sequence[Any] = ()) -> None:
+        cur = self.conn.cursor()
+        try:
+            cur.execute(sql, tuple(params))
+            self.conn.commit()
+        finally:
+            cur.close()
+
+    def state(self) -> Dict[int, Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        self._write(MIGRATIONS_SQL)
+        out = {}
+        for version, status, checkpoint, detail in self._query(
+            "SELECT version, status, checkpoint, detail FROM `schema_migrations`"
+        ):
+            cp = json.loads(checkpoint) if checkpoint else None
+            out[int(version)] = (status, cp, detail)
+        return out
+
+    def _record(self, mig: Migration, status: str, detail: Optional[str] = None, finished: bool = False) -> None:
+        self._write(
+            "INSERT INTO `schema_migrations` (version, name, status, detail, started_at, finished_at) "
+            "VALUES (%s, %s, %s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE status = VALUES(status), detail = VALUES(detail), "
+            "finished_at = VALUES(finished_at)",
+            (mig.version, mig.name, status, (detail or "")[:1000] or None, _now(), _now() if finished else None),
+        )
+
+    def _save_checkpoint(self, mig: Migration, checkpoint: Dict[str, Any]) -> None:
+        self._write(
+            "UPDATE `schema_migrations` SET checkpoint = %s WHERE version = %s",
+            (json.dumps(checkpoint, default=str), mig.version),
+        )
+
+    def run(self, migrations: Sequence[Migration], target: Optional[int] = None, dry_run: bool = False) -> int:
+        got = self._query("SELECT GET_LOCK(%s, 0)", (self.LOCK_NAME,))
+        if not got or got[0][0] != 1:
+            raise MigrationError("another migration runner holds the lock")
+        try:
+            state = self.state()
+            applied = 0
+            for mig in migrations:
+                if target is not None and mig.version > target:
+                    break
+                status, checkpoint, _ = state.get(mig.version, (None, None, None))
+                if status == STATUS_APPLIED:
+                    continue
+                resuming = " (resuming)" if checkpoint else ""
+                print(f"[migrate] {mig.version:04d} {mig.name}{resuming}", flush=True)
+                if not dry_run:
+                    self._record(mig, STATUS_RUNNING)
+                ctx = MigrationContext(
+                    self.conn, mig, checkpoint,
+                    lambda cp, mig=mig: self._save_checkpoint(mig, cp),
+                    dry_run=dry_run, **self.ctx_options,
+                )
+                start = time.monotonic()
+                try:
+                    ctx.finish_interrupted_swap()
+                    mig.up(ctx)
+                except Exception as ex:
+                    if not dry_run:
+                        self._record(mig, STATUS_FAILED, str(ex))
+                    raise
+                elapsed = time.monotonic() - start
+                if not dry_run:
+                    self._record(mig, STATUS_APPLIED, f"{elapsed:.1f}s", finished=True)
+                print(f"[migrate] {mig.version:04d} done in {elapsed:.1f}s", flush=True)
+                applied += 1
+            return applied
+        finally:
+            self._query("SELECT RELEASE_LOCK(%s)", (self.LOCK_NAME,))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m migrations.runner")
+    parser.add_argument("--status", action="store_true", help="list migrations and their state")
+    parser.add_argument("--target", type=int, help="apply up to and including this version")
+    parser.add_argument("--dry-run", action="store_true", help="print DDL/DML instead of running it")
+    parser.add_argument("--chunk-size", type=int, default=int(os.getenv("MIGRATION_CHUNK_SIZE", "1000")))
+    parser.add_argument("--sleep", type=float, default=float(os.getenv("MIGRATION_SLEEP_SECONDS", "0.05")))
+    parser.add_argument("--max-threads-running", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    db.load_env()
+    try:
+        conn = db.connect()
+    except Exception as ex:
+        print(f"Failed to connect to MySQL: {ex}", file=sys.stderr)
+        return 1
+
+    try:
+        runner = MigrationRunner(
+            conn,
+            chunk_size=args.chunk_size,
+            sleep=args.sleep,
+            max_threads_running=args.max_threads_running,
+        )
+        migrations = discover()
+        if args.status:
+            state = runner.state()
+            for mig in migrations:
+                status, checkpoint, detail = state.get(mig.version, ("pending", None, None))
+                extra = f" checkpoint={json.dumps(checkpoint)}" if checkpoint else ""
+                print(f"{mig.version:04d} {mig.name:<45} {status}{extra}" + (f" ({detail})" if detail else ""))
+            return 0
+        applied = runner.run(migrations, target=args.target, dry_run=args.dry_run)
+        print(f"Applied {applied} migration(s).")
+        return 0
+    except Exception as ex:
+        print(f"Migration failed: {ex}", file=sys.stderr)
+        return 1
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+"""
+UNIQUE (symbol, fiscalDateEnding) on dissertation_data, the key the
+loaders upsert on.
+
+Duplicates are found up front with a chunked keyset scan (over a temporary
+non-unique index, added online if nothing leads with `symbol`) instead of
+failing at the end of a long index build. The unique index itself is built
+in place without blocking writes or, when the server refuses that, through
+a trigger-synced shadow copy walked on the same key.
+"""
+
+from financials.schema import KEY_COLUMNS, TABLE
+
+INDEX = "idx_symbol_fiscalDate"
+HELPER_INDEX = "idx_symbol_fiscalDate_scan"
+
+
+def up(ctx) -> None:
+    if ctx.index_exists(TABLE, INDEX):
+        ctx.log(f"{INDEX} already exists")
+        if ctx.index_exists(TABLE, HELPER_INDEX):
+            ctx.online_alter(TABLE, f"DROP INDEX `{HELPER_INDEX}`")
+        return
+
+    created = ctx.ensure_helper_index(TABLE, HELPER_INDEX, KEY_COLUMNS)
+    if created:
+        ctx.save(helper_index=True)
+
+    dupes, sample = ctx.find_duplicates(TABLE, KEY_COLUMNS)
+    if dupes:
+        lines = "; ".join(f"{r[0]} {r[1]} x{r[2]}" for r in sample[:10])
+        raise RuntimeError(
+            f"{dupes} duplicate (symbol, fiscalDateEnding) keys in {TABLE}; "
+            f"resolve them and re-run. Sample: {lines}"
+        )
+
+    cols = ", ".join(f"`{c}`" for c in KEY_COLUMNS)
+    ctx.online_alter(TABLE, f"ADD UNIQUE INDEX `{INDEX}` ({cols})", key=KEY_COLUMNS)
+
+    if ctx.checkpoint.get("helper_index") and ctx.index_exists(TABLE, HELPER_INDEX):
+        ctx.online_alter(TABLE, f"DROP INDEX `{HELPER_INDEX}`")
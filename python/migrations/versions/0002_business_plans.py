@@ -0,0 +1,12 @@
+"""
+Plan storage table for intake-form submissions (see `plans.store`).
+"""
+
+from plans.store import PLANS_SQL, TABLE
+
+
+def up(ctx) -> None:
+    if ctx.table_exists(TABLE):
+        ctx.log(f"{TABLE} already exists")
+        return
+    ctx.execute(PLANS_SQL)
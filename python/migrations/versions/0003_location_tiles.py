@@ -0,0 +1,13 @@
+"""
+Location tile aggregates and the geocode cache (see `locations.tiles`).
+"""
+
+from locations.tiles import GEOCODES_SQL, GEOCODES_TABLE, TILES_SQL, TILES_TABLE
+
+
+def up(ctx) -> None:
+    for table, sql in ((TILES_TABLE, TILES_SQL), (GEOCODES_TABLE, GEOCODES_SQL)):
+        if ctx.table_exists(table):
+            ctx.log(f"{table} already exists")
+            continue
+        ctx.execute(sql)
@@ -0,0 +1,3 @@
+"""
+Migration modules, applied in order of their four-digit prefix.
+"""
@@ -0,0 +1,16 @@
+"""
+Local mock servers for the third-party APIs: `python -m mock_apis`.
+"""
+
+from .profiles import DEFAULT_PROFILES, QuotaTracker, sample_latency
+from .server import BASE_URL_ENV, MockServer, MockState, create_app
+
+__all__ = [
+    "BASE_URL_ENV",
+    "DEFAULT_PROFILES",
+    "MockServer",
+    "MockState",
+    "QuotaTracker",
+    "create_app",
+    "sample_latency",
+]
@@ -0,0 +1,188 @@
+"""
+Per-provider behaviour for the mock servers: latency distribution, fault
+injection and quota windows.
+
+Profiles are plain dicts so they can be loaded from a JSON file and patched
+at runtime through `PUT /_mock/config`:
+
+    {
+      "google": {
+        "latency": {"dist": "lognormal", "p50_ms": 90, "p95_ms": 300},
+        "error_rate": 0.01,
+        "throttle_rate": 0.02,
+        "quota": {"per_second": 50, "per_day": 100000}
+      },
+      "openai": {"latency": {"dist": "fixed", "ms": 400}, "per_output_token_ms": 8}
+    }
+"""
+
+import copy
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+PROVIDERS = ("google", "yelp", "alphavantage", "openai")
+
+# Roughly what the live APIs look like from a laptop; quotas follow the
+# published per-key limits.
+DEFAULT_PROFILES: Dict[str, Dict[str, Any]] = {
+    "google": {
+        "latency": {"dist": "lognormal", "p50_ms": 90, "p95_ms": 300},
+        "error_rate": 0.0,
+        "throttle_rate": 0.0,
+        "quota": {"per_second": 50},
+        "page_token_delay_ms": 0,
+    },
+    "yelp": {
+        "latency": {"dist": "lognormal", "p50_ms": 150, "p95_ms": 450},
+        "error_rate": 0.0,
+        "throttle_rate": 0.0,
+        "quota": {"per_second": 50, "per_day": 5000},
+    },
+    "alphavantage": {
+        "latency": {"dist": "lognormal", "p50_ms": 120, "p95_ms": 400},
+        "error_rate": 0.0,
+        "throttle_rate": 0.0,
+        "quota": {"per_minute": 75},
+        "listing_size": 500,
+    },
+    "openai": {
+        "latency": {"dist": "lognormal", "p50_ms": 600, "p95_ms": 1800},
+        "error_rate": 0.0,
+        "throttle_rate": 0.0,
+        "quota": {"per_minute": 500},
+        "per_output_token_ms": 0,
+    },
+}
+
+ERROR_STATUSES = (500, 502, 503)
+
+WINDOWS = {"per_second": 1, "per_minute": 60, "per_hour": 3600, "per_day": 86400}
+
+# z-score of the 95th percentile of a standard normal.
+_Z95 = 1.6448536269514722
+
+
+def sample_latency(spec: Any, rng: random.Random, scale: float = 1.0) -> float:
+    """
+    Delay in seconds for one request.
+
+    `spec` is a number (fixed milliseconds), None, or a dict with `dist` one of
+    none | fixed (`ms`) | uniform (`min_ms`, `max_ms`) |
+    normal (`mean_ms`, `stddev_ms`) | lognormal (`p50_ms`, `p95_ms`).
+    """
+    if spec is None or scale <= 0:
+        return 0.0
+    if isinstance(spec, (int, float)):
+        ms = float(spec)
+    else:
+        dist = spec.get("dist", "fixed")
+        if dist == "none":
+            ms = 0.0
+        elif dist == "fixed":
+            ms = float(spec.get("ms", 0))
+        elif dist == "uniform":
+            ms = rng.uniform(float(spec.get("min_ms", 0)), float(spec.get("max_ms", 0)))
+        elif dist == "normal":
+            ms = rng.gauss(float(spec.get("mean_ms", 0)), float(spec.get("stddev_ms", 0)))
+        elif dist == "lognormal":
+            p50 = max(float(spec.get("p50_ms", 1)), 1e-3)
+            p95 = max(float(spec.get("p95_ms", p50)), p50)
+            sigma = (math.log(p95) - math.log(p50)) / _Z95
+            ms = rng.lognormvariate(math.log(p50), sigma)
+        else:
+            raise ValueError(f"unknown latency distribution: {dist!r}")
+        cap = spec.get("max_ms")
+        if cap is not None:
+            ms = min(ms, float(cap))
+    return max(ms, 0.0) * scale / 1000.0
+
+
+def validate(profiles: Dict[str, Dict[str, Any]]) -> None:
+    """Raise ValueError for specs the server would choke on mid-run."""
+    rng = random.Random(0)
+    for provider, profile in profiles.items():
+        if provider not in PROVIDERS:
+            raise ValueError(f"unknown provider: {provider!r}")
+        sample_latency(profile.get("latency"), rng)
+        for key in ("error_rate", "throttle_rate"):
+            rate = float(profile.get(key, 0) or 0)
+            if not 0 <= rate <= 1:
+                raise ValueError(f"{provider}.{key} must be between 0 and 1")
+        for window in (profile.get("quota") or {}):
+            if window not in WINDOWS:
+                raise ValueError(f"{provider}.quota: unknown window {window!r}")
+
+
+def merge(base: Dict[str, Dict[str, Any]], overrides: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Provider-level deep merge: nested dicts (latency, quota) are replaced
+    key by key, so `{"google": {"quota": {"per_day": 10}}}` keeps per_second.
+    A `"*"` provider applies to all four.
+    """
+    out = copy.deepcopy(base)
+    expanded: Dict[str, Dict[str, Any]] = {}
+    for provider, patch in overrides.items():
+        targets = PROVIDERS if provider == "*" else (provider,)
+        for name in targets:
+            expanded.setdefault(name, {}).update(patch)
+    for provider, patch in expanded.items():
+        profile = out.setdefault(provider, {})
+        for key, value in patch.items():
+            if key == "quota" and isinstance(value, dict) and isinstance(profile.get(key), dict):
+                profile[key] = {**profile[key], **value}
+            else:
+                profile[key] = copy.deepcopy(value)
+    validate(out)
+    return out
+
+
+def load(path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    if not path:
+        return copy.deepcopy(DEFAULT_PROFILES)
+    with open(path, encoding="utf-8") as fh:
+        return merge(DEFAULT_PROFILES, json.load(fh))
+
+
+class QuotaTracker:
+    """
+    Fixed-window request counters per (provider, api key, window), the way
+    the real APIs meter keys. Rejected requests are not counted.
+    """
+
+    def __init__(self, clock: Any = time.time):
+        self._clock = clock
+        self._counts: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def check(self, provider: str, key: str, quota: Optional[Dict[str, Any]]) -> Optional[Tuple[str, float]]:
+        """
+        Count one request. Returns None when it is within quota, otherwise
+        (window, seconds until the window resets).
+        """
+        if not quota:
+            return None
+        now = self._clock()
+        with self._lock:
+            slots = []
+            for window, limit in quota.items():
+                if limit is None:
+                    continue
+                size = WINDOWS[window]
+                bucket = int(now // size)
+                started, used = self._counts.get((provider, key, window), (bucket, 0))
+                if started != bucket:
+                    used = 0
+                if used >= int(limit):
+                    return window, (bucket + 1) * size - now
+                slots.append(((provider, key, window), bucket, used))
+            for slot, bucket, used in slots:
+                self._counts[slot] = (bucket, used + 1)
+        return None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
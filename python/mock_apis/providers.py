@@ -0,0 +1,579 @@
+"""
+Response builders for the mocked endpoints.
+
+Bodies are built from the synthetic responses in `bench/fixtures` and varied
+deterministically by request parameters, so the same query always gets the
+same answer (and the same page count) across runs and machines. Error and
+quota bodies mirror what each real API sends, because the clients branch on
+them: Google answers 200 with a `status`, Alpha Vantage 200 with a `Note` /
+`Information` key, Yelp and OpenAI a 4xx with an `error` object.
+"""
+
+import base64
+import copy
+import csv
+import datetime as dt
+import functools
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bench", "fixtures")
+
+GOOGLE_PAGE_SIZE = 20
+GOOGLE_MAX_RESULTS = 60
+GOOGLE_MAX_ELEMENTS = 100
+YELP_MAX_LIMIT = 50
+YELP_MAX_DEPTH = 240
+ALPHA_STATEMENTS = {
+    "INCOME_STATEMENT": "income_statement",
+    "BALANCE_SHEET": "balance_sheet",
+    "CASH_FLOW": "cash_flow",
+    "OVERVIEW": "overview",
+}
+
+
+class Reply:
+    """
+    One mocked response. `output_tokens` lets the server add per-token
+    generation time for OpenAI.
+    """
+
+    def __init__(
+        self,
+        status: int,
+        body: Any,
+        content_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None,
+        output_tokens: int = 0,
+    ):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.headers = headers or {}
+        self.output_tokens = output_tokens
+
+    def payload(self) -> str:
+        return self.body if isinstance(self.body, str) else json.dumps(self.body)
+
+
+@functools.lru_cache(maxsize=None)
+def _fixture(name: str) -> Any:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _digest(*parts: Any) -> int:
+    text = "|".join(str(p) for p in parts)
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _encode_token(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_token(token: str) -> Optional[Dict[str, Any]]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        state = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def _parse_latlng(text: Optional[str]) -> Optional[Tuple[float, float]]:
+    try:
+        lat, lng = (float(p) for p in (text or "").split(","))
+    except ValueError:
+        return None
+    return lat, lng
+
+
+def _nearby(lat: float, lng: float, radius_m: float, seed: int) -> Tuple[float, float]:
+    # Uniform over the disc, not clustered at the centre.
+    angle = (seed % 3600) / 3600 * 2 * math.pi
+    dist = radius_m * math.sqrt(((seed >> 12) % 1000) / 1000)
+    dlat = dist * math.cos(angle) / 111_320
+    dlng = dist * math.sin(angle) / (111_320 * max(math.cos(math.radians(lat)), 0.01))
+    return round(lat + dlat, 7), round(lng + dlng, 7)
+
+
+def _us_point(seed: int) -> Tuple[float, float]:
+    return round(25 + (seed % 24_000) / 1000, 7), round(-124 + ((seed >> 16) % 57_000) / 1000, 7)
+
+
+MOCK_CITIES = (
+    ("Austin", "Texas", "TX"), ("Denver", "Colorado", "CO"), ("Portland", "Oregon", "OR"),
+    ("Columbus", "Ohio", "OH"), ("Raleigh", "North Carolina", "NC"), ("Madison", "Wisconsin", "WI"),
+)
+
+
+def _address_components(address: str, seed: int) -> List[Dict[str, Any]]:
+    """Locality and state: parsed from "..., City, ST ..." when present, else picked by seed."""
+    match = re.search(r",\s*([A-Za-z .'-]+),\s*([A-Z]{2})\b", address)
+    if match:
+        city, short = match.group(1).strip(), match.group(2)
+        state = next((name for _, name, code in MOCK_CITIES if code == short), short)
+    else:
+        city, state, short = MOCK_CITIES[seed % len(MOCK_CITIES)]
+    return [
+        {"long_name": city, "short_name": city, "types": ["locality", "political"]},
+        {"long_name": state, "short_name": short, "types": ["administrative_area_level_1", "political"]},
+        {"long_name": "United States", "short_name": "US", "types": ["country", "political"]},
+    ]
+
+
+# ------------------------------------------------
+# Google Maps Platform
+# ------------------------------------------------
+def google_denied(endpoint: str) -> Reply:
+    return Reply(200, {
+        **_google_empty(endpoint),
+        "status": "REQUEST_DENIED",
+        "error_message": "You must use an API key to authenticate each request to Google Maps Platform APIs.",
+    })
+
+
+def _google_empty(endpoint: str) -> Dict[str, Any]:
+    if endpoint == "distancematrix":
+        return {"destination_addresses": [], "origin_addresses": [], "rows": []}
+    if endpoint == "nearbysearch":
+        return {"html_attributions": [], "results": []}
+    return {"results": []}
+
+
+def _google_invalid(endpoint: str, message: str) -> Reply:
+    return Reply(200, {**_google_empty(endpoint), "status": "INVALID_REQUEST", "error_message": message})
+
+
+def google_nearbysearch(args: Dict[str, str], now: float, token_delay_ms: float) -> Reply:
+    """
+    Places Nearby Search: up to 60 results in pages of 20. `next_page_token`
+    carries the query and offset; like the real API it is rejected with
+    INVALID_REQUEST until `token_delay_ms` after it was issued.
+    """
+    token = args.get("pagetoken")
+    if token:
+        state = _decode_token(token)
+        if state is None:
+            return _google_invalid("nearbysearch", "Invalid page token.")
+        if (now - float(state.get("i", 0))) * 1000 < token_delay_ms:
+            return _google_invalid("nearbysearch", "The page token is not valid yet.")
+        query = state.get("q") or {}
+        offset = int(state.get("o", 0))
+    else:
+        query = {k: args.get(k, "") for k in ("location", "radius", "keyword", "type")}
+        offset = 0
+        if not query["location"]:
+            return _google_invalid("nearbysearch", "Missing the location parameter.")
+
+    center = _parse_latlng(query.get("location"))
+    if center is None:
+        return _google_invalid("nearbysearch", "Invalid location parameter.")
+    try:
+        radius = min(float(query.get("radius") or 1500), 50_000)
+    except ValueError:
+        return _google_invalid("nearbysearch", "Invalid radius parameter.")
+
+    seed = _digest("places", query.get("location"), query.get("keyword"), query.get("type"), radius)
+    total = seed % (GOOGLE_MAX_RESULTS + 1)
+    if total == 0:
+        return Reply(200, {"html_attributions": [], "results": [], "status": "ZERO_RESULTS"})
+
+    templates = _fixture("google/nearbysearch_page1.json")["results"] + _fixture("google/nearbysearch_page2.json")["results"]
+    results = []
+    for i in range(offset, min(offset + GOOGLE_PAGE_SIZE, total)):
+        d = _digest(seed, i)
+        place = copy.deepcopy(templates[i % len(templates)])
+        lat, lng = _nearby(center[0], center[1], radius, d)
+        place["geometry"]["location"] = {"lat": lat, "lng": lng}
+        place["place_id"] = f"Mock{seed:x}{i:02d}"
+        if i >= len(templates):
+            place["name"] = f"{place['name']} {i // len(templates) + 1}"
+        place["rating"] = round(3.0 + (d % 21) / 10, 1)
+        place["user_ratings_total"] = 5 + (d >> 8) % 3000
+        place["price_level"] = 1 + (d >> 4) % 4
+        place["vicinity"] = f"{100 + (d >> 20) % 900} Mock St"
+        results.append(place)
+
+    body: Dict[str, Any] = {"html_attributions": [], "results": results, "status": "OK"}
+    if offset + GOOGLE_PAGE_SIZE < total:
+        body["next_page_token"] = _encode_token({"q": query, "o": offset + GOOGLE_PAGE_SIZE, "i": round(now, 3)})
+    return Reply(200, body)
+
+
+def google_geocode(args: Dict[str, str]) -> Reply:
+    address = (args.get("address") or "").strip()
+    latlng = args.get("latlng")
+    if not address and not latlng:
+        return _google_invalid("geocode", "Invalid request. Missing the 'address', 'components', 'latlng' or 'place_id' parameter.")
+
+    template = copy.deepcopy(_fixture("google/geocode.json")["results"][0])
+    if address:
+        seed = _digest("geocode", address.lower())
+        lat, lng = _us_point(seed)
+        template["formatted_address"] = address if address.endswith("USA") else f"{address}, USA"
+    else:
+        point = _parse_latlng(latlng)
+        if point is None:
+            return _google_invalid("geocode", "Invalid request. Invalid 'latlng' parameter.")
+        lat, lng = point
+        seed = _digest("geocode", latlng)
+        city, _, short = MOCK_CITIES[seed % len(MOCK_CITIES)]
+        template["formatted_address"] = f"{100 + seed % 900} Mock St, {city}, {short}, USA"
+    template["geometry"]["location"] = {"lat": lat, "lng": lng}
+    template["address_components"] = _address_components(address, seed)
+    template["place_id"] = f"MockGeo{seed:x}"
+    return Reply(200, {"results": [template], "status": "OK"})
+
+
+def google_distancematrix(args: Dict[str, str]) -> Reply:
+    origins = [o for o in (args.get("origins") or "").split("|") if o]
+    destinations = [d for d in (args.get("destinations") or "").split("|") if d]
+    if not origins or not destinations:
+        return _google_invalid("distancematrix", "Invalid request. Missing the 'origins' or 'destinations' parameter.")
+    if len(origins) * len(destinations) > GOOGLE_MAX_ELEMENTS:
+        return Reply(200, {**_google_empty("distancematrix"), "status": "MAX_ELEMENTS_EXCEEDED"})
+
+    imperial = args.get("units") == "imperial"
+    rows = []
+    for origin in origins:
+        elements = []
+        for dest in destinations:
+            meters = 300 + _digest("distance", origin, dest) % 40_000
+            seconds = int(meters / 9.5) + 60
+            text = f"{meters / 1609.344:.1f} mi" if imperial else f"{meters / 1000:.1f} km"
+            elements.append({
+                "distance": {"text": text, "value": meters},
+                "duration": {"text": f"{max(1, round(seconds / 60))} mins", "value": seconds},
+                "status": "OK",
+            })
+        rows.append({"elements": elements})
+    return Reply(200, {
+        "destination_addresses": destinations,
+        "origin_addresses": origins,
+        "rows": rows,
+        "status": "OK",
+    })
+
+
+# ------------------------------------------------
+# Yelp Fusion
+# ------------------------------------------------
+def _yelp_error(status: int, code: str, description: str) -> Reply:
+    return Reply(status, {"error": {"code": code, "description": description}})
+
+
+def yelp_denied() -> Reply:
+    return _yelp_error(401, "TOKEN_MISSING", "An access token must be supplied in order to use this endpoint.")
+
+
+def yelp_search(args: Dict[str, str]) -> Reply:
+    """
+    Business Search with limit/offset paging. Like the real API, `total` can
+    exceed what is reachable: limit + offset may not go past 240.
+    """
+    location = (args.get("location") or "").strip()
+    lat, lng = args.get("latitude"), args.get("longitude")
+    if not location and not (lat and lng):
+        return _yelp_error(400, "VALIDATION_ERROR", "Please specify a location or a latitude and longitude")
+    try:
+        limit = int(args.get("limit") or 20)
+        offset = int(args.get("offset") or 0)
+        radius = min(int(args.get("radius") or 10_000), 40_000)
+    except ValueError:
+        return _yelp_error(400, "VALIDATION_ERROR", "limit, offset and radius must be integers")
+    try:
+        center = (float(lat), float(lng)) if lat and lng else None
+    except ValueError:
+        return _yelp_error(400, "VALIDATION_ERROR", "latitude and longitude must be numbers")
+    if not 0 <= limit <= YELP_MAX_LIMIT:
+        return _yelp_error(400, "VALIDATION_ERROR", f"{limit} is greater than the maximum of {YELP_MAX_LIMIT}")
+    if offset < 0 or limit + offset > YELP_MAX_DEPTH:
+        return _yelp_error(400, "VALIDATION_ERROR", f"Too many results requested, limit+offset must be <= {YELP_MAX_DEPTH}.")
+
+    seed = _digest("yelp", location.lower(), lat, lng, (args.get("term") or "").lower(), args.get("categories"), radius)
+    total = seed % 1200
+    if center is None:
+        center = _us_point(_digest("geocode", location.lower()))
+
+    templates = _fixture("yelp/businesses_search.json")["businesses"]
+    businesses = []
+    for i in range(offset, min(offset + limit, total)):
+        d = _digest(seed, i)
+        biz = copy.deepcopy(templates[i % len(templates)])
+        b_lat, b_lng = _nearby(center[0], center[1], radius, d)
+        biz["id"] = f"mock-{seed:x}-{i:04d}"
+        biz["alias"] = f"{biz['alias']}-{i}"
+        if i >= len(templates):
+            biz["name"] = f"{biz['name']} {i // len(templates) + 1}"
+        biz["coordinates"] = {"latitude": b_lat, "longitude": b_lng}
+        biz["rating"] = (5 + d % 6) / 2
+        biz["review_count"] = 1 + (d >> 8) % 2500
+        biz["price"] = "$" * (1 + (d >> 4) % 4)
+        biz["distance"] = round(radius * math.sqrt(((d >> 12) % 1000) / 1000), 1)
+        businesses.append(biz)
+
+    return Reply(200, {
+        "businesses": businesses,
+        "total": total,
+        "region": {"center": {"latitude": center[0], "longitude": center[1]}},
+    })
+
+
+# ------------------------------------------------
+# Alpha Vantage
+# ------------------------------------------------
+def alpha_error(message: str) -> Reply:
+    return Reply(200, {"Error Message": message})
+
+
+def alpha_denied() -> Reply:
+    return alpha_error(
+        "the parameter apikey is invalid or missing. Please claim your free API key on "
+        "(https://www.alphavantage.co/support/#api-key)."
+    )
+
+
+def _alpha_factor(symbol: str) -> float:
+    # Same spread the bench fixture clones use.
+    return 0.5 + (_digest("alpha", symbol) % 17) / 8.0
+
+
+def _alpha_statement(function: str, symbol: str) -> Dict[str, Any]:
+    data = copy.deepcopy(_fixture(f"alphavantage/{ALPHA_STATEMENTS[function]}_IBM.json"))
+    factor = _alpha_factor(symbol)
+    if function == "OVERVIEW":
+        seed = _digest("alpha", symbol)
+        data.update({
+            "Symbol": symbol,
+            "Name": f"{symbol} Holdings",
+            "Industry": f"INDUSTRY {seed % 12:02d}",
+            "SharesOutstanding": str(int(int(data["SharesOutstanding"]) * factor)),
+            "MarketCapitalization": str(int(int(data["MarketCapitalization"]) * factor)),
+        })
+        return data
+    data["symbol"] = symbol
+    for section in ("annualReports", "quarterlyReports"):
+        for report in data.get(section, []):
+            for k, v in report.items():
+                if k != "fiscalDateEnding" and v.lstrip("-").isdigit():
+                    report[k] = str(int(int(v) * factor))
+    return data
+
+
+def _csv(header: List[str], rows: List[List[Any]]) -> Reply:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\r\n")
+    writer.writerow(header)
+    writer.writerows(rows)
+    return Reply(200, buf.getvalue(), content_type="text/csv")
+
+
+def alpha_listing_status(state: str, size: int) -> Reply:
+    """
+    Bench-style symbols (B0000, ...) are active; one in twenty has a
+    delisted D-prefixed twin.
+    """
+    header = ["symbol", "name", "exchange", "assetType", "ipoDate", "delistingDate", "status"]
+    if state == "delisted":
+        rows = [
+            [f"D{i:04d}", f"D{i:04d} Holdings", "NYSE", "Stock", "2001-01-02", "2020-06-30", "Delisted"]
+            for i in range(0, size, 20)
+        ]
+    else:
+        rows = [
+            [f"B{i:04d}", f"B{i:04d} Holdings", "NYSE" if i % 3 else "NASDAQ", "Stock", "2001-01-02", "null", "Active"]
+            for i in range(size)
+        ]
+    return _csv(header, rows)
+
+
+def alpha_earnings(symbol: str, horizon: str, today: dt.date) -> Reply:
+    header = ["symbol", "name", "reportDate", "fiscalDateEnding", "estimate", "currency"]
+    months = {"3month": 3, "6month": 6, "12month": 12}.get(horizon, 3)
+    seed = _digest("earnings", symbol)
+    # About half the symbols report within three months, almost all within six.
+    if seed % 12 >= months * 3 // 2 + 2:
+        return _csv(header, [])
+    report = today + dt.timedelta(days=1 + seed % (months * 30))
+    quarter_end = dt.date(report.year, 3 * ((report.month - 1) // 3) + 1, 1) - dt.timedelta(days=1)
+    estimate = f"{(seed >> 8) % 500 / 100:.2f}"
+    return _csv(header, [[symbol, f"{symbol} Holdings", report.isoformat(), quarter_end.isoformat(), estimate, "USD"]])
+
+
+def alpha_query(args: Dict[str, str], listing_size: int) -> Reply:
+    function = (args.get("function") or "").upper()
+    symbol = (args.get("symbol") or "").upper()
+    if function in ALPHA_STATEMENTS:
+        if not symbol:
+            return alpha_error("Invalid API call. Please retry or visit the documentation (https://www.alphavantage.co/documentation/).")
+        return Reply(200, _alpha_statement(function, symbol))
+    if function == "LISTING_STATUS":
+        return alpha_listing_status((args.get("state") or "active").lower(), listing_size)
+    if function == "EARNINGS_CALENDAR":
+        if not symbol:
+            return alpha_error("Invalid API call. Please retry or visit the documentation (https://www.alphavantage.co/documentation/).")
+        return alpha_earnings(symbol, args.get("horizon") or "3month", dt.date.today())
+    return alpha_error(
+        f"This API function ({function or 'none'}) does not exist. "
+        "The mock serves INCOME_STATEMENT, BALANCE_SHEET, CASH_FLOW, OVERVIEW, LISTING_STATUS and EARNINGS_CALENDAR."
+    )
+
+
+# ------------------------------------------------
+# OpenAI
+# ------------------------------------------------
+def _openai_error(status: int, message: str, type_: str, code: Optional[str] = None, param: Optional[str] = None) -> Reply:
+    return Reply(status, {"error": {"message": message, "type": type_, "param": param, "code": code}})
+
+
+def openai_denied() -> Reply:
+    return _openai_error(
+        401,
+        "You didn't provide an API key. You need to provide your API key in an Authorization header using Bearer auth.",
+        "invalid_request_error",
+    )
+
+
+def _tokens(text: str) -> int:
+    # ~4 characters per token is close enough for load shaping.
+    return max(1, math.ceil(len(text) / 4))
+
+
+def _flatten(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return " ".join(_flatten(v) for v in value)
+    if isinstance(value, dict):
+        return " ".join(_flatten(value.get(k)) for k in ("content", "text") if value.get(k))
+    return ""
+
+
+def _generate(body: Dict[str, Any], limit_key: str) -> Tuple[str, int, int, bool]:
+    text = _fixture("openai/responses.json")["output"][0]["content"][0]["text"]
+    prompt = _flatten(body.get("input") if "input" in body else body.get("messages"))
+    limit = body.get(limit_key)
+    truncated = False
+    if isinstance(limit, int) and limit > 0 and _tokens(text) > limit:
+        text, truncated = text[: limit * 4], True
+    return text, _tokens(prompt), _tokens(text), truncated
+
+
+def openai_responses(body: Dict[str, Any], seq: int) -> Reply:
+    for param in ("model", "input"):
+        if not body.get(param):
+            return _openai_error(400, f"Missing required parameter: '{param}'.", "invalid_request_error", "missing_required_parameter", param)
+    if body.get("stream"):
+        return _openai_error(400, "The mock server does not support streaming.", "invalid_request_error", param="stream")
+
+    text, prompt_tokens, output_tokens, truncated = _generate(body, "max_output_tokens")
+    resp = copy.deepcopy(_fixture("openai/responses.json"))
+    resp.update({
+        "id": f"resp_mock{seq:040x}",
+        "created_at": int(time.time()),
+        "model": body["model"],
+        "instructions": body.get("instructions"),
+        "max_output_tokens": body.get("max_output_tokens"),
+        "status": "incomplete" if truncated else "completed",
+        "incomplete_details": {"reason": "max_output_tokens"} if truncated else None,
+        "usage": {
+            "input_tokens": prompt_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": prompt_tokens + output_tokens,
+        },
+    })
+    message = resp["output"][0]
+    message["id"] = f"msg_mock{seq:040x}"
+    message["status"] = resp["status"]
+    message["content"][0]["text"] = text
+    return Reply(200, resp, output_tokens=output_tokens)
+
+
+def openai_chat(body: Dict[str, Any], seq: int) -> Reply:
+    for param in ("model", "messages"):
+        if not body.get(param):
+            return _openai_error(400, f"Missing required parameter: '{param}'.", "invalid_request_error", "missing_required_parameter", param)
+    if body.get("stream"):
+        return _openai_error(400, "The mock server does not support streaming.", "invalid_request_error", param="stream")
+
+    limit_key = "max_completion_tokens" if "max_completion_tokens" in body else "max_tokens"
+    text, prompt_tokens, output_tokens, truncated = _generate(body, limit_key)
+    return Reply(200, {
+        "id": f"chatcmpl-mock{seq:032x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body["model"],
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text, "refusal": None},
+            "logprobs": None,
+            "finish_reason": "length" if truncated else "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+        },
+    }, output_tokens=output_tokens)
+
+
+# ------------------------------------------------
+# Quota and injected faults
+# ------------------------------------------------
+def quota_exceeded(provider: str, endpoint: str, window: str, limit: int, retry_after: float) -> Reply:
+    retry = str(max(1, math.ceil(retry_after)))
+    per = window.replace("per_", "")
+    if provider == "google":
+        return Reply(200, {
+            **_google_empty(endpoint),
+            "status": "OVER_QUERY_LIMIT",
+            "error_message": f"You have exceeded your rate-limit for this API ({limit} requests per {per}).",
+        })
+    if provider == "alphavantage":
+        key = "Note" if window in ("per_second", "per_minute") else "Information"
+        return Reply(200, {key: f"Thank you for using Alpha Vantage! Your API rate limit is {limit} requests per {per}."})
+    if provider == "yelp":
+        if window == "per_second":
+            return _yelp_error(429, "TOO_MANY_REQUESTS_PER_SECOND", "You have exceeded the queries-per-second limit for this endpoint. Try reducing the rate at which you make queries.")
+        return _yelp_error(429, "ACCESS_LIMIT_REACHED", "You've reached the access limits for this client.")
+    reply = _openai_error(
+        429,
+        f"Rate limit reached for requests: limit {limit} per {per}. Please try again in {retry}s.",
+        "requests",
+        "rate_limit_exceeded",
+    )
+    reply.headers.update({"retry-after": retry, "x-ratelimit-limit-requests": str(limit), "x-ratelimit-remaining-requests": "0"})
+    return reply
+
+
+def throttled(provider: str, endpoint: str) -> Reply:
+    """An injected 429, independent of quota, as seen under upstream load."""
+    if provider == "google":
+        return Reply(429, {**_google_empty(endpoint), "status": "OVER_QUERY_LIMIT", "error_message": "Injected 429."})
+    if provider == "alphavantage":
+        return Reply(429, {"Note": "Injected 429."})
+    if provider == "yelp":
+        return _yelp_error(429, "TOO_MANY_REQUESTS_PER_SECOND", "Injected 429.")
+    reply = _openai_error(429, "Injected 429.", "requests", "rate_limit_exceeded")
+    reply.headers["retry-after"] = "1"
+    return reply
+
+
+def server_error(provider: str, endpoint: str, status: int) -> Reply:
+    if provider == "google":
+        return Reply(status, {**_google_empty(endpoint), "status": "UNKNOWN_ERROR"})
+    if provider == "yelp":
+        return _yelp_error(status, "INTERNAL_ERROR", "Something went wrong internally, please try your request again.")
+    if provider == "openai":
+        return _openai_error(status, "The server had an error while processing your request.", "server_error")
+    return Reply(status, f"<html><body><h1>{status}</h1></body></html>", content_type="text/html")
@@ -0,0 +1,379 @@
+"""
+Local mock of the Google Maps, Yelp Fusion, Alpha Vantage and OpenAI APIs.
+
+One threaded Flask server serves all four under their real URL paths, so a
+client only needs its base URL swapped:
+
+    python -m mock_apis --port 8750 --seed 7
+    export GOOGLE_MAPS_BASE_URL=http://127.0.0.1:8750
+    export YELP_BASE_URL=http://127.0.0.1:8750
+    export ALPHAVANTAGE_BASE_URL=http://127.0.0.1:8750
+    export OPENAI_BASE_URL=http://127.0.0.1:8750/v1
+
+Every request passes the same gate: per-key quota, then injected 429s, then
+injected 5xx, then the mocked body, with the provider's latency applied on
+top. The fault draws use a random stream keyed by (seed, provider, request
+number), so a run with a given seed and request order is reproducible.
+
+Admin endpoints under /_mock: `stats`, `reset` (counters and quotas),
+`config` (GET the profiles, PUT a partial override).
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+
+from . import profiles as profiles_mod
+from . import providers
+from .providers import Reply
+
+BASE_URL_ENV = {
+    "google": "GOOGLE_MAPS_BASE_URL",
+    "yelp": "YELP_BASE_URL",
+    "alphavantage": "ALPHAVANTAGE_BASE_URL",
+    "openai": "OPENAI_BASE_URL",
+}
+
+
+class MockState:
+    """
+    Profiles, quota counters and per-provider stats shared by all request
+    threads.
+    """
+
+    def __init__(
+        self,
+        profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+        seed: int = 0,
+        latency_scale: float = 1.0,
+    ):
+        self.profiles = profiles if profiles is not None else profiles_mod.load(None)
+        profiles_mod.validate(self.profiles)
+        self.seed = seed
+        self.latency_scale = latency_scale
+        self.quota = profiles_mod.QuotaTracker()
+        self._lock = threading.Lock()
+        self._seq: Dict[str, int] = {}
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._seq = {p: 0 for p in profiles_mod.PROVIDERS}
+            self.stats = {
+                p: {
+                    "requests": 0,
+                    "by_status": {},
+                    "quota_rejected": 0,
+                    "throttled": 0,
+                    "errors": 0,
+                    "latency_ms_total": 0.0,
+                }
+                for p in profiles_mod.PROVIDERS
+            }
+        self.quota.reset()
+
+    def configure(self, overrides: Dict[str, Dict[str, Any]]) -> None:
+        merged = profiles_mod.merge(self.profiles, overrides)
+        with self._lock:
+            self.profiles = merged
+
+    def next_draw(self, provider: str) -> Tuple[int, random.Random]:
+        with self._lock:
+            seq = self._seq[provider]
+            self._seq[provider] = seq + 1
+        return seq, random.Random(f"{self.seed}:{provider}:{seq}")
+
+    def record(self, provider: str, status: int, outcome: str, delay: float) -> None:
+        with self._lock:
+            s = self.stats[provider]
+            s["requests"] += 1
+            s["by_status"][str(status)] = s["by_status"].get(str(status), 0) + 1
+            if outcome in ("quota_rejected", "throttled", "errors"):
+                s[outcome] += 1
+            s["latency_ms_total"] += delay * 1000
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out = json.loads(json.dumps(self.stats))
+        for s in out.values():
+            total = s.pop("latency_ms_total")
+            s["mean_latency_ms"] = round(total / s["requests"], 2) if s["requests"] else None
+        return out
+
+
+def _bearer() -> Optional[str]:
+    header = request.headers.get("Authorization", "")
+    if header.lower().startswith("bearer ") and header[7:].strip():
+        return header[7:].strip()
+    return None
+
+
+def _respond(reply: Reply) -> Response:
+    resp = Response(reply.payload(), status=reply.status, content_type=reply.content_type)
+    for name, value in reply.headers.items():
+        resp.headers[name] = value
+    return resp
+
+
+def create_app(state: Optional[MockState] = None) -> Flask:
+    app = Flask(__name__)
+    state = state or MockState()
+    app.extensions["mock_state"] = state
+
+    def serve(
+        provider: str,
+        endpoint: str,
+        key: Optional[str],
+        denied: Callable[[], Reply],
+        build: Callable[[int], Reply],
+    ) -> Response:
+        seq, rng = state.next_draw(provider)
+        profile = state.profiles.get(provider, {})
+        delay = profiles_mod.sample_latency(profile.get("latency"), rng, state.latency_scale)
+        outcome = "ok"
+        quota = profile.get("quota") or {}
+        hit = state.quota.check(provider, key, quota) if key else None
+        if not key:
+            reply = denied()
+        elif hit is not None:
+            window, retry_after = hit
+            reply = providers.quota_exceeded(provider, endpoint, window, int(quota[window]), retry_after)
+            outcome = "quota_rejected"
+        elif rng.random() < float(profile.get("throttle_rate") or 0):
+            reply = providers.throttled(provider, endpoint)
+            outcome = "throttled"
+        elif rng.random() < float(profile.get("error_rate") or 0):
+            reply = providers.server_error(provider, endpoint, rng.choice(profiles_mod.ERROR_STATUSES))
+            outcome = "errors"
+        else:
+            reply = build(seq)
+            per_token = float(profile.get("per_output_token_ms") or 0)
+            delay += reply.output_tokens * per_token / 1000 * state.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+        state.record(provider, reply.status, outcome, delay)
+        return _respond(reply)
+
+    # ------------------------------------------------
+    # Google Maps Platform
+    # ------------------------------------------------
+    @app.route("/maps/api/place/nearbysearch/json", methods=["GET"])
+    def google_nearbysearch():
+        args = request.args.to_dict()
+        delay_ms = float(state.profiles["google"].get("page_token_delay_ms") or 0)
+        return serve(
+            "google", "nearbysearch", args.get("key"),
+            lambda: providers.google_denied("nearbysearch"),
+            lambda seq: providers.google_nearbysearch(args, time.time(), delay_ms),
+        )
+
+    @app.route("/maps/api/geocode/json", methods=["GET"])
+    def google_geocode():
+        args = request.args.to_dict()
+        return serve(
+            "google", "geocode", args.get("key"),
+            lambda: providers.google_denied("geocode"),
+            lambda seq: providers.google_geocode(args),
+        )
+
+    @app.route("/maps/api/distancematrix/json", methods=["GET"])
+    def google_distancematrix():
+        args = request.args.to_dict()
+        return serve(
+            "google", "distancematrix", args.get("key"),
+            lambda: providers.google_denied("distancematrix"),
+            lambda seq: providers.google_distancematrix(args),
+        )
+
+    # ------------------------------------------------
+    # Yelp Fusion
+    # ------------------------------------------------
+    @app.route("/v3/businesses/search", methods=["GET"])
+    def yelp_search():
+        args = request.args.to_dict()
+        return serve(
+            "yelp", "search", _bearer(),
+            providers.yelp_denied,
+            lambda seq: providers.yelp_search(args),
+        )
+
+    # ------------------------------------------------
+    # Alpha Vantage
+    # ------------------------------------------------
+    @app.route("/query", methods=["GET"])
+    def alpha_query():
+        args = request.args.to_dict()
+        size = int(state.profiles["alphavantage"].get("listing_size") or 500)
+        return serve(
+            "alphavantage", (args.get("function") or "").upper(), args.get("apikey"),
+            providers.alpha_denied,
+            lambda seq: providers.alpha_query(args, size),
+        )
+
+    # ------------------------------------------------
+    # OpenAI
+    # ------------------------------------------------
+    @app.route("/v1/responses", methods=["POST"])
+    def openai_responses():
+        body = request.get_json(silent=True) or {}
+        return serve(
+            "openai", "responses", _bearer(),
+            providers.openai_denied,
+            lambda seq: providers.openai_responses(body, seq),
+        )
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def openai_chat():
+        body = request.get_json(silent=True) or {}
+        return serve(
+            "openai", "chat", _bearer(),
+            providers.openai_denied,
+            lambda seq: providers.openai_chat(body, seq),
+        )
+
+    # ------------------------------------------------
+    # Admin
+    # ------------------------------------------------
+    @app.route("/_mock/health", methods=["GET"])
+    def mock_health():
+        return jsonify({"ok": True})
+
+    @app.route("/_mock/stats", methods=["GET"])
+    def mock_stats():
+        return jsonify(state.snapshot())
+
+    @app.route("/_mock/reset", methods=["POST"])
+    def mock_reset():
+        state.reset()
+        return jsonify({"ok": True})
+
+    @app.route("/_mock/config", methods=["GET", "PUT"])
+    def mock_config():
+        if request.method == "PUT":
+            overrides = request.get_json(silent=True)
+            if not isinstance(overrides, dict):
+                return jsonify({"error": "invalid_json", "message": "Expected a JSON object of provider overrides."}), 400
+            try:
+                state.configure(overrides)
+            except (ValueError, TypeError) as ex:
+                return jsonify({"error": "invalid_config", "message": str(ex)}), 400
+        return jsonify({
+            "seed": state.seed,
+            "latency_scale": state.latency_scale,
+            "profiles": state.profiles,
+        })
+
+    return app
+
+
+class MockServer:
+    """
+    Run the mock in a background thread, e.g. from a benchmark:
+
+        with MockServer(latency_scale=0) as mock:
+            os.environ.update(mock.env())
+    """
+
+    def __init__(
+        self,
+        state: Optional[MockState] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        quiet: bool = True,
+        **state_options: Any,
+    ):
+        from werkzeug.serving import make_server
+
+        if quiet:
+            logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        self.state = state or MockState(**state_options)
+        self._server = make_server(host, port, create_app(self.state), threaded=True)
+        self.host = host
+        self.port = self._server.server_port
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def env(self) -> Dict[str, str]:
+        """Base-URL environment variables that point the clients here."""
+        out = {name: self.base_url for name in BASE_URL_ENV.values()}
+        out["OPENAI_BASE_URL"] = self.base_url + "/v1"
+        return out
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-apis", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m mock_apis", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8750)
+    parser.add_argument("--config", help="JSON file of per-provider profile overrides")
+    parser.add_argument("--seed", type=int, default=0, help="seed for latency and fault draws")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply every sampled latency")
+    parser.add_argument("--no-latency", action="store_true", help="answer immediately (same as --latency-scale 0)")
+    parser.add_argument("--error-rate", type=float, help="injected 5xx fraction for every provider")
+    parser.add_argument("--throttle-rate", type=float, help="injected 429 fraction for every provider")
+    parser.add_argument("--no-quota", action="store_true", help="disable quota enforcement")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    try:
+        profiles = profiles_mod.load(args.config)
+        overrides: Dict[str, Any] = {}
+        if args.error_rate is not None:
+            overrides["error_rate"] = args.error_rate
+        if args.throttle_rate is not None:
+            overrides["throttle_rate"] = args.throttle_rate
+        if args.no_quota:
+            overrides["quota"] = None
+        if overrides:
+            profiles = profiles_mod.merge(profiles, {"*": overrides})
+    except (OSError, ValueError) as ex:
+        print(f"[mock] invalid config: {ex}", file=sys.stderr)
+        return 2
+
+    state = MockState(profiles, seed=args.seed, latency_scale=0.0 if args.no_latency else args.latency_scale)
+    server = MockServer(state, host=args.host, port=args.port, quiet=not args.verbose)
+    print(f"[mock] serving Google, Yelp, Alpha Vantage and OpenAI on {server.base_url}", file=sys.stderr)
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(state.snapshot(), indent=2), file=sys.stderr)
+    return 0
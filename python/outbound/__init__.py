@@ -0,0 +1,30 @@
+"""
+Resilient outbound HTTP for third-party providers: per-provider timeouts,
+circuit breakers, hedged GETs, jittered backoff and bulkheads.
+"""
+
+from .client import ResilientClient, get, get_client, request
+from .policy import DEFAULT_POLICIES, RETRY_STATUSES, ProviderPolicy, policy_for
+from .resilience import (
+    BulkheadFull,
+    CircuitBreaker,
+    CircuitOpen,
+    ProviderUnavailable,
+    backoff_delay,
+)
+
+__all__ = [
+    "BulkheadFull",
+    "CircuitBreaker",
+    "CircuitOpen",
+    "DEFAULT_POLICIES",
+    "ProviderPolicy",
+    "ProviderUnavailable",
+    "RETRY_STATUSES",
+    "ResilientClient",
+    "backoff_delay",
+    "get",
+    "get_client",
+    "policy_for",
+    "request",
+]
@@ -0,0 +1,293 @@
+"""
+Resilient HTTP client shared by everything that calls a third-party API.
+
+    import outbound
+    resp = outbound.get("google", url, params=params)
+
+Each call goes through the provider's policy (see `policy.py`):
+
+1. `before_attempt` hook (e.g. a rate limiter), then a bulkhead slot;
+2. the circuit breaker, which refuses the call while the provider is
+   unhealthy (`CircuitOpen`);
+3. the request with per-attempt connect/read timeouts, hedged for GETs once
+   the provider's recent p95 has passed;
+4. on a timeout, connection error, 429 or 5xx: jittered exponential backoff
+   and another attempt, within the retry count and overall deadline.
+
+Timeouts, connection errors and 5xx count as breaker failures; a 429 means
+the provider is up and only pushes back, so it is retried but not held
+against the breaker. When retries run out the last response is returned
+(or the last exception raised), so callers keep their own status handling.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .policy import RETRY_STATUSES, ProviderPolicy, policy_for
+from .resilience import (
+    Bulkhead,
+    CircuitBreaker,
+    CircuitOpen,
+    LatencyWindow,
+    backoff_delay,
+)
+
+HEDGEABLE_METHODS = ("GET", "HEAD")
+TRANSIENT_ERRORS = (requests.Timeout, requests.ConnectionError)
+
+
+def _retry_after(resp: Optional[requests.Response]) -> Optional[float]:
+    if resp is None:
+        return None
+    raw = resp.headers.get("Retry-After")
+    try:
+        return float(raw) if raw is not None else None
+    except ValueError:
+        return None  # HTTP-date form; fall back to backoff
+
+
+class _ProviderState:
+    def __init__(self, name: str, policy: ProviderPolicy):
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(
+            name,
+            window=policy.breaker_window,
+            min_calls=policy.breaker_min_calls,
+            failure_rate=policy.breaker_failure_rate,
+            cooldown=policy.breaker_cooldown,
+            probes=policy.breaker_probes,
+        )
+        self.bulkhead = Bulkhead(name, policy.max_concurrent, policy.bulkhead_wait)
+        self.latencies = LatencyWindow()
+        self.counters: Dict[str, int] = {
+            "calls": 0, "attempts": 0, "retries": 0, "failures": 0,
+            "circuit_rejected": 0, "hedged": 0, "hedge_wins": 0,
+        }
+        self._lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def hedge_allowed(self) -> bool:
+        with self._lock:
+            return self.counters["hedged"] < self.policy.hedge_budget * self.counters["calls"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.latencies.quantile(0.5)
+        p95 = self.latencies.quantile(0.95)
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "state": self.breaker.state,
+            "opened": self.breaker.opened,
+            "in_flight": self.bulkhead.in_flight,
+            "bulkhead_rejected": self.bulkhead.rejected,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            **counters,
+        }
+
+
+class ResilientClient:
+    """
+    A pooled requests.Session plus per-provider breaker, bulkhead and
+    latency state. One instance per process is the intent (`get_client()`),
+    so every caller of a provider shares its health view and its slots.
+
+    `overrides` are applied on top of every provider's policy, e.g.
+    `{"read_timeout": 5}`.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, ProviderPolicy]] = None,
+        overrides: Optional[Dict[str, Any]] = None,
+        session: Optional[requests.Session] = None,
+        pool_size: int = 16,
+        hedge_workers: int = 32,
+    ):
+        self._policies = policies
+        self._overrides = overrides or {}
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self._providers: Dict[str, _ProviderState] = {}
+        self._lock = threading.Lock()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_workers = hedge_workers
+
+    def provider(self, name: str) -> _ProviderState:
+        with self._lock:
+            state = self._providers.get(name)
+            if state is None:
+                policy = policy_for(name, self._policies)
+                if self._overrides:
+                    policy = policy.replace(**self._overrides)
+                state = _ProviderState(name, policy)
+                self._providers[name] = state
+            return state
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            providers = dict(self._providers)
+        return {name: p.snapshot() for name, p in providers.items()}
+
+    # ------------------------------------------------
+    # Sending
+    # ------------------------------------------------
+    def _send(self, p: _ProviderState, method: str, url: str, timeout: Any, kwargs: Dict[str, Any]) -> requests.Response:
+        """One HTTP exchange on an already-held bulkhead slot, which it releases."""
+        p.count("attempts")
+        started = time.monotonic()
+        try:
+            resp = self.session.request(method, url, timeout=timeout, **kwargs)
+        finally:
+            p.bulkhead.release()
+        if resp.status_code < 500 and resp.status_code != 429:
+            p.latencies.add(time.monotonic() - started)
+        return resp
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=self._hedge_workers, thread_name_prefix="outbound-hedge"
+                )
+            return self._hedge_pool
+
+    def _hedged(self, p: _ProviderState, method: str, url: str, timeout: Any, kwargs: Dict[str, Any], delay: float) -> requests.Response:
+        pool = self._pool()
+        primary = pool.submit(self._send, p, method, url, timeout, kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not p.hedge_allowed() or not p.bulkhead.try_acquire():
+            return primary.result()
+        p.count("hedged")
+        hedge = pool.submit(self._send, p, method, url, timeout, kwargs)
+
+        pending = {primary, hedge}
+        last: Optional[Future] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                last = fut
+                if fut.exception() is None and fut.result().status_code not in RETRY_STATUSES:
+                    if fut is hedge:
+                        p.count("hedge_wins")
+                    for loser in pending:
+                        loser.add_done_callback(lambda f: f.exception() is None and f.result().close())
+                    return fut.result()
+        assert last is not None
+        return last.result()
+
+    def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        before_attempt: Optional[Callable[[], Any]] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        `kwargs` go to `requests.Session.request` (params, headers, json,
+        data, ...). `before_attempt` runs before every attempt but not
+        before hedges, so it suits a rate limiter only for providers whose
+        policy doesn't hedge.
+        """
+        p = self.provider(provider)
+        policy = p.policy
+        method = method.upper()
+        p.count("calls")
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if before_attempt is not None:
+                before_attempt()
+            p.bulkhead.acquire()
+            try:
+                p.breaker.allow()
+            except CircuitOpen:
+                p.bulkhead.release()
+                p.count("circuit_rejected")
+                raise
+
+            remaining = policy.deadline - (time.monotonic() - started)
+            timeout = (policy.connect_timeout, max(0.1, min(policy.read_timeout, remaining)))
+            hedge_delay = None
+            if policy.hedge and method in HEDGEABLE_METHODS:
+                q = p.latencies.quantile(policy.hedge_quantile)
+                if q is not None:
+                    hedge_delay = max(policy.hedge_min_delay, q)
+
+            resp: Optional[requests.Response] = None
+            error: Optional[Exception] = None
+            try:
+                if hedge_delay is None:
+                    resp = self._send(p, method, url, timeout, kwargs)
+                else:
+                    resp = self._hedged(p, method, url, timeout, kwargs, hedge_delay)
+            except TRANSIENT_ERRORS as ex:
+                error = ex
+            except Exception:
+                # Not the provider's fault (bad URL, encoding, ...); still
+                # settle a half-open probe.
+                p.breaker.record(True)
+                raise
+
+            healthy = error is None and resp is not None and resp.status_code < 500
+            p.breaker.record(healthy)
+            if not healthy:
+                p.count("failures")
+            if error is None and resp is not None and resp.status_code not in RETRY_STATUSES:
+                return resp
+            if attempt >= policy.retries:
+                break
+            pause = backoff_delay(attempt, policy.backoff_base, policy.backoff_cap, _retry_after(resp))
+            if time.monotonic() - started + pause >= policy.deadline:
+                break
+            p.count("retries")
+            time.sleep(pause)
+            attempt += 1
+
+        if error is not None:
+            raise error
+        assert resp is not None
+        return resp
+
+    def get(self, provider: str, url: str, **kwargs: Any) -> requests.Response:
+        return self.request(provider, "GET", url, **kwargs)
+
+    def close(self) -> None:
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self.session.close()
+
+
+_client: Optional[ResilientClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ResilientClient:
+    """Process-wide client, so breakers and bulkheads are shared by all callers."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ResilientClient()
+        return _client
+
+
+def request(provider: str, method: str, url: str, **kwargs: Any) -> requests.Response:
+    return get_client().request(provider, method, url, **kwargs)
+
+
+def get(provider: str, url: str, **kwargs: Any) -> requests.Response:
+    return get_client().request(provider, "GET", url, **kwargs)
@@ -0,0 +1,151 @@
+"""
+Per-provider resilience settings for outbound HTTP.
+
+Every field can be overridden from the environment as
+`OUTBOUND_<PROVIDER>_<FIELD>`, e.g. `OUTBOUND_GOOGLE_READ_TIMEOUT=5` or
+`OUTBOUND_ALPHAVANTAGE_HEDGE=false`.
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ProviderPolicy:
+    """
+    Timeouts, retry/backoff, hedging, bulkhead and circuit-breaker settings
+    for one provider.
+
+    - `connect_timeout` / `read_timeout`: per attempt, passed to requests.
+    - `deadline`: wall-clock budget for the whole call including retries.
+    - `retries`, `backoff_base`, `backoff_cap`: full-jitter exponential
+      backoff between attempts; a Retry-After header wins when it is shorter
+      than the cap.
+    - `hedge`: for GETs, fire a duplicate once the first attempt has run
+      longer than the provider's recent `hedge_quantile` latency (never
+      sooner than `hedge_min_delay`), and take whichever answers first.
+      `hedge_budget` caps hedges as a fraction of calls so a slow provider
+      doesn't get twice the load.
+    - `max_concurrent` / `bulkhead_wait`: in-flight cap; callers wait at most
+      `bulkhead_wait` seconds for a slot before failing.
+    - `breaker_*`: open after `breaker_failure_rate` of the last
+      `breaker_window` calls failed (at least `breaker_min_calls` seen), stay
+      open `breaker_cooldown` seconds, then let `breaker_probes` trial calls
+      through.
+    """
+
+    FIELDS: Dict[str, type] = {
+        "connect_timeout": float,
+        "read_timeout": float,
+        "deadline": float,
+        "retries": int,
+        "backoff_base": float,
+        "backoff_cap": float,
+        "hedge": bool,
+        "hedge_quantile": float,
+        "hedge_min_delay": float,
+        "hedge_budget": float,
+        "max_concurrent": int,
+        "bulkhead_wait": float,
+        "breaker_window": int,
+        "breaker_min_calls": int,
+        "breaker_failure_rate": float,
+        "breaker_cooldown": float,
+        "breaker_probes": int,
+    }
+
+    def __init__(
+        self,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        deadline: float = 60.0,
+        retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_delay: float = 0.05,
+        hedge_budget: float = 0.05,
+        max_concurrent: int = 8,
+        bulkhead_wait: float = 1.0,
+        breaker_window: int = 20,
+        breaker_min_calls: int = 10,
+        breaker_failure_rate: float = 0.5,
+        breaker_cooldown: float = 30.0,
+        breaker_probes: int = 1,
+    ):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget = hedge_budget
+        self.max_concurrent = max_concurrent
+        self.bulkhead_wait = bulkhead_wait
+        self.breaker_window = breaker_window
+        self.breaker_min_calls = breaker_min_calls
+        self.breaker_failure_rate = breaker_failure_rate
+        self.breaker_cooldown = breaker_cooldown
+        self.breaker_probes = breaker_probes
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+    def replace(self, **changes: Any) -> "ProviderPolicy":
+        values = {name: getattr(self, name) for name in self.FIELDS}
+        unknown = set(changes) - set(values)
+        if unknown:
+            raise ValueError(f"unknown policy fields: {sorted(unknown)}")
+        values.update(changes)
+        return ProviderPolicy(**values)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+# Interactive lookups (Places, Yelp, geocoding) get short timeouts, hedging
+# and fail-fast bulkheads. Quota-metered data APIs never hedge, since a
+# duplicate costs a request from the daily allowance, and batch callers
+# queue for a slot rather than fail.
+DEFAULT_POLICIES: Dict[str, ProviderPolicy] = {
+    "google": ProviderPolicy(read_timeout=8, deadline=20, hedge=True, max_concurrent=16, breaker_cooldown=20),
+    "yelp": ProviderPolicy(read_timeout=8, deadline=20, hedge=True, max_concurrent=8, breaker_cooldown=20),
+    "alphavantage": ProviderPolicy(read_timeout=30, deadline=90, max_concurrent=4, bulkhead_wait=60, breaker_cooldown=60),
+    "openai": ProviderPolicy(
+        read_timeout=120, deadline=300, max_concurrent=8, bulkhead_wait=10,
+        backoff_base=1.0, backoff_cap=20, breaker_cooldown=60,
+    ),
+    "fred": ProviderPolicy(read_timeout=30, deadline=90, max_concurrent=4, bulkhead_wait=60),
+    "bls": ProviderPolicy(read_timeout=30, deadline=90, max_concurrent=4, bulkhead_wait=60),
+    "census": ProviderPolicy(read_timeout=30, deadline=90, max_concurrent=4, bulkhead_wait=60),
+    "default": ProviderPolicy(),
+}
+
+
+def _parse(kind: type, raw: str) -> Any:
+    if kind is bool:
+        return raw.strip().lower() in ("1", "true", "t", "yes", "y", "on")
+    return kind(raw)
+
+
+def policy_for(provider: str, base: Optional[Dict[str, ProviderPolicy]] = None) -> ProviderPolicy:
+    """Default policy for `provider` with any OUTBOUND_* env overrides applied."""
+    policies = base if base is not None else DEFAULT_POLICIES
+    policy = policies.get(provider) or policies.get("default") or ProviderPolicy()
+    changes: Dict[str, Any] = {}
+    prefix = f"OUTBOUND_{provider.upper()}_"
+    for name, kind in ProviderPolicy.FIELDS.items():
+        raw = (os.getenv(prefix + name.upper()) or "").strip()
+        if not raw:
+            continue
+        try:
+            changes[name] = _parse(kind, raw)
+        except ValueError:
+            raise ValueError(f"{prefix + name.upper()}: expected {kind.__name__}, got {raw!r}")
+    return policy.replace(**changes) if changes else policy
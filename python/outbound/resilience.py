@@ -0,0 +1,198 @@
+"""
+Building blocks for the outbound client: circuit breaker, bulkhead, recent
+latency window and jittered backoff. All are thread-safe and know nothing
+about HTTP.
+"""
+
+import collections
+import random
+import threading
+import time
+from typing import Any, Deque, Optional
+
+
+class ProviderUnavailable(Exception):
+    """The call was refused locally without reaching the provider."""
+
+    def __init__(self, provider: str, message: str):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+
+
+class CircuitOpen(ProviderUnavailable):
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(provider, f"circuit open, retry in {retry_in:.1f}s")
+        self.retry_in = retry_in
+
+
+class BulkheadFull(ProviderUnavailable):
+    def __init__(self, provider: str, limit: int):
+        super().__init__(provider, f"all {limit} concurrent slots busy")
+        self.limit = limit
+
+
+# ------------------------------------------------
+# Circuit breaker
+# ------------------------------------------------
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Count-based breaker over the last `window` outcomes.
+
+    closed -> open when at least `min_calls` outcomes are recorded and the
+    failure share reaches `failure_rate`; open -> half_open after `cooldown`;
+    half_open lets `probes` calls through, closing on a success and
+    re-opening on a failure.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        cooldown: float = 30.0,
+        probes: int = 1,
+        clock: Any = time.monotonic,
+    ):
+        self.provider = provider
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.probes = max(1, probes)
+        self._clock = clock
+        self._outcomes: Deque[bool] = collections.deque(maxlen=max(1, window))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_out = 0
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probes_out = 0
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def allow(self) -> None:
+        """Raise CircuitOpen unless a call may go out now."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes_out < self.probes:
+                self._probes_out += 1
+                return
+            retry_in = max(0.0, self.cooldown - (self._clock() - self._opened_at))
+        raise CircuitOpen(self.provider, retry_in)
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if ok:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            if self._state == OPEN:
+                # A call admitted before the breaker opened.
+                return
+            self._outcomes.append(ok)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+
+# ------------------------------------------------
+# Bulkhead
+# ------------------------------------------------
+class Bulkhead:
+    """Caps in-flight calls to one provider."""
+
+    def __init__(self, provider: str, limit: int, wait: float):
+        self.provider = provider
+        self.limit = max(1, limit)
+        self.wait = wait
+        self._sem = threading.BoundedSemaphore(self.limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self) -> None:
+        """Wait up to `wait` seconds for a slot, else raise BulkheadFull."""
+        if not self._sem.acquire(timeout=self.wait):
+            with self._lock:
+                self.rejected += 1
+            raise BulkheadFull(self.provider, self.limit)
+        with self._lock:
+            self.in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now (used for hedges)."""
+        if not self._sem.acquire(blocking=False):
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._sem.release()
+
+
+# ------------------------------------------------
+# Latency window and backoff
+# ------------------------------------------------
+class LatencyWindow:
+    """Recent successful-call latencies, for the hedge delay."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    retry_after: Optional[float] = None,
+    rng: Optional[random.Random] = None,
+) -> float:
+    """
+    Full-jitter exponential backoff: uniform over [0, min(cap, base * 2**attempt)].
+    A server-sent Retry-After is honoured as-is when it fits under the cap.
+    """
+    if retry_after is not None and 0 <= retry_after <= cap:
+        return retry_after
+    ceiling = min(cap, base * (2 ** attempt))
+    return (rng or random).uniform(0, ceiling)
+
@@ -0,0 +1,20 @@
+"""
+Persistence for intake-form business plans, written through a bounded
+write-behind buffer.
+"""
+
+from .store import get_plan, new_plan, plan_json, recent_plans, valid_tenant, validate_intake
+from .write_behind import BufferClosed, BufferFull, WriteBehindBuffer, exit_on_sigterm
+
+__all__ = [
+    "BufferClosed",
+    "BufferFull",
+    "WriteBehindBuffer",
+    "exit_on_sigterm",
+    "get_plan",
+    "new_plan",
+    "plan_json",
+    "recent_plans",
+    "valid_tenant",
+    "validate_intake",
+]
@@ -0,0 +1,235 @@
+"""
+Storage for submitted business plans (the intake form).
+
+One row per submission in `business_plans`, scoped by tenant. The
+financial answers are kept as JSON next to the columns we filter on, and
+reads go through the (tenant_id, created_at) / (tenant_id, user_email,
+created_at) indexes.
+"""
+
+import datetime as dt
+import json
+import re
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import db
+
+TABLE = "business_plans"
+
+PLANS_SQL = (
+    "CREATE TABLE IF NOT EXISTS `business_plans` ("
+    "`id` BIGINT AUTO_INCREMENT PRIMARY KEY,"
+    "`plan_id` CHAR(36) NOT NULL,"
+    "`tenant_id` VARCHAR(64) NOT NULL,"
+    "`user_email` VARCHAR(255) NULL,"
+    "`business_name` VARCHAR(255) NULL,"
+    "`business_type` VARCHAR(255) NULL,"
+    "`industry` VARCHAR(255) NULL,"
+    "`address` VARCHAR(500) NULL,"
+    "`financials` JSON NOT NULL,"
+    "`created_at` DATETIME(3) NOT NULL,"
+    "UNIQUE KEY `idx_plan_id` (`plan_id`),"
+    "KEY `idx_tenant_created` (`tenant_id`, `created_at`),"
+    "KEY `idx_tenant_user_created` (`tenant_id`, `user_email`, `created_at`))"
+)
+
+COLUMNS: Tuple[str, ...] = (
+    "plan_id", "tenant_id", "user_email", "business_name", "business_type",
+    "industry", "address", "financials", "created_at",
+)
+
+# Numeric answers from the intake form, all optional and non-negative.
+NUMERIC_FIELDS: Tuple[str, ...] = (
+    "current_revenue", "current_cogs", "units_sold_per_month", "tax_rate",
+    "marketing_expense", "r_and_d_expense", "sga_expense",
+    "other_operating_expense", "monthly_rent_expense",
+    "other_monthly_debt_payments", "current_payroll", "current_num_employees",
+    "planned_num_employees_5yrs", "current_capex", "planned_capex_5yr",
+    "ar_balance", "ap_balance", "inventory_balance", "total_debt_outstanding",
+    "annual_interest_payment", "annual_principal_payment",
+    "owner_compensation", "cash_on_hand",
+)
+REQUIRED_FIELDS: Tuple[str, ...] = ("business_start_date", "current_revenue")
+TEXT_FIELDS: Tuple[str, ...] = (
+    "expected_revenue_growth_pct_next_year", "customer_age_range",
+    "customer_income_level", "customer_type", "customer_additional_details",
+)
+# Columns stored outside the JSON document, with their length limits.
+PROFILE_FIELDS: Dict[str, int] = {
+    "business_name": 255,
+    "business_type": 255,
+    "industry": 255,
+    "address": 500,
+    "email_address": 255,
+}
+
+TENANT_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+
+def valid_tenant(tenant_id: Optional[str]) -> bool:
+    return bool(tenant_id and TENANT_RE.match(tenant_id))
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, str):
+        value = value.replace(",", "").strip()
+    out = float(value)
+    if out != out or out in (float("inf"), float("-inf")):
+        raise ValueError
+    return out
+
+
+def validate_intake(payload: Any) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Check an intake submission. Returns `(record, errors)`; `errors` maps
+    payload field names to messages, the shape the intake form displays.
+    """
+    errors: Dict[str, str] = {}
+    if not isinstance(payload, dict):
+        return {}, {"payload": "Expected a JSON object."}
+
+    financials: Dict[str, Any] = {}
+    raw_date = payload.get("business_start_date")
+    if raw_date:
+        try:
+            financials["business_start_date"] = (
+                dt.datetime.strptime(str(raw_date), "%m-%d-%Y").date().isoformat()
+            )
+        except ValueError:
+            errors["business_start_date"] = "Use the MM-DD-YYYY format."
+
+    for field in NUMERIC_FIELDS:
+        try:
+            value = _number(payload.get(field))
+        except (TypeError, ValueError):
+            errors[field] = "Must be a number."
+            continue
+        if value is not None and value < 0:
+            errors[field] = "Must not be negative."
+            continue
+        financials[field] = value
+
+    for field in REQUIRED_FIELDS:
+        if field not in errors and financials.get(field) is None:
+            errors[field] = "This field is required."
+
+    for field in TEXT_FIELDS:
+        value = payload.get(field)
+        financials[field] = str(value).strip() if value not in (None, "") else None
+
+    profile: Dict[str, Optional[str]] = {}
+    for field, limit in PROFILE_FIELDS.items():
+        value = payload.get(field)
+        value = str(value).strip() if value not in (None, "") else None
+        if value and len(value) > limit:
+            errors[field] = f"Must be at most {limit} characters."
+        profile[field] = value
+
+    record = {
+        "business_name": profile["business_name"],
+        "business_type": profile["business_type"],
+        "industry": profile["industry"],
+        "address": profile["address"],
+        "user_email": (profile["email_address"] or "").lower() or None,
+        "financials": financials,
+    }
+    return record, errors
+
+
+def new_plan(tenant_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stamp a validated record with its id and creation time. Both are set
+    here, before the write, so the id can be returned immediately and a
+    retried insert is a no-op on `idx_plan_id`.
+    """
+    plan = dict(record)
+    plan["plan_id"] = str(uuid.uuid4())
+    plan["tenant_id"] = tenant_id
+    now = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+    # DATETIME(3): keep what the column stores so pending and stored reads agree.
+    plan["created_at"] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    return plan
+
+
+def plan_row(plan: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(
+        json.dumps(plan[c], separators=(",", ":")) if c == "financials" else plan[c]
+        for c in COLUMNS
+    )
+
+
+def plan_json(plan: Dict[str, Any], status: str = "stored") -> Dict[str, Any]:
+    out = {c: plan[c] for c in COLUMNS if c != "tenant_id"}
+    created = out["created_at"]
+    if isinstance(created, dt.datetime):
+        out["created_at"] = created.isoformat(timespec="milliseconds") + "Z"
+    out["status"] = status
+    return out
+
+
+def _from_row(row: Sequence[Any]) -> Dict[str, Any]:
+    plan = dict(zip(COLUMNS, row))
+    if isinstance(plan["financials"], (str, bytes, bytearray)):
+        plan["financials"] = json.loads(plan["financials"])
+    return plan
+
+
+def ensure_tables(conn: Any) -> None:
+    cur = conn.cursor()
+    try:
+        cur.execute(PLANS_SQL)
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def insert_plans(conn: Any, plans: Sequence[Dict[str, Any]], batch_size: int = 500) -> int:
+    # INSERT IGNORE on plan_id: replaying a batch after a failure or from the
+    # shutdown spill file never duplicates a plan.
+    return db.upsert_rows(conn, TABLE, COLUMNS, [plan_row(p) for p in plans], (), batch_size)
+
+
+def recent_plans(
+    conn: Any,
+    tenant_id: str,
+    user_email: Optional[str] = None,
+    since: Optional[dt.datetime] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    where = ["`tenant_id` = %s"]
+    params: List[Any] = [tenant_id]
+    if user_email:
+        where.append("`user_email` = %s")
+        params.append(user_email.lower())
+    if since:
+        where.append("`created_at` >= %s")
+        params.append(since)
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT {', '.join(db.quote_ident(c) for c in COLUMNS)} FROM `business_plans` "
+            f"WHERE {' AND '.join(where)} ORDER BY `created_at` DESC LIMIT {int(limit)}",
+            tuple(params),
+        )
+        return [_from_row(r) for r in cur.fetchall()]
+    finally:
+        cur.close()
+
+
+def get_plan(conn: Any, tenant_id: str, plan_id: str) -> Optional[Dict[str, Any]]:
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"SELECT {', '.join(db.quote_ident(c) for c in COLUMNS)} FROM `business_plans` "
+            "WHERE `plan_id` = %s AND `tenant_id` = %s",
+            (plan_id, tenant_id),
+        )
+        row = cur.fetchone()
+        return _from_row(row) if row else None
+    finally:
+        cur.close()
@@ -0,0 +1,290 @@
+"""
+Bounded write-behind buffer for plan submissions.
+
+Requests enqueue a plan and return as soon as it is accepted; a single
+worker thread drains the queue and inserts in batches (up to `batch_size`
+rows, or whatever arrived within `flush_interval` seconds).
+
+- Backpressure: `submit` waits at most `put_timeout` for room and then
+  raises `BufferFull`, which the API turns into a 503 with Retry-After.
+- Failures: a batch that fails to insert is retried with backoff and kept
+  in hand, so while MySQL is down the queue fills and producers are pushed
+  back rather than rows being dropped.
+- Shutdown: `close()` (registered with atexit) drains the queue. Anything
+  that cannot be written in time is appended to a JSONL spill file, which
+  is replayed when the next buffer starts. Inserts are idempotent on
+  `plan_id`, so a replay never duplicates a plan. atexit does not run on a
+  default SIGTERM, so `exit_on_sigterm()` turns one into a normal exit
+  unless the server already handles the signal.
+"""
+
+import atexit
+import datetime as dt
+import json
+import logging
+import os
+import queue
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import db
+
+from . import store
+
+logger = logging.getLogger(__name__)
+
+# Relative PLAN_SPILL_PATH values resolve here (python/), not against the
+# working directory, so a restart from elsewhere still finds the spill.
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BufferFull(Exception):
+    pass
+
+
+class BufferClosed(Exception):
+    pass
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        connect: Optional[Callable[[], Any]] = None,
+        max_queue: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        put_timeout: float = 0.25,
+        spill_path: Optional[str] = None,
+        max_backoff: float = 10.0,
+    ):
+        self.connect = connect or db.connect
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.spill_path = spill_path
+        self.max_backoff = max_backoff
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        # Accepted but not yet stored, by plan_id; lets reads see a user's
+        # own just-submitted plan.
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._inflight: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._closed = False
+        self._conn: Any = None
+        self._replay_file: Optional[str] = None
+        self.stats = {"accepted": 0, "rejected": 0, "written": 0, "batches": 0, "errors": 0, "spilled": 0}
+        self._worker = threading.Thread(target=self._run, name="plan-write-behind", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls, connect: Optional[Callable[[], Any]] = None) -> "WriteBehindBuffer":
+        return cls(
+            connect=connect,
+            max_queue=int(db.getenv("PLAN_QUEUE_MAX", "1000")),
+            batch_size=int(db.getenv("PLAN_BATCH_SIZE", "100")),
+            flush_interval=int(db.getenv("PLAN_FLUSH_INTERVAL_MS", "200")) / 1000.0,
+            put_timeout=int(db.getenv("PLAN_PUT_TIMEOUT_MS", "250")) / 1000.0,
+            spill_path=os.path.join(APP_DIR, db.getenv("PLAN_SPILL_PATH", "plan_buffer_spill.jsonl")),
+        )
+
+    # ---- producer side ----
+    def submit(self, plan: Dict[str, Any]) -> None:
+        if self._closed:
+            raise BufferClosed("plan buffer is shut down")
+        with self._lock:
+            self._pending[plan["plan_id"]] = plan
+        try:
+            self._queue.put(plan, timeout=self.put_timeout)
+        except queue.Full:
+            with self._lock:
+                self._pending.pop(plan["plan_id"], None)
+                self.stats["rejected"] += 1
+            raise BufferFull("plan buffer is full")
+        with self._lock:
+            self.stats["accepted"] += 1
+
+    def pending(self, tenant_id: str, user_email: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            plans = list(self._pending.values())
+        email = user_email.lower() if user_email else None
+        return [
+            p for p in plans
+            if p["tenant_id"] == tenant_id and (email is None or p["user_email"] == email)
+        ]
+
+    def get_pending(self, tenant_id: str, plan_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            plan = self._pending.get(plan_id)
+        return plan if plan and plan["tenant_id"] == tenant_id else None
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    # ---- worker ----
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if self._conn is None:
+            self._conn = self.connect()
+            store.ensure_tables(self._conn)
+        try:
+            store.insert_plans(self._conn, batch, self.batch_size)
+        except Exception:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+            raise
+
+    def _written(self, batch: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for plan in batch:
+                self._pending.pop(plan["plan_id"], None)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+
+    def _run(self) -> None:
+        self._replay_spill()
+        backoff = 0.5
+        while True:
+            with self._lock:
+                batch = list(self._inflight)
+            if not batch:
+                if self._stopping.is_set() and self._queue.empty():
+                    break
+                batch = self._take_batch()
+                if not batch:
+                    continue
+                with self._lock:
+                    self._inflight = batch
+            try:
+                self._write(batch)
+            except Exception as ex:
+                with self._lock:
+                    self.stats["errors"] += 1
+                if self._stopping.is_set():
+                    logger.error("plan write failed during shutdown: %s", ex)
+                    break
+                logger.warning("plan write failed, retrying in %.1fs: %s", backoff, ex)
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            backoff = 0.5
+            self._written(batch)
+            with self._lock:
+                self._inflight = []
+            self._release_replay_file()
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    # ---- shutdown / spill ----
+    def close(self, timeout: float = 10.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._stopping.set()
+        self._worker.join(timeout)
+        leftovers: List[Dict[str, Any]] = []
+        with self._lock:
+            leftovers.extend(self._inflight)
+            self._inflight = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if leftovers:
+            self._spill(leftovers)
+        # Any replayed plans still unwritten were just spilled again.
+        self._release_replay_file()
+
+    def _release_replay_file(self) -> None:
+        if self._replay_file is None:
+            return
+        try:
+            os.remove(self._replay_file)
+        except OSError:
+            pass
+        self._replay_file = None
+
+    def _spill(self, plans: List[Dict[str, Any]]) -> None:
+        if not self.spill_path:
+            logger.error("dropping %d unwritten plans (no spill path configured)", len(plans))
+            return
+        with open(self.spill_path, "a", encoding="utf-8") as fh:
+            for plan in plans:
+                fh.write(json.dumps(plan, default=_json_default) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        with self._lock:
+            self.stats["spilled"] += len(plans)
+        logger.warning("spilled %d unwritten plans to %s", len(plans), self.spill_path)
+
+    def _replay_spill(self) -> None:
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        # Claim the file first so a concurrent spill starts a fresh one.
+        claimed = f"{self.spill_path}.{os.getpid()}.replay"
+        try:
+            os.replace(self.spill_path, claimed)
+        except OSError:
+            return
+        plans = []
+        with open(claimed, encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    plan = json.loads(line)
+                    plan["created_at"] = dt.datetime.fromisoformat(plan["created_at"])
+                    plans.append(plan)
+        with self._lock:
+            for plan in plans:
+                self._pending[plan["plan_id"]] = plan
+            self._inflight = plans
+        # Removed once these are stored (or spilled again on shutdown).
+        self._replay_file = claimed
+        logger.info("replaying %d spilled plans", len(plans))
+
+
+def exit_on_sigterm() -> bool:
+    """
+    Make SIGTERM raise SystemExit so atexit handlers (and `close()`) run.
+    Only from the main thread, and only while SIGTERM still has its default
+    action; a server with its own graceful shutdown keeps it.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    if signal.getsignal(signal.SIGTERM) is not signal.SIG_DFL:
+        return False
+
+    def handle(signum: int, frame: Any) -> None:
+        raise SystemExit(128 + signum)
+
+    signal.signal(signal.SIGTERM, handle)
+    return True
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
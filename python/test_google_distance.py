@@ -1,14 +1,17 @@
 import os
-import requests
 from dotenv import load_dotenv
 
+import outbound
+
 # Load your .env file
 load_dotenv()
 
 API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
+# Point at `python -m mock_apis` (or any proxy) instead of the live API
+BASE_URL = os.getenv("GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com").rstrip("/")
 
 def get_distance(origin, destination):
-    url = "https://maps.googleapis.com/maps/api/distancematrix/json"
+    url = f"{BASE_URL}/maps/api/distancematrix/json"
 
     params = {
         "origins": origin,
@@ -17,7 +20,7 @@ def get_distance(origin, destination):
         "key": API_KEY
     }
 
-    response = requests.get(url, params=params)
+    response = outbound.get("google", url, params=params)
     data = response.json()
 
     # Quick sanity check
@@ -1,21 +1,24 @@
 import os
-import requests
 from dotenv import load_dotenv
 
+import outbound
+
 # Load .env
 load_dotenv()
 
 API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
+# Point at `python -m mock_apis` (or any proxy) instead of the live API
+BASE_URL = os.getenv("GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com").rstrip("/")
 
 def geocode_address(address):
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
+    url = f"{BASE_URL}/maps/api/geocode/json"
 
     params = {
         "address": address,
         "key": API_KEY
     }
 
-    response = requests.get(url, params=params)
+    response = outbound.get("google", url, params=params)
     data = response.json()
 
     if data.get("status") != "OK":
@@ -38,8 +38,19 @@ def main() -> int:
     # Prepare client and make a simple test call
     try:
         from openai import OpenAI
-        # Explicitly pass api_key to avoid relying on ambient state
-        client = OpenAI(api_key=api_key)
+        # Explicitly pass api_key to avoid relying on ambient state;
+        # OPENAI_BASE_URL points the client at `python -m mock_apis`.
+        # The SDK retries on its own; take its timeout and retry count from
+        # the shared "openai" policy so they match the other clients.
+        from outbound import policy_for
+        policy = policy_for("openai")
+        base_url = os.getenv("OPENAI_BASE_URL", "").strip() or None
+        client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=policy.read_timeout,
+            max_retries=policy.retries,
+        )
 
         # Minimal Responses API call
         resp = client.responses.create(
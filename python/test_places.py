@@ -1,5 +1,6 @@
 import os
-import requests
+
+import outbound
 
 # -----------------------------------------
 # SIMPLE, CLEAN GOOGLE PLACES TEST SCRIPT
@@ -10,6 +11,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
+# Point at `python -m mock_apis` (or any proxy) instead of the live API
+BASE_URL = os.getenv("GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com").rstrip("/")
 
 # ---- Debug Key ----
 print("DEBUG: GOOGLE_PLACES_API_KEY =", API_KEY)
@@ -26,7 +29,7 @@ def test_places_simple():
     
     # Build URL
     url = (
-        "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+        f"{BASE_URL}/maps/api/place/nearbysearch/json"
         f"?location={lat},{lng}"
         f"&radius={radius}"
         f"&keyword={keyword}"
@@ -37,7 +40,8 @@ def test_places_simple():
     print(url)
 
     # Call API
-    resp = requests.get(url)
+    # Timeouts, retries and the circuit breaker come from the "google" policy
+    resp = outbound.get("google", url)
     data = resp.json()
 
     print("\n---- RAW RESPONSE ----")
@@ -1,14 +1,17 @@
 import os
-import requests
 from dotenv import load_dotenv
 
+import outbound
+
 # Load .env
 load_dotenv()
 
 API_KEY = os.getenv("YELP_API_KEY")
+# Point at `python -m mock_apis` (or any proxy) instead of the live API
+BASE_URL = os.getenv("YELP_BASE_URL", "https://api.yelp.com").rstrip("/")
 
 def search_yelp(term, location, limit=5):
-    url = "https://api.yelp.com/v3/businesses/search"
+    url = f"{BASE_URL}/v3/businesses/search"
 
     headers = {
         "Authorization": f"Bearer {API_KEY}"
@@ -20,7 +23,7 @@ def search_yelp(term, location, limit=5):
         "limit": limit,
     }
 
-    response = requests.get(url, headers=headers, params=params)
+    response = outbound.get("yelp", url, headers=headers, params=params)
     data = response.json()
 
     # Error check
@@ -0,0 +1,10 @@
+import pytest
+
+from bench.standin import StandIn
+
+
+@pytest.fixture
+def standin(tmp_path):
+    db = StandIn(str(tmp_path / "standin.sqlite"))
+    yield db
+    db.close()
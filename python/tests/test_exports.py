@@ -0,0 +1,83 @@
+import pytest
+
+from exports import PLAN_COLUMNS, dissertation_export, plans_export
+from plans import store as plan_store
+
+COLUMNS = ["symbol", "fiscalDateEnding", "totalRevenue"]
+
+ROWS = [
+    ("AAA", "2024-03-31", "10"), ("AAA", "2024-06-30", "None"), ("BBB", "2024-03-31", "30"),
+    ("CCC", "2023-12-31", "40"), ("CCC", "2024-03-31", "50"), (None, "2024-03-31", "60"),
+    ("DDD", None, "70"), (None, None, "80"),
+]
+
+
+@pytest.fixture
+def conn(standin):
+    standin.create_dissertation_table()
+    for row in ROWS:
+        standin.execute(
+            "INSERT INTO `dissertation_data` (`symbol`, `fiscalDateEnding`, `totalRevenue`) VALUES (%s, %s, %s)",
+            row,
+        )
+    conn = standin.connect()
+    yield conn
+    conn.close()
+
+
+def revenues(rows):
+    return [r[2] for r in rows]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 5, 100])
+def test_every_row_is_exported_including_null_keys(conn, page_size):
+    cols, numeric, rows = dissertation_export(conn, columns=COLUMNS, page_size=page_size)
+    rows = list(rows)
+    assert list(cols) == COLUMNS and list(numeric) == ["totalRevenue"]
+    assert len(rows) == len(ROWS)
+    # Keyset pages in key order first, NULL-key rows last.
+    assert revenues(rows[:5]) == [10.0, None, 30.0, 40.0, 50.0]
+    assert sorted(revenues(rows[5:])) == [60.0, 70.0, 80.0]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 100])
+@pytest.mark.parametrize("limit", [1, 4, 5, 6, 8, 20])
+def test_limit_spans_the_null_key_pass(conn, page_size, limit):
+    _, _, rows = dissertation_export(conn, columns=COLUMNS, page_size=page_size, limit=limit)
+    assert len(list(rows)) == min(limit, len(ROWS))
+
+
+def test_symbol_filter_applies_to_both_passes(conn):
+    _, _, rows = dissertation_export(conn, columns=COLUMNS, symbols=["DDD", "CCC"], page_size=1)
+    assert revenues(rows) == [40.0, 50.0, 70.0]
+
+
+def test_unknown_columns_are_rejected(conn):
+    with pytest.raises(ValueError):
+        dissertation_export(conn, columns=["symbol", "password"])
+
+
+def test_plans_export_reads_pending_then_stored(standin):
+    conn = standin.connect()
+    plan_store.ensure_tables(conn)
+    record, errors = plan_store.validate_intake({
+        "business_start_date": "03-01-2021", "current_revenue": "1,000", "current_cogs": 400,
+        "tax_rate": 21, "business_name": "Cafe", "email_address": "Owner@Example.com",
+    })
+    assert not errors
+    stored = plan_store.new_plan("t1", record)
+    queued = plan_store.new_plan("t1", record)
+    other = plan_store.new_plan("t2", record)
+    plan_store.insert_plans(conn, [stored, other])
+
+    cols, _, rows = plans_export(
+        conn, "t1", [queued["plan_id"], stored["plan_id"], other["plan_id"]],
+        pending={queued["plan_id"]: queued},
+    )
+    rows = list(rows)
+    col = {name: i for i, name in enumerate(cols)}
+    assert list(cols) == list(PLAN_COLUMNS)
+    assert [r[col["plan_id"]] for r in rows] == [queued["plan_id"], stored["plan_id"]]
+    assert {r[col["current_revenue"]] for r in rows} == {1000.0}
+    assert {r[col["user_email"]] for r in rows} == {"owner@example.com"}
+    conn.close()
@@ -0,0 +1,73 @@
+import pytest
+
+from locations import geohash
+
+
+def test_encode_known_value():
+    assert geohash.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geohash.encode(57.64911, 10.40744) == "u4pruy"
+
+
+@pytest.mark.parametrize("lat,lng", [(91, 0), (-90.5, 0), (0, 180.1), (0, -181)])
+def test_encode_rejects_out_of_range(lat, lng):
+    with pytest.raises(ValueError):
+        geohash.encode(lat, lng)
+
+
+def test_bounds_round_trip():
+    for lat, lng in [(40.7128, -74.006), (-33.8688, 151.2093), (0.0, 0.0)]:
+        for precision in (1, 5, 6, 9):
+            gh = geohash.encode(lat, lng, precision)
+            assert geohash.contains(gh, lat, lng)
+            assert geohash.encode(*geohash.center(gh), precision) == gh
+    with pytest.raises(ValueError):
+        geohash.bounds("u4pa")  # "a" is not in the alphabet
+
+
+def test_neighbors_rings():
+    gh = geohash.encode(40.7128, -74.006, 6)
+    ring1 = geohash.neighbors(gh)
+    assert len(ring1) == 9 and ring1[0] == gh
+    # Edge-sharing cells before corners.
+    s, w, n, e = geohash.bounds(gh)
+    lat, lng = geohash.center(gh)
+    edges = {geohash.encode(lat + n - s, lng, 6), geohash.encode(lat, lng + e - w, 6),
+             geohash.encode(lat - (n - s), lng, 6), geohash.encode(lat, lng - (e - w), 6)}
+    assert set(ring1[1:5]) == edges
+    ring2 = geohash.neighbors(gh, rings=2)
+    assert len(ring2) == 25 and ring2[:9] == ring1
+
+
+def test_neighbors_wrap_the_antimeridian():
+    gh = geohash.encode(10.0, 179.999, 5)
+    cells = geohash.neighbors(gh)
+    assert len(cells) == 9
+    assert any(geohash.center(c)[1] < 0 for c in cells)
+
+
+def test_neighbors_clip_at_the_poles():
+    gh = geohash.encode(89.99, 0.0, 4)
+    cells = geohash.neighbors(gh)
+    assert len(cells) == 6
+    assert all(geohash.center(c)[0] < 90 for c in cells)
+
+
+def test_covering_box():
+    cells = geohash.covering(40.70, -74.02, 40.72, -73.99, 6)
+    assert len(cells) == len(set(cells))
+    for lat in (40.70, 40.71, 40.72):
+        for lng in (-74.02, -74.0, -73.99):
+            assert geohash.encode(lat, lng, 6) in cells
+    # Nothing outside the box's row/column span.
+    for cell in cells:
+        s, w, n, e = geohash.bounds(cell)
+        assert s <= 40.72 and n >= 40.70 and w <= -73.99 and e >= -74.02
+
+
+def test_covering_radius_spans_the_tile():
+    gh = geohash.encode(40.7128, -74.006, 6)
+    s, w, n, e = geohash.bounds(gh)
+    lat, lng = geohash.center(gh)
+    radius = geohash.covering_radius_m(gh)
+    assert radius == pytest.approx(geohash.haversine_m(lat, lng, n, e), rel=0.01)
+    assert 0.3 < geohash.area_km2(gh) < 0.6
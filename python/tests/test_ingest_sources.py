@@ -0,0 +1,135 @@
+import datetime as dt
+import json
+import os
+
+import pytest
+
+from data_pull.ingest.sources import (
+    BlsSource,
+    CensusSource,
+    EarningsCalendarSource,
+    FinancialStatementsSource,
+    FredSource,
+    SourceError,
+)
+from data_pull.ingest.transport import FixtureTransport
+from financials import schema
+
+BENCH_FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "bench", "fixtures")
+
+
+def write_fixture(root, key, body):
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(body if isinstance(body, str) else json.dumps(body), encoding="utf-8")
+
+
+@pytest.fixture(autouse=True)
+def date_range(monkeypatch):
+    monkeypatch.setenv("START_DATE", "2023-01-01")
+    monkeypatch.setenv("END_DATE", "2024-12-31")
+
+
+def test_missing_fixture_is_a_404(tmp_path):
+    resp = FixtureTransport(str(tmp_path)).request("fred", "GET", "http://x", fixture_key="fred/NOPE")
+    assert resp.status_code == 404
+    assert not resp.ok
+
+
+def test_fred_monthly_series_is_averaged_to_quarter_end(tmp_path):
+    write_fixture(tmp_path, "fred/CPIAUCSL.json", {"observations": [
+        {"date": "2024-01-01", "value": "300"},
+        {"date": "2024-02-01", "value": "."},
+        {"date": "2024-03-01", "value": "302"},
+        {"date": "2024-04-01", "value": "310"},
+    ]})
+    rows = FredSource(series={"CPIAUCSL": True}).fetch("CPIAUCSL", FixtureTransport(str(tmp_path)))
+    assert rows == [
+        ("CPIAUCSL", dt.date(2024, 3, 31), 301.0, "2024Q1"),
+        ("CPIAUCSL", dt.date(2024, 6, 30), 310.0, "2024Q2"),
+    ]
+
+
+def test_fred_quarterly_series_is_kept_as_is(tmp_path):
+    write_fixture(tmp_path, "fred/GDP.json", {"observations": [{"date": "2024-04-01", "value": "28000.5"}]})
+    rows = FredSource(series={"GDP": False}).fetch("GDP", FixtureTransport(str(tmp_path)))
+    assert rows == [("GDP", dt.date(2024, 4, 1), 28000.5, "2024Q2")]
+
+
+def test_bls_rows_and_failed_request(tmp_path):
+    write_fixture(tmp_path, "bls/A-B.json", {
+        "status": "REQUEST_SUCCEEDED",
+        "Results": {"series": [
+            {"seriesID": "A", "data": [{"year": "2024", "period": "M01", "periodName": "January", "value": "1.5"}]},
+            {"seriesID": "B", "data": [{"year": "2023", "period": "M12", "periodName": "December", "value": "-"}]},
+        ]},
+    })
+    write_fixture(tmp_path, "bls/C.json", {"status": "REQUEST_NOT_PROCESSED", "message": ["daily threshold"]})
+    source = BlsSource(series=["A", "B"])
+    transport = FixtureTransport(str(tmp_path))
+    assert source.units() == [("A", "B")]
+    assert source.fetch(("A", "B"), transport) == [
+        ("A", 2024, "M01", "January", 1.5),
+        ("B", 2023, "M12", "December", None),
+    ]
+    with pytest.raises(SourceError, match="daily threshold"):
+        source.fetch(("C",), transport)
+
+
+def test_census_suppressed_estimates_become_null(tmp_path):
+    write_fixture(tmp_path, "census/2022/48.json", [
+        ["NAME", "B01003_001E", "B19013_001E", "state", "place"],
+        ["Austin city, Texas", "958202", "86556", "48", "05000"],
+        ["Tiny town, Texas", "-999999999", "-666666666", "48", "99999"],
+    ])
+    rows = CensusSource(states=["48"], year=2022).fetch("48", FixtureTransport(str(tmp_path)))
+    assert rows == [
+        (2022, "48", "05000", "Austin city, Texas", 958202, 86556.0),
+        (2022, "48", "99999", "Tiny town, Texas", None, None),
+    ]
+
+
+def test_earnings_nearest_report_and_listing_status(tmp_path):
+    header = "symbol,name,reportDate,fiscalDateEnding,estimate,currency\n"
+    write_fixture(tmp_path, "alphavantage/listing_status_active.csv",
+                  "symbol,name,exchange,assetType,ipoDate,delistingDate,status\nIBM,IBM,NYSE,Stock,,,Active\n")
+    write_fixture(tmp_path, "alphavantage/earnings_IBM_3month.csv", header)
+    write_fixture(tmp_path, "alphavantage/earnings_IBM_6month.csv", header
+                  + "IBM,IBM,2025-07-20,2025-06-30,2.1,USD\n"
+                  + "IBM,IBM,2025-04-21,2025-03-31,1.6,USD\n")
+    write_fixture(tmp_path, "alphavantage/earnings_XYZ_3month.csv",
+                  json.dumps({"Information": "rate limit"}))
+    transport = FixtureTransport(str(tmp_path))
+    source = EarningsCalendarSource(symbols=["IBM", "XYZ"])
+    source.prepare(transport, None)
+    assert source.listing_status == {"IBM": "active"}
+    assert source.fetch("IBM", transport) == [
+        ("IBM", "IBM", "2025-04-21", "2025-03-31", 1.6, "USD", "6month", "active"),
+    ]
+    # A JSON error body in place of the CSV is a failed unit, not an empty one.
+    with pytest.raises(SourceError, match="rate limit"):
+        source.fetch("XYZ", transport)
+
+
+def test_statements_are_joined_by_fiscal_date(tmp_path):
+    source = FinancialStatementsSource(symbols=["IBM"])
+    rows = source.fetch("IBM", FixtureTransport(BENCH_FIXTURES))
+    assert len(rows) == 8
+    col = {name: i for i, name in enumerate(schema.COLUMNS)}
+    dates = [r[col["fiscalDateEnding"]] for r in rows]
+    assert dates == sorted(dates) and dates[0] == dt.date(2023, 3, 31)
+    for row in rows:
+        assert row[col["symbol"]] == "IBM"
+        assert row[col["industry"]] == "COMPUTER & OFFICE EQUIPMENT"
+        assert row[col["sharesOutstanding"]] == 927000000.0
+        assert row[col["sharePrice"]] is None
+        assert row[col["totalRevenue"]] is not None
+        assert row[col["totalAssets"]] is not None
+        assert row[col["operatingCashflow"]] is not None
+    assert source.validator.validate(schema.COLUMNS, rows).quarantined == []
+
+
+def test_statements_error_note_fails_the_unit(tmp_path):
+    write_fixture(tmp_path, "alphavantage/income_statement_IBM.json", {"Note": "call frequency"})
+    with pytest.raises(SourceError, match="call frequency"):
+        FinancialStatementsSource(symbols=["IBM"]).fetch("IBM", FixtureTransport(str(tmp_path)))
@@ -0,0 +1,145 @@
+import re
+
+import pytest
+
+from migrations import runner
+from migrations.runner import STATUS_APPLIED, STATUS_FAILED, Migration, MigrationContext, MigrationRunner
+
+
+class Refused(Exception):
+    errno = 1846
+    msg = "LOCK=NONE is not supported"
+
+
+class Interrupted(Exception):
+    pass
+
+
+class SQLiteContext(MigrationContext):
+    """
+    MigrationContext over the bench SQLite stand-in: schema lookups go to
+    sqlite_master, the MySQL-only DDL is rewritten, in-place ALTERs are
+    refused (so online_alter takes the shadow-copy path) and sync triggers
+    are skipped. `interrupt_after` raises from throttle() after that many
+    chunks, like a killed process.
+    """
+
+    interrupt_after = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunks = 0
+
+    def execute(self, sql, params=()):
+        if "ALGORITHM=INPLACE" in sql:
+            raise Refused(sql)
+        like = re.match(r"CREATE TABLE `(\w+)` LIKE `(\w+)`$", sql)
+        if like:
+            shadow, table = like.groups()
+            ddl = self.query("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))[0][0]
+            sql = ddl.replace(f"`{table}`", f"`{shadow}`", 1)
+        rename = re.match(r"RENAME TABLE (`\w+`) TO (`\w+`), (`\w+`) TO (`\w+`)$", sql)
+        if rename:
+            a, b, c, d = rename.groups()
+            super().execute(f"ALTER TABLE {a} RENAME TO {b}")
+            sql = f"ALTER TABLE {c} RENAME TO {d}"
+        super().execute(sql, params)
+
+    def throttle(self):
+        self.chunks += 1
+        if self.interrupt_after is not None and self.chunks >= self.interrupt_after:
+            raise Interrupted(f"stopped after {self.chunks} chunks")
+
+    def table_exists(self, table):
+        return bool(self.query("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))[0][0])
+
+    def estimated_rows(self, table):
+        return int(self.query(f"SELECT COUNT(*) FROM `{table}`")[0][0])
+
+    def _create_sync_triggers(self, table, shadow, cols, key):
+        pass
+
+    def _drop_sync_triggers(self, table):
+        pass
+
+
+ROWS = [
+    ("A", "2020", 1), ("A", "2021", 2), (None, "2020", 3), ("B", None, 4), ("B", None, 5),
+    ("C", "2020", 6), (None, None, 7), ("D", "2020", 8), ("D", "2020", 9),
+]
+
+
+def make_table(standin, name, rows, unique=False):
+    key = ", UNIQUE KEY `uk` (`k1`, `k2`)" if unique else ""
+    standin.execute(f"CREATE TABLE IF NOT EXISTS `{name}` (`k1` TEXT, `k2` TEXT, `v` INT{key})")
+    for row in rows:
+        standin.execute(f"INSERT INTO `{name}` (`k1`, `k2`, `v`) VALUES (%s, %s, %s)", row)
+
+
+def context(conn, checkpoint=None, saved=None, **options):
+    mig = Migration(1, "test", lambda ctx: None)
+    save = saved.append if saved is not None else (lambda cp: None)
+    return SQLiteContext(conn, mig, checkpoint, save, **options)
+
+
+def rows_of(conn, table):
+    cur = conn.cursor()
+    cur.execute(f"SELECT * FROM `{table}`")
+    rows = cur.fetchall()
+    cur.close()
+    return sorted(rows, key=repr)
+
+
+def test_find_duplicates_ignores_null_keys(standin):
+    make_table(standin, "t", ROWS)
+    ctx = context(standin.connect(), chunk_size=2)
+    assert ctx.find_duplicates("t", ["k1", "k2"]) == (1, [("D", "2020", 2)])
+
+
+def test_shadow_copy_includes_null_keys(standin):
+    rows = [r for r in ROWS if r[2] != 9]
+    make_table(standin, "t", rows, unique=True)
+    conn = standin.connect()
+    saved = []
+    context(conn, saved=saved, chunk_size=2).online_alter("t", "ADD COLUMN `note` TEXT", key=["k1", "k2"])
+    assert rows_of(conn, "t") == sorted([r + (None,) for r in rows], key=repr)
+    assert saved[-1] == {}
+    assert not context(conn).table_exists("_t_new")
+    assert not context(conn).table_exists("_t_old")
+
+
+def test_runner_resumes_an_interrupted_shadow_copy(standin, monkeypatch):
+    rows = [r for r in ROWS if r[2] != 9]
+    make_table(standin, "t", rows, unique=True)
+    conn = standin.connect()
+    conn._db.create_function("GET_LOCK", 2, lambda name, timeout: 1)
+    conn._db.create_function("RELEASE_LOCK", 1, lambda name: 1)
+    monkeypatch.setattr(runner, "MigrationContext", SQLiteContext)
+    migration = Migration(1, "add_note", lambda ctx: ctx.online_alter("t", "ADD COLUMN `note` TEXT", key=["k1", "k2"]))
+
+    monkeypatch.setattr(SQLiteContext, "interrupt_after", 1)
+    with pytest.raises(Interrupted):
+        MigrationRunner(conn, chunk_size=2).run([migration])
+    status, checkpoint, _ = MigrationRunner(conn).state()[1]
+    assert status == STATUS_FAILED
+    assert checkpoint["shadow"]["last"] == ["A", "2021"]
+    assert checkpoint["shadow"]["copied"] == 2
+
+    monkeypatch.setattr(SQLiteContext, "interrupt_after", None)
+    assert MigrationRunner(conn, chunk_size=2).run([migration]) == 1
+    status, checkpoint, _ = MigrationRunner(conn).state()[1]
+    assert status == STATUS_APPLIED and not checkpoint
+    assert rows_of(conn, "t") == sorted([r + (None,) for r in rows], key=repr)
+    # Applied migrations are skipped.
+    assert MigrationRunner(conn, chunk_size=2).run([migration]) == 0
+
+
+def test_finish_interrupted_swap(standin):
+    make_table(standin, "t", ROWS[:2])
+    make_table(standin, "_t_old", ROWS[:2])
+    saved = []
+    ctx = context(standin.connect(), {"shadow": {"table": "t", "key": ["k1", "k2"]}}, saved)
+    assert ctx.finish_interrupted_swap()
+    assert not ctx.table_exists("_t_old")
+    assert saved == [{}]
+    assert not ctx.finish_interrupted_swap()
@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+
+import pytest
+
+from outbound import CircuitBreaker, CircuitOpen, ProviderPolicy, ResilientClient, backoff_delay
+from outbound.resilience import CLOSED, HALF_OPEN, OPEN
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def breaker(clock):
+    return CircuitBreaker("p", window=4, min_calls=4, failure_rate=0.5, cooldown=10, clock=clock)
+
+
+def test_breaker_opens_on_failure_rate_after_min_calls():
+    b = breaker(Clock())
+    for ok in (False, False, True):
+        b.record(ok)
+    assert b.state == CLOSED  # 3 outcomes < min_calls
+    b.record(True)
+    assert b.state == OPEN and b.opened == 1
+
+
+def test_breaker_window_forgets_old_failures():
+    b = breaker(Clock())
+    for ok in (False, True, True, True, True, False):
+        b.record(ok)
+    assert b.state == CLOSED
+
+
+def test_breaker_half_open_probe_closes_or_reopens():
+    clock = Clock()
+    b = breaker(clock)
+    for _ in range(4):
+        b.record(False)
+    with pytest.raises(CircuitOpen) as err:
+        b.allow()
+    assert err.value.retry_in == pytest.approx(10)
+
+    clock.now = 10
+    assert b.state == HALF_OPEN
+    b.allow()  # the one probe
+    with pytest.raises(CircuitOpen):
+        b.allow()
+    b.record(False)
+    assert b.state == OPEN and b.opened == 2
+
+    clock.now = 20
+    b.allow()
+    b.record(True)
+    assert b.state == CLOSED
+    b.allow()
+
+
+def test_backoff_honours_retry_after_under_the_cap():
+    assert backoff_delay(0, 0.5, 8, retry_after=3) == 3
+    rng = random.Random(1)
+    for attempt in range(6):
+        assert 0 <= backoff_delay(attempt, 0.5, 8, retry_after=30, rng=rng) <= min(8, 0.5 * 2 ** attempt)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """Replays `script` (a response, or seconds to sleep before a 200) call by call."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, timeout=None, **kwargs):
+        with self._lock:
+            step = self.script[min(self.calls, len(self.script) - 1)]
+            self.calls += 1
+        if isinstance(step, (int, float)):
+            time.sleep(step)
+            return FakeResponse(200)
+        return step
+
+    def close(self):
+        pass
+
+
+def client(session, **policy):
+    return ResilientClient(policies={"p": ProviderPolicy(**policy)}, session=session)
+
+
+def test_retry_on_5xx_counts_against_the_breaker():
+    c = client(FakeSession([FakeResponse(503), FakeResponse(200)]), retries=1, backoff_base=0.001)
+    assert c.request("p", "GET", "http://x").status_code == 200
+    stats = c.stats()["p"]
+    assert (stats["attempts"], stats["retries"], stats["failures"]) == (2, 1, 1)
+
+
+def test_429_is_retried_without_tripping_the_breaker():
+    throttled = FakeResponse(429, {"Retry-After": "0.001"})
+    c = client(FakeSession([throttled]), retries=3, breaker_min_calls=1, breaker_failure_rate=0.1)
+    assert c.request("p", "GET", "http://x") is throttled
+    stats = c.stats()["p"]
+    assert stats["attempts"] == 4 and stats["failures"] == 0 and stats["state"] == CLOSED
+
+
+def test_open_breaker_rejects_without_sending():
+    session = FakeSession([FakeResponse(500)])
+    c = client(session, retries=0, breaker_min_calls=2, breaker_window=2)
+    for _ in range(2):
+        c.request("p", "GET", "http://x")
+    with pytest.raises(CircuitOpen):
+        c.request("p", "GET", "http://x")
+    assert session.calls == 2
+    assert c.stats()["p"]["circuit_rejected"] == 1
+
+
+def test_slow_get_is_hedged_and_the_hedge_wins():
+    c = client(FakeSession([0.5, 0]), retries=0, hedge=True, hedge_budget=1.0, hedge_min_delay=0.01)
+    for _ in range(20):
+        c.provider("p").latencies.add(0.01)
+    started = time.monotonic()
+    assert c.request("p", "GET", "http://x").status_code == 200
+    assert time.monotonic() - started < 0.4
+    stats = c.stats()["p"]
+    assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+    c.close()
+
+
+def test_hedges_stay_within_budget_and_skip_posts():
+    session = FakeSession([0.05])
+    c = client(session, retries=0, hedge=True, hedge_budget=0.0, hedge_min_delay=0.01)
+    for _ in range(20):
+        c.provider("p").latencies.add(0.01)
+    c.request("p", "GET", "http://x")
+    c.request("p", "POST", "http://x")
+    assert c.stats()["p"]["hedged"] == 0 and session.calls == 2
+    c.close()
@@ -0,0 +1,101 @@
+import datetime as dt
+
+import pytest
+
+from data_pull.ingest.scheduler import BudgetedTransport, CronSchedule, QuotaBudget, QuotaExceeded
+from data_pull.ingest.transport import DEFAULT_RATES, HttpTransport
+
+
+def test_cron_fields():
+    cron = CronSchedule("*/15 9-17 * * 1-5")
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == set(range(9, 18))
+    assert cron.weekdays == {1, 2, 3, 4, 5}
+    assert CronSchedule("0 0 * * 7").weekdays == {0}
+    assert CronSchedule("5,10 0 1 1,6 *").minutes == {5, 10}
+    assert CronSchedule("10/20 * * * *").minutes == {10, 30, 50}
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "* 24 * * *", "5-1 * * * *", "*/0 * * * *", "a * * * *"])
+def test_cron_rejects_bad_expressions(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr)
+
+
+def test_cron_next_after():
+    cron = CronSchedule("*/15 9-17 * * 1-5")
+    # Friday 17:50 -> Monday 09:00
+    assert cron.next_after(dt.datetime(2024, 5, 10, 17, 50)) == dt.datetime(2024, 5, 13, 9, 0)
+    assert cron.next_after(dt.datetime(2024, 5, 13, 9, 0, 30)) == dt.datetime(2024, 5, 13, 9, 15)
+    # Month rollover into a restricted month.
+    assert CronSchedule("0 6 1 3 *").next_after(dt.datetime(2024, 3, 1, 6, 0)) == dt.datetime(2025, 3, 1, 6, 0)
+
+
+def test_cron_day_fields_are_ored_when_both_restricted():
+    cron = CronSchedule("0 0 13 * 5")  # the 13th, or any Friday
+    assert cron.next_after(dt.datetime(2024, 9, 1)) == dt.datetime(2024, 9, 6)  # Friday
+    assert cron.next_after(dt.datetime(2024, 9, 10)) == dt.datetime(2024, 9, 13)  # Friday the 13th
+    assert cron.next_after(dt.datetime(2024, 10, 11, 1)) == dt.datetime(2024, 10, 13)  # Sunday the 13th
+
+
+def test_cron_never_firing_raises():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(dt.datetime(2024, 1, 1))
+
+
+def test_quota_in_memory():
+    budget = QuotaBudget("bls", 3)
+    budget.consume()
+    budget.consume(2)
+    assert budget.remaining() == 0
+    with pytest.raises(QuotaExceeded):
+        budget.consume()
+    unlimited = QuotaBudget("fred", None)
+    unlimited.consume(1000)
+    assert unlimited.remaining() is None
+
+
+def test_quota_is_shared_through_the_database(standin):
+    a = QuotaBudget("bls", 3, standin.connect)
+    b = QuotaBudget("bls", 3, standin.connect)
+    a.consume(2)
+    assert b.remaining() == 1
+    b.consume()
+    with pytest.raises(QuotaExceeded):
+        a.consume()
+    # A refused charge leaves the stored count alone.
+    assert a.remaining() == 0
+    assert QuotaBudget("fred", 3, standin.connect).remaining() == 3
+    a.close()
+    b.close()
+
+
+class FakeResponse:
+    status_code = 200
+    text = "{}"
+
+
+class RetryingClient:
+    """Stands in for ResilientClient: three attempts for one call."""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def request(self, provider, method, url, params=None, json=None, before_attempt=None):
+        for _ in range(3):
+            before_attempt()
+            self.attempts += 1
+        return FakeResponse()
+
+
+def test_budgeted_transport_charges_every_attempt(monkeypatch):
+    monkeypatch.setitem(DEFAULT_RATES, "quota-test", {"rate": 1000.0, "burst": 10})
+    budget = QuotaBudget("quota-test", 5)
+    client = RetryingClient()
+    transport = BudgetedTransport(HttpTransport(client=client), {"quota-test": budget})
+    transport.request("quota-test", "GET", "http://x", fixture_key="k")
+    assert budget.remaining() == 2
+    with pytest.raises(QuotaExceeded):
+        transport.request("quota-test", "GET", "http://x")
+    # The attempt that found the budget empty was never sent.
+    assert client.attempts == 5
@@ -0,0 +1,72 @@
+from data_pull.ingest.validation import (
+    REASON_DUPLICATE,
+    REASON_IDENTITY,
+    REASON_KEY,
+    REASON_TYPE,
+    FinancialsValidator,
+    reason_names,
+)
+
+COLUMNS = ("symbol", "fiscalDateEnding", "totalRevenue", "costOfRevenue", "grossProfit")
+
+
+def validate(rows):
+    return FinancialsValidator().validate(COLUMNS, rows)
+
+
+def test_placeholders_become_null_and_text_is_quarantined():
+    result = validate([
+        ("A", "2024-03-31", "100", "None", "-"),
+        ("B", "2024-03-31", "100", "n/a", "lots"),
+    ])
+    # Values stay as stored (varchar); only placeholders are normalised.
+    assert result.accepted == [("A", "2024-03-31", "100", None, None)]
+    [(row, mask, detail)] = result.quarantined
+    assert row[0] == "B"
+    assert mask == REASON_TYPE
+    assert "grossProfit" in detail
+
+
+def test_missing_keys():
+    result = validate([
+        ("None", "2024-03-31", "1", "1", "0"),
+        ("A", "not a date", "1", "1", "0"),
+        ("A", None, "1", "1", "0"),
+    ])
+    assert result.accepted == []
+    assert [q[1] for q in result.quarantined] == [REASON_KEY] * 3
+
+
+def test_identity_tolerance():
+    result = validate([
+        ("A", "2024-03-31", "100", "40", "60.5"),
+        ("B", "2024-03-31", "100", "40", "75"),
+    ])
+    assert [r[0] for r in result.accepted] == ["A"]
+    assert result.quarantined[0][1] == REASON_IDENTITY
+
+
+def test_last_valid_duplicate_wins():
+    result = validate([
+        ("A", "2024-03-31", "100", "40", "60"),
+        ("A", "2024-03-31", "110", "40", "70"),
+        ("B", "2024-03-31", "100", "40", "60"),
+    ])
+    assert result.accepted == [
+        ("A", "2024-03-31", "110", "40", "70"),
+        ("B", "2024-03-31", "100", "40", "60"),
+    ]
+    [(row, mask, _)] = result.quarantined
+    assert row[2] == "100" and mask == REASON_DUPLICATE
+
+
+def test_invalid_later_duplicate_does_not_displace_a_valid_row():
+    result = validate([
+        ("A", "2024-03-31", "100", "40", "60"),
+        ("A", "2024-03-31", "oops", "40", "60"),
+    ])
+    assert result.accepted == [("A", "2024-03-31", "100", "40", "60")]
+    [(row, mask, _)] = result.quarantined
+    assert row[2] == "oops"
+    assert mask == REASON_TYPE | REASON_DUPLICATE
+    assert reason_names(REASON_TYPE | REASON_DUPLICATE) == "non_numeric,duplicate"